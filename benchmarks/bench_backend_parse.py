@@ -0,0 +1,105 @@
+"""
+Benchmark de BackendRuntime.process_backend_result por tipo de mensagem.
+
+Usa o runtime headless com um RecordingPresenter e um CommandHandler real
+com cliente TCP falso (nenhum socket é aberto: start() não é chamado).
+Com orjson instalado, as mensagens JSON também são medidas com o json da
+biblioteca padrão (json_stdlib_msgs_per_s). Os loggers ficam em WARNING
+durante a medição: o custo de formatar logs está em bench_log_formatting.
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_backend_parse
+"""
+import json
+import time
+
+from benchmarks.stubs import RecordingTCPClient, quiet_logs
+from core.commands import Command, CommandHandler
+import core.runtime
+from core.runtime import JSON_DECODER, BackendRuntime, RecordingPresenter
+
+LOG_LINE = "2024-05-01 12:00:00.123 - strawberry.video - INFO - Frames UDP recebidos: 1200"
+
+
+def _messages(count):
+    """(tipo, lista de linhas) no formato enviado pelo backend"""
+    return {
+        "command_response": [
+            json.dumps({"type": "COMMAND_RESPONSE", "command_id": f"cmd_{i}", "success": True,
+                        "message": "ok", "data": {}})
+            for i in range(count)
+        ],
+        "raspberry_info": [
+            json.dumps({"type": "raspberry_info", "ip": "192.168.0.10", "hostname": "strawberry-pi",
+                        "timestamp": 1714560000.0 + i})
+            for i in range(count)
+        ],
+        "inference": [
+            json.dumps({"label": "ripe", "label_pt": "madura", "confidence": 0.93,
+                        "filename": f"capture_{i}.jpg", "timestamp": 1714560000.0 + i,
+                        "latitude": -22.9, "longitude": -47.06})
+            for i in range(count)
+        ],
+        "wifi": [f"WIFI:SUCCESS:Conectado a rede-{i}" for i in range(count)],
+        "service": ["SERVICE:RESTARTED"] * count,
+        "logs_8kb": ["LOGS:" + "\\n".join([LOG_LINE] * 100)] * count,
+        "legacy": [f"madura: {90 + i % 10},5%" for i in range(count)],
+    }
+
+
+def _rates(runtime, handler, messages, count):
+    rates = {}
+    for kind, lines in messages.items():
+        if kind == "command_response":
+            # Respostas casam com comandos pendentes, como no uso real
+            now = time.time()
+            for i in range(count):
+                handler.pending_commands[f"cmd_{i}"] = Command(f"cmd_{i}", "CAPTURE", {}, now, None)
+        start = time.perf_counter()
+        for line in lines:
+            runtime.process_backend_result(line)
+        rates[kind] = count / (time.perf_counter() - start)
+    return rates
+
+
+def run(count=5000):
+    messages = _messages(count)
+    results = {}
+    with quiet_logs():
+        handler = CommandHandler(RecordingTCPClient())
+        runtime = BackendRuntime({}, presenter=RecordingPresenter())
+        runtime.commands = handler
+        rates = _rates(runtime, handler, messages, count)
+        stdlib = {}
+        if JSON_DECODER != "json":
+            _decoder = core.runtime._json_loads
+            core.runtime._json_loads = json.loads
+            try:
+                stdlib = _rates(runtime, handler, messages, count)
+            finally:
+                core.runtime._json_loads = _decoder
+    handler.cleanup()
+
+    for kind, rate in rates.items():
+        results[kind] = {
+            "msgs_per_s": rate,
+            "us_per_msg": 1e6 / rate,
+            "bytes": len(messages[kind][0]),
+        }
+        if messages[kind][0].startswith("{") and kind in stdlib:
+            results[kind]["json_stdlib_msgs_per_s"] = stdlib[kind]
+    return results
+
+
+def main():
+    results = run()
+    print(f"decodificador JSON: {JSON_DECODER}")
+    print(f"{'tipo':<18}{'msgs/s':>12}{'µs/msg':>10}{'bytes':>8}{'json msgs/s':>14}")
+    for kind, r in results.items():
+        stdlib = r.get("json_stdlib_msgs_per_s")
+        stdlib = "—" if stdlib is None else f"{stdlib:,.0f}"
+        print(f"{kind:<18}{r['msgs_per_s']:>12,.0f}{r['us_per_msg']:>10.1f}{r['bytes']:>8}{stdlib:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark de ida e volta do CommandHandler sob concorrência.
+
+Um "backend" local responde cada comando enviado pelo cliente TCP falso
+(após `backend_delay_ms`) chamando handle_response, como faria o listener
+TCP. N threads disparam comandos com callback ao mesmo tempo; mede a
+latência de ida e volta (p50/p99) e a vazão, além de quantas tarefas de
+timeout ficaram na fila do pool de 5 workers.
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_commands
+"""
+import queue
+import threading
+import time
+
+from benchmarks.stubs import RecordingTCPClient, quiet_logs
+from core.commands import CommandHandler
+from utils.latency import LatencyHistogram
+
+CONCURRENCY = [1, 4, 16]
+
+
+class _Backend:
+    """Responde "NOME:cmd_id:..." depois de `delay` segundos, em ordem de chegada"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.handler = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="Bench-Backend", daemon=True)
+        self._thread.start()
+
+    def on_send(self, data: bytes):
+        self._queue.put((time.perf_counter() + self.delay, data.decode("utf-8").split(":")[1]))
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            due, command_id = item
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            self.handler.handle_response(command_id, True, "ok", {})
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+
+
+def run_case(concurrency, per_thread=50, backend_delay_ms=1.0):
+    backend = _Backend(backend_delay_ms / 1000)
+    handler = CommandHandler(RecordingTCPClient(on_send=backend.on_send))
+    backend.handler = handler
+    rtt = LatencyHistogram()
+    lock = threading.Lock()
+
+    def client():
+        for _ in range(per_thread):
+            done = threading.Event()
+            sent = time.perf_counter()
+
+            def callback(success, message, data):
+                with lock:
+                    rtt.record(time.perf_counter() - sent)
+                done.set()
+
+            handler.send_restart_service(callback=callback)
+            done.wait(5)
+
+    threads = [threading.Thread(target=client, name=f"Bench-Client-{i}") for i in range(concurrency)]
+    with quiet_logs():
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        backlog = handler.executor._work_queue.qsize()
+        handler.cleanup()
+        backend.close()
+
+    total = concurrency * per_thread
+    return {
+        "concurrency": concurrency,
+        "commands": total,
+        "completed": rtt.count,
+        "cmds_per_s": rtt.count / elapsed,
+        "rtt_p50_ms": rtt.percentile(50),
+        "rtt_p99_ms": rtt.percentile(99),
+        "timeout_tasks_queued": backlog,
+    }
+
+
+def run(per_thread=50, backend_delay_ms=1.0):
+    return {f"c={c}": run_case(c, per_thread, backend_delay_ms) for c in CONCURRENCY}
+
+
+def main():
+    results = run()
+    print(f"{'caso':<8}{'cmds/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'fila timeout':>14}")
+    for name, r in results.items():
+        print(f"{name:<8}{r['cmds_per_s']:>10,.0f}{r['rtt_p50_ms']:>9.2f}{r['rtt_p99_ms']:>9.2f}"
+              f"{r['timeout_tasks_queued']:>14}")
+
+
+if __name__ == "__main__":
+    main()
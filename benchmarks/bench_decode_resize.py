@@ -0,0 +1,76 @@
+"""
+Benchmark de decodificação JPEG + redimensionamento por resolução.
+
+Segue o caminho de um frame até a HomeScreen: _decode_rgb (cv2),
+Image.fromarray e o resize LANCZOS para cobrir a área do vídeo
+(cover_size, a mesma conta de VideoState.update_frame_image).
+
+Uso (na raiz do frontend; rodar na Raspberry para o número que importa):
+    python -m benchmarks.bench_decode_resize
+"""
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from core.video_stream import _decode_rgb
+from ui.screens.home_screen import VIDEO_FALLBACK_SIZE, cover_size
+
+FRAME_BUDGET_MS = 1000.0 / 30
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+
+
+def _make_jpeg(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    img = (rng.random((height, width, 3)) * 255).astype(np.uint8)
+    img = cv2.GaussianBlur(img, (0, 0), 2)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return buf.tobytes()
+
+
+def _best_ms(func, repeat):
+    func()  # aquecimento
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def run(repeat=30, box=VIDEO_FALLBACK_SIZE):
+    results = {}
+    for width, height in RESOLUTIONS:
+        jpeg = _make_jpeg(width, height)
+        rgb = _decode_rgb(jpeg)
+        pil = Image.fromarray(rgb)
+        size = cover_size(width, height, *box)
+
+        decode_ms = _best_ms(lambda: _decode_rgb(jpeg), repeat)
+        to_pil_ms = _best_ms(lambda: Image.fromarray(rgb), repeat)
+        resize_ms = _best_ms(lambda: pil.resize(size, Image.LANCZOS), repeat)
+        total = decode_ms + to_pil_ms + resize_ms
+        results[f"{width}x{height}"] = {
+            "jpeg_bytes": len(jpeg),
+            "decode_ms": decode_ms,
+            "fromarray_ms": to_pil_ms,
+            "resize_ms": resize_ms,
+            "resized_to": list(size),
+            "total_ms": total,
+            "budget_pct": total / FRAME_BUDGET_MS * 100,
+        }
+    return results
+
+
+def main():
+    results = run()
+    print(f"área do vídeo {VIDEO_FALLBACK_SIZE[0]}x{VIDEO_FALLBACK_SIZE[1]}; orçamento a 30 fps: {FRAME_BUDGET_MS:.1f} ms")
+    print(f"{'resolução':<12}{'decode':>9}{'pil':>8}{'resize':>9}{'total':>9}{'% frame':>10}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['decode_ms']:>9.2f}{r['fromarray_ms']:>8.2f}{r['resize_ms']:>9.2f}"
+              f"{r['total_ms']:>9.2f}{r['budget_pct']:>9.0f}%")
+
+
+if __name__ == "__main__":
+    main()
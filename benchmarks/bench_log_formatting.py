@@ -0,0 +1,88 @@
+"""
+Benchmark de formatação de logs: registros por segundo antes e depois do
+cache de formatters/timestamp.
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_log_formatting
+"""
+import logging
+import time
+from datetime import datetime
+
+from utils.logger import CustomFormatter, FileFormatter
+
+DATEFMT = '%Y-%m-%d %H:%M:%S.%f'
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class LegacyFileFormatter(logging.Formatter):
+    """Implementação anterior (strftime a cada registro)"""
+
+    def formatTime(self, record, datefmt=None):
+        ct = datetime.fromtimestamp(record.created)
+        if datefmt:
+            s = ct.strftime(datefmt.replace('%f', f"{ct.microsecond // 1000:03d}"))
+        else:
+            s = ct.strftime("%Y-%m-%d %H:%M:%S") + f".{ct.microsecond // 1000:03d}"
+        return s
+
+
+class LegacyCustomFormatter(LegacyFileFormatter):
+    """Implementação anterior (novo logging.Formatter a cada registro)"""
+
+    FORMATS = CustomFormatter.FORMATS
+
+    def format(self, record):
+        log_fmt = self.FORMATS.get(record.levelno)
+        formatter = logging.Formatter(log_fmt, datefmt=DATEFMT)
+        formatter.formatTime = self.formatTime
+        return formatter.format(record)
+
+
+def _make_records(count):
+    start = time.time()
+    levels = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR]
+    records = []
+    for i in range(count):
+        record = logging.LogRecord(
+            "strawberry.video", levels[i % len(levels)], __file__, 0,
+            "Frames UDP recebidos: %d", (i,), None
+        )
+        # ~30 fps de logs: vários registros por segundo, como no kiosk em DEBUG
+        record.created = start + i / 30.0
+        record.msecs = (record.created - int(record.created)) * 1000
+        records.append(record)
+    return records
+
+
+def _records_per_second(formatter, records, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for record in records:
+            formatter.format(record)
+        best = min(best, time.perf_counter() - t0)
+    return len(records) / best
+
+
+def run(count=50_000):
+    records = _make_records(count)
+    cases = {
+        "file (antes)": LegacyFileFormatter(FORMAT, datefmt=DATEFMT),
+        "file (depois)": FileFormatter(FORMAT, datefmt=DATEFMT),
+        "console cor (antes)": LegacyCustomFormatter(),
+        "console cor (depois)": CustomFormatter(use_color=True),
+        "console sem TTY (depois)": CustomFormatter(use_color=False),
+    }
+    return {name: _records_per_second(fmt, records) for name, fmt in cases.items()}
+
+
+def main():
+    results = run()
+    print(f"{'caso':<28}{'registros/s':>14}")
+    for name, rate in results.items():
+        print(f"{name:<28}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
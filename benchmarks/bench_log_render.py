@@ -0,0 +1,91 @@
+"""
+Benchmark da exibição de logs (LogsScreen): indexação do chunk recebido
+(LogIndex.add_chunk), filtros e, com display disponível, a escrita no
+widget de texto (delete + insert + see("end"), como em _render_logs).
+
+Sem display a parte do widget fica como null no resultado.
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_log_render
+"""
+import os
+import sys
+import time
+
+from utils.log_index import LogIndex
+
+LEVELS = ["DEBUG", "INFO", "INFO", "INFO", "WARNING", "ERROR"]
+LOGGERS = ["strawberry.video", "strawberry.network", "strawberry.ui", "strawberry.commands"]
+
+
+def make_log_text(lines, start=1714560000.0):
+    out = []
+    for i in range(lines):
+        ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start + i / 20))
+        out.append(f"{ts}.{i % 1000:03d} - {LOGGERS[i % len(LOGGERS)]} - {LEVELS[i % len(LEVELS)]} - "
+                   f"Mensagem {i}: frame {i * 3} processado em {i % 17} ms")
+    return "\n".join(out)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def _widget_ms(text):
+    """Tempo de _render_logs num tk.Text real (None sem display)"""
+    if sys.platform.startswith("linux") and not os.getenv("DISPLAY"):
+        return None
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.withdraw()
+    widget = tk.Text(root)
+
+    def render():
+        widget.configure(state="normal")
+        widget.delete("1.0", "end")
+        widget.insert("1.0", text)
+        widget.configure(state="disabled")
+        widget.see("end")
+        root.update_idletasks()
+
+    elapsed, _ = _timed(render)
+    root.destroy()
+    return elapsed
+
+
+def run(sizes=(1_000, 10_000, 50_000)):
+    results = {}
+    for lines in sizes:
+        text = make_log_text(lines)
+        index = LogIndex()
+        index_ms, _ = _timed(lambda: index.add_chunk(text))
+        level_ms, shown = _timed(lambda: index.filter(levels=["WARNING", "ERROR", "CRITICAL"]))
+        text_ms, _ = _timed(lambda: index.filter(text="frame 12"))
+        regex_ms, _ = _timed(lambda: index.filter(text=r"em 1[0-6] ms", regex=True))
+        joined = "\n".join(index.filter())
+        results[f"{lines}_linhas"] = {
+            "index_ms": index_ms,
+            "index_lines_per_s": lines / (index_ms / 1000),
+            "filter_level_ms": level_ms,
+            "filter_text_ms": text_ms,
+            "filter_regex_ms": regex_ms,
+            "level_matches": len(shown),
+            "widget_render_ms": _widget_ms(joined),
+        }
+    return results
+
+
+def main():
+    results = run()
+    print(f"{'caso':<16}{'indexar':>9}{'nível':>8}{'texto':>8}{'regex':>8}{'widget':>9}   (ms)")
+    for name, r in results.items():
+        widget = "—" if r["widget_render_ms"] is None else f"{r['widget_render_ms']:.1f}"
+        print(f"{name:<16}{r['index_ms']:>9.1f}{r['filter_level_ms']:>8.1f}{r['filter_text_ms']:>8.1f}"
+              f"{r['filter_regex_ms']:>8.1f}{widget:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmark dos núcleos de rede: "threads" (padrão) x "asyncio".
+
+Um backend falso (neste processo) aceita o canal de controle, responde
+aos comandos após 200 ms, manda raspberry_info a 20 msg/s e envia vídeo
+UDP fragmentado a 30 fps. Cada núcleo roda num subprocesso com o
+BackendRuntime real enviando um SHOW_LOGS a cada 100 ms; o subprocesso
+mede threads (pico e média), trocas de contexto (getrusage) e CPU.
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_network_core
+"""
+import json
+import os
+import re
+import resource
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = ["threads", "asyncio"]
+FPS = 30
+FRAGMENT = 4096
+INFO_PER_S = 20
+COMMAND_INTERVAL_S = 0.1
+RESPONSE_DELAY_S = 0.2
+RESULT_PREFIX = "RESULT "
+COMMAND_ID_RE = re.compile(rb"SHOW_LOGS:(cmd_[0-9a-f]+)")
+
+
+def _make_jpeg():
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    image = (rng.random((60, 80, 3)) * 255).astype(np.uint8)
+    image = cv2.resize(image, (640, 480), interpolation=cv2.INTER_LINEAR)
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+
+class FakeBackend:
+    """Servidor de controle + emissor de vídeo UDP (threads do processo pai)"""
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(4)
+        self.port = self.server.getsockname()[1]
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        probe.bind(("127.0.0.1", 0))
+        self.udp_port = probe.getsockname()[1]
+        probe.close()
+        self.jpeg = _make_jpeg()
+        self._stop = threading.Event()
+        self._send_lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._accept, daemon=True).start()
+        threading.Thread(target=self._video, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self.server.close()
+
+    def _accept(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+            threading.Thread(target=self._info, args=(conn,), daemon=True).start()
+
+    def _send(self, conn, payload):
+        with self._send_lock:
+            conn.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+
+    def _serve(self, conn):
+        pending = b""
+        while not self._stop.is_set():
+            try:
+                data = conn.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+            pending += data
+            for match in COMMAND_ID_RE.finditer(pending):
+                response = {"type": "COMMAND_RESPONSE", "command_id": match.group(1).decode(),
+                            "success": True, "message": "ok", "data": {}}
+                timer = threading.Timer(RESPONSE_DELAY_S, self._respond, args=(conn, response))
+                timer.daemon = True
+                timer.start()
+            pending = pending[-64:]  # comando partido entre dois recv
+
+    def _respond(self, conn, response):
+        try:
+            self._send(conn, response)
+        except OSError:
+            pass
+
+    def _info(self, conn):
+        while not self._stop.wait(1 / INFO_PER_S):
+            try:
+                self._send(conn, {"type": "raspberry_info", "ip": "127.0.0.1", "hostname": "bench",
+                                  "timestamp": time.time()})
+            except OSError:
+                return
+
+    def _video(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        chunks = [self.jpeg[i:i + FRAGMENT] for i in range(0, len(self.jpeg), FRAGMENT)]
+        frame_id = 0
+        while not self._stop.wait(1 / FPS):
+            for index, chunk in enumerate(chunks):
+                header = struct.pack("!IHH", frame_id, len(chunks), index)
+                sock.sendto(header + chunk, ("127.0.0.1", self.udp_port))
+            frame_id += 1
+        sock.close()
+
+
+def _ctx_switches():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw, usage.ru_nivcsw, usage.ru_utime + usage.ru_stime
+
+
+def child(mode, port, udp_port, duration):
+    """Roda no subprocesso: mede o BackendRuntime com o núcleo `mode`"""
+    import logging
+
+    from benchmarks.stubs import quiet_logs
+    from core.runtime import BackendRuntime, RecordingPresenter
+
+    os.environ["STRAWBERRY_NET_CORE"] = mode
+    config = {"server": {"host": "127.0.0.1", "port": port}, "udp": {"listen_port": udp_port}}
+    completed = []
+
+    with quiet_logs(logging.ERROR):
+        runtime = BackendRuntime(config, presenter=RecordingPresenter(wants_frames=True))
+        runtime.start()
+        deadline = time.monotonic() + 10
+        while not runtime.tcp_client._connected and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(1.0)  # aquecimento: primeiro frame (import do cv2) e GET_INFO
+
+        frames_before = runtime.video_stream.m_frames.value
+        voluntary, involuntary, cpu = _ctx_switches()
+        samples = []
+        start = time.monotonic()
+        next_command = start
+        while time.monotonic() - start < duration:
+            now = time.monotonic()
+            if now >= next_command:
+                runtime.commands.send_show_logs(callback=lambda ok, msg, data: completed.append(ok))
+                next_command += COMMAND_INTERVAL_S
+            samples.append(threading.active_count())
+            time.sleep(0.02)
+        elapsed = time.monotonic() - start
+        voluntary2, involuntary2, cpu2 = _ctx_switches()
+        frames = runtime.video_stream.m_frames.value - frames_before
+        runtime.stop()
+
+    return {
+        "threads_peak": max(samples),
+        "threads_mean": sum(samples) / len(samples),
+        "ctx_voluntary_per_s": (voluntary2 - voluntary) / elapsed,
+        "ctx_involuntary_per_s": (involuntary2 - involuntary) / elapsed,
+        "cpu_pct": (cpu2 - cpu) / elapsed * 100,
+        "frames_per_s": frames / elapsed,
+        "commands_completed": sum(completed),
+    }
+
+
+def run(duration=5.0):
+    results = {}
+    for mode in MODES:
+        backend = FakeBackend()
+        backend.start()
+        try:
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_network_core", "--child", mode,
+                 str(backend.port), str(backend.udp_port), str(duration)],
+                cwd=ROOT, capture_output=True, text=True, timeout=duration + 60
+            )
+        finally:
+            backend.stop()
+        lines = [line for line in proc.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+        if proc.returncode != 0 or not lines:
+            raise RuntimeError(f"subprocesso ({mode}) falhou: {proc.stderr[-2000:]}")
+        results[mode] = json.loads(lines[-1][len(RESULT_PREFIX):])
+    return results
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        mode, port, udp_port, duration = sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), float(sys.argv[5])
+        print(RESULT_PREFIX + json.dumps(child(mode, port, udp_port, duration)), flush=True)
+        # Sem esperar os timeouts dos comandos ainda pendentes (threads do CmdHandler)
+        os._exit(0)
+
+    results = run()
+    print(f"{'núcleo':<10}{'threads':>9}{'(média)':>9}{'ctx vol/s':>11}{'ctx inv/s':>11}"
+          f"{'CPU %':>8}{'fps':>6}{'cmds':>6}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['threads_peak']:>9}{r['threads_mean']:>9.1f}{r['ctx_voluntary_per_s']:>11.0f}"
+              f"{r['ctx_involuntary_per_s']:>11.0f}{r['cpu_pct']:>8.1f}{r['frames_per_s']:>6.1f}"
+              f"{r['commands_completed']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark da pontuação de nitidez do anel de pré-captura.
+
+Mede o custo por frame (decodificação reduzida + variância do Laplaciano)
+em algumas resoluções e compara com o orçamento de um frame a 30 fps,
+além do tempo para escolher o frame mais nítido de um anel cheio.
+
+Uso (na raiz do frontend; rodar na Raspberry para o número que importa):
+    python -m benchmarks.bench_sharpness
+"""
+import time
+
+import cv2
+import numpy as np
+
+from core.frame_ring import FrameRing, sharpness_score
+
+FRAME_BUDGET_MS = 1000.0 / 30
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720)]
+
+
+def _make_jpeg(width, height, blur, seed=0):
+    rng = np.random.default_rng(seed)
+    img = (rng.random((height, width, 3)) * 255).astype(np.uint8)
+    img = cv2.GaussianBlur(img, (0, 0), blur)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return buf.tobytes()
+
+
+def _full_res_score(jpeg_bytes):
+    """Referência ingênua: decodifica em resolução cheia e usa numpy.var"""
+    gray = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def _ms_per_call(func, arg, repeat):
+    func(arg)  # aquecimento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(arg)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(repeat=200):
+    results = {}
+    for width, height in RESOLUTIONS:
+        jpeg = _make_jpeg(width, height, blur=1.5)
+        reduced = _ms_per_call(sharpness_score, jpeg, repeat)
+        full = _ms_per_call(_full_res_score, jpeg, max(20, repeat // 5))
+
+        # Anel cheio com nitidez variada: custo da escolha na hora da captura
+        ring = FrameRing()
+        for i in range(ring.capacity):
+            ring.append(i, _make_jpeg(width, height, blur=1.0 + i % 4, seed=i))
+        start = time.perf_counter()
+        best = ring.sharpest()
+        pick_ms = (time.perf_counter() - start) * 1000
+
+        results[f"{width}x{height}"] = {
+            "score_ms": reduced,
+            "full_res_ms": full,
+            "budget_pct": reduced / FRAME_BUDGET_MS * 100,
+            "pick_ring_ms": pick_ms,
+            "picked_frame": best.frame_id,
+        }
+    return results
+
+
+def main():
+    results = run()
+    print(f"orçamento por frame a 30 fps: {FRAME_BUDGET_MS:.1f} ms")
+    print(f"{'resolução':<12}{'score ms':>10}{'cheia ms':>10}{'% frame':>10}{'anel ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['score_ms']:>10.2f}{r['full_res_ms']:>10.2f}"
+              f"{r['budget_pct']:>9.1f}%{r['pick_ring_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
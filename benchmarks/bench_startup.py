@@ -0,0 +1,92 @@
+"""
+Benchmark de inicialização do kiosk.
+
+1. `python -X importtime` de `ui.app`: tempo total de import e os módulos
+   mais caros (cv2/NumPy não devem aparecer no caminho de boot).
+2. Tempo até o primeiro pixel: roda `main.py` com STRAWBERRY_STARTUP_PROBE=1,
+   que encerra a aplicação logo após o primeiro redraw (requer display).
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_startup
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_times(module="ui.app", top=15):
+    """Executa -X importtime e retorna (total_us, [(cumulativo_us, módulo), ...])"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            cumulative, depth, name = int(match.group(2)), len(match.group(3)), match.group(4)
+            entries.append((cumulative, depth, name))
+    total = sum(cum for cum, depth, _ in entries if depth == 1)
+    heaviest = sorted(((cum, name) for cum, _, name in entries), reverse=True)[:top]
+    loaded = {name for _, _, name in entries}
+    return total, heaviest, loaded
+
+
+def first_pixel_ms(runs=3):
+    """Mediana do tempo até o primeiro pixel em `runs` execuções (None sem display)"""
+    if sys.platform.startswith("linux") and not os.getenv("DISPLAY"):
+        return None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / "config.json"
+        config_path.write_text(json.dumps({"video": {"transport": "udp"}}), encoding="utf-8")
+        env = dict(os.environ, STRAWBERRY_STARTUP_PROBE="1", STRAWBERRY_CONFIG=str(config_path))
+
+        samples = []
+        for _ in range(runs):
+            proc = subprocess.run(
+                [sys.executable, "main.py"], cwd=ROOT, env=env,
+                capture_output=True, text=True, timeout=60
+            )
+            match = re.search(r"STARTUP_FIRST_PIXEL_MS=([\d.]+)", proc.stdout)
+            if match:
+                samples.append(float(match.group(1)))
+    if not samples:
+        return None
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def run():
+    total_us, heaviest, loaded = import_times()
+    return {
+        "import_ui_app_ms": total_us / 1000,
+        "heaviest_imports_ms": {name: cum / 1000 for cum, name in heaviest},
+        "cv2_on_boot_path": "cv2" in loaded,
+        "numpy_on_boot_path": "numpy" in loaded,
+        "first_pixel_ms": first_pixel_ms(),
+    }
+
+
+def main():
+    results = run()
+    print(f"import ui.app: {results['import_ui_app_ms']:.0f} ms")
+    print(f"cv2 no boot: {results['cv2_on_boot_path']} | numpy no boot: {results['numpy_on_boot_path']}")
+    print("imports mais caros (cumulativo):")
+    for name, ms in results["heaviest_imports_ms"].items():
+        print(f"  {ms:8.1f} ms  {name}")
+    if results["first_pixel_ms"] is None:
+        print("primeiro pixel: indisponível (sem display)")
+    else:
+        print(f"primeiro pixel: {results['first_pixel_ms']:.0f} ms (mediana)")
+
+
+if __name__ == "__main__":
+    main()
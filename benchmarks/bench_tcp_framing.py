@@ -0,0 +1,95 @@
+"""
+Benchmark do enquadramento do vídeo TCP (VideoStreamTCP._loop/_recvn).
+
+Um servidor local em 127.0.0.1 envia frames com prefixo de tamanho
+(com e sem a extensão de timestamp) e o VideoStreamTCP real os recebe.
+Mede frames/s e MB/s por tamanho de frame no loopback.
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_tcp_framing
+"""
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+
+from benchmarks.stubs import quiet_logs
+from core.video_stream import VideoStreamTCP
+
+FRAME_SIZES = [8_000, 60_000, 250_000]
+
+
+def _serve(server, frames, payload, with_ts):
+    conn, _ = server.accept()
+    with conn:
+        if with_ts:
+            header = struct.pack("!I", len(payload) | VideoStreamTCP.TS_FLAG)
+            message = lambda: header + struct.pack("!d", time.time()) + payload
+        else:
+            framed = struct.pack("!I", len(payload)) + payload
+            message = lambda: framed
+        for _ in range(frames):
+            conn.sendall(message())
+        # Espera o cliente encerrar (evita a reconexão do stream no meio da medição)
+        try:
+            conn.recv(1)
+        except OSError:
+            pass
+
+
+def run_case(frame_bytes, frames=500, with_ts=False, timeout=60.0):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+    payload = os.urandom(frame_bytes)
+
+    done = threading.Event()
+    count = [0]
+
+    def on_frame(_jpeg):
+        count[0] += 1
+        if count[0] == frames:
+            done.set()
+
+    stream = VideoStreamTCP("127.0.0.1", port, reconnect_sec=0.05)
+    stream.on_frame(on_frame)
+    sender = threading.Thread(target=_serve, args=(server, frames, payload, with_ts), daemon=True)
+    with quiet_logs(logging.ERROR):  # o "fechada pelo servidor" do fim é esperado
+        sender.start()
+        start = time.perf_counter()
+        stream.start()
+        done.wait(timeout)
+        elapsed = time.perf_counter() - start
+        stream.stop()
+        stream._th.join(timeout=2)
+    server.close()
+
+    return {
+        "frame_bytes": frame_bytes,
+        "timestamp_ext": with_ts,
+        "frames": count[0],
+        "frames_per_s": count[0] / elapsed,
+        "mb_per_s": count[0] * frame_bytes / elapsed / 1e6,
+    }
+
+
+def run(frames=500):
+    results = {}
+    for size in FRAME_SIZES:
+        results[f"{size // 1000}KB"] = run_case(size, frames)
+    results[f"{FRAME_SIZES[1] // 1000}KB+ts"] = run_case(FRAME_SIZES[1], frames, with_ts=True)
+    return results
+
+
+def main():
+    results = run()
+    print(f"{'caso':<12}{'frames/s':>12}{'MB/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['frames_per_s']:>12,.0f}{r['mb_per_s']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark do envio no canal de controle (TCPClient.send + TCP-Writer).
+
+Um servidor local em 127.0.0.1 só consome os bytes; N threads produtoras
+chamam send() ao mesmo tempo, como UI, captura e CommandHandler. Mede
+mensagens/s, mensagens por escrita (coalescência) e a latência entre o
+send() e a escrita no socket. Confere que todas chegam delimitadas.
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_tcp_send
+"""
+import socket
+import threading
+import time
+
+from benchmarks.stubs import quiet_logs
+from core.network import MESSAGE_DELIMITER, TCPClient
+from utils.metrics import Histogram
+
+PRODUCERS = [1, 4, 16]
+
+
+def _sink(server, received):
+    conn, _ = server.accept()
+    with conn:
+        while True:
+            data = conn.recv(262144)
+            if not data:
+                return
+            received.extend(data)
+
+
+def run_case(producers, messages=8000):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    received = bytearray()
+    sink = threading.Thread(target=_sink, args=(server, received), daemon=True)
+    sink.start()
+
+    with quiet_logs():
+        client = TCPClient("127.0.0.1", server.getsockname()[1])
+        client.connect(5.0)
+        # Histograma só deste caso (o do registro acumula entre casos)
+        client.m_send_latency = Histogram()
+        batches_before = client.m_batches.value
+        per_thread = messages // producers
+
+        def produce(k):
+            for i in range(per_thread):
+                client.send(f"CAPTURE:cmd_{k:02d}{i:06d}:{i}".encode("utf-8"))
+
+        threads = [threading.Thread(target=produce, args=(k,)) for k in range(producers)]
+        start = time.perf_counter()
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        client.flush(10.0)
+        elapsed = time.perf_counter() - start
+        batches = client.m_batches.value - batches_before
+        sent = client.m_send_latency.count
+        p50, p99 = client.m_send_latency.percentile(50), client.m_send_latency.percentile(99)
+        client.close()
+    sink.join(timeout=2)
+    server.close()
+
+    return {
+        "producers": producers,
+        "msgs_per_s": sent / elapsed,
+        "msgs_per_write": sent / batches if batches else 0.0,
+        "latency_p50_ms": p50,
+        "latency_p99_ms": p99,
+        "delivered": bytes(received).count(MESSAGE_DELIMITER),
+        "dropped": client.m_dropped_overflow.value,
+    }
+
+
+def run(messages=8000):
+    return {f"p={n}": run_case(n, messages) for n in PRODUCERS}
+
+
+def main():
+    results = run()
+    print(f"{'caso':<8}{'msgs/s':>10}{'msgs/write':>12}{'p50 ms':>8}{'p99 ms':>8}{'entregues':>11}")
+    for name, r in results.items():
+        print(f"{name:<8}{r['msgs_per_s']:>10,.0f}{r['msgs_per_write']:>12.1f}{r['latency_p50_ms']:>8.2f}"
+              f"{r['latency_p99_ms']:>8.2f}{r['delivered']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark dos thumbnails da galeria (ThumbnailCache).
+
+Gera capturas sintéticas num diretório temporário e mede: geração a frio
+(draft + thumbnail + gravação no cache), leitura a quente do cache e a
+vazão pelo pool de workers (submit), com 1 e 2 workers.
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_thumbnails
+"""
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.stubs import quiet_logs
+from utils.thumbnail_cache import ThumbnailCache
+
+RESOLUTIONS = [(1280, 720), (1920, 1080)]
+
+
+def _make_captures(directory, count, width, height):
+    rng = np.random.default_rng(0)
+    base = (rng.random((height // 8, width // 8, 3)) * 255).astype(np.uint8)
+    image = Image.fromarray(base).resize((width, height), Image.BILINEAR)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"capture_{i:04d}.jpg")
+        image.save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+def _pool_rate(paths, cache_dir, workers):
+    cache = ThumbnailCache(cache_dir, max_workers=workers)
+    done = threading.Event()
+    remaining = [len(paths)]
+    lock = threading.Lock()
+
+    def on_ready(path, image):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+    start = time.perf_counter()
+    for path in paths:
+        cache.submit(path, on_ready)
+    done.wait(120)
+    elapsed = time.perf_counter() - start
+    cache.shutdown()
+    return len(paths) / elapsed
+
+
+def run(count=40):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, quiet_logs():
+        for width, height in RESOLUTIONS:
+            src = os.path.join(tmp, f"src_{width}")
+            os.makedirs(src)
+            paths = _make_captures(src, count, width, height)
+
+            cache = ThumbnailCache(os.path.join(tmp, f"cold_{width}"))
+            start = time.perf_counter()
+            for path in paths:
+                cache.load(path)
+            cold = (time.perf_counter() - start) / count * 1000
+            start = time.perf_counter()
+            for path in paths:
+                cache.load(path)
+            warm = (time.perf_counter() - start) / count * 1000
+            cache.shutdown()
+
+            results[f"{width}x{height}"] = {
+                "cold_ms": cold,
+                "warm_ms": warm,
+                "pool_1_per_s": _pool_rate(paths, os.path.join(tmp, f"p1_{width}"), 1),
+                "pool_2_per_s": _pool_rate(paths, os.path.join(tmp, f"p2_{width}"), 2),
+            }
+    return results
+
+
+def main():
+    results = run()
+    print(f"{'captura':<12}{'frio ms':>9}{'cache ms':>10}{'1 worker/s':>12}{'2 workers/s':>13}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['cold_ms']:>9.2f}{r['warm_ms']:>10.2f}{r['pool_1_per_s']:>12.0f}{r['pool_2_per_s']:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark da remontagem de frames UDP (VideoStreamUDP._receive_loop).
+
+Os datagramas são gerados em memória e entregues por um socket falso,
+então o número mede só o código de remontagem (sem kernel/rede). Varia
+um parâmetro por vez em torno do caso base: tamanho do fragmento, taxa
+de perda e frames em voo (fragmentos de N frames intercalados).
+
+Uso (na raiz do frontend):
+    python -m benchmarks.bench_udp_reassembly
+"""
+import os
+import random
+import struct
+import time
+
+from benchmarks.stubs import ReplaySocket, quiet_logs
+from core.video_stream import VideoStreamUDP
+
+FRAME_BYTES = 60_000  # JPEG típico de 640x480
+BASE = {"fragment": 1400, "loss": 0.0, "in_flight": 1}
+FRAGMENT_SIZES = [512, 1400, 4096, 8192]
+LOSS_RATES = [0.0, 0.01, 0.05]
+IN_FLIGHT = [1, 4, 16]
+
+
+def make_datagrams(frames, fragment, loss=0.0, in_flight=1, frame_bytes=FRAME_BYTES, seed=1):
+    """Datagramas no formato do emissor (!IHH + pedaço do JPEG)"""
+    rng = random.Random(seed)
+    payload = os.urandom(frame_bytes)
+    chunks = [payload[i:i + fragment] for i in range(0, frame_bytes, fragment)]
+    total = len(chunks)
+    datagrams = []
+    for group_start in range(0, frames, in_flight):
+        group = range(group_start, min(group_start + in_flight, frames))
+        for index in range(total):
+            for frame_id in group:  # round-robin entre os frames do grupo
+                if loss and rng.random() < loss:
+                    continue
+                datagrams.append(struct.pack(VideoStreamUDP.HEADER_FMT, frame_id, total, index) + chunks[index])
+    return datagrams
+
+
+def run_case(frames=300, **params):
+    cfg = dict(BASE, **params)
+    datagrams = make_datagrams(frames, cfg["fragment"], cfg["loss"], cfg["in_flight"])
+    received = []
+
+    stream = VideoStreamUDP(0)
+    stream.on_frame(received.append)
+    stream.sock = ReplaySocket(datagrams)
+    with quiet_logs():
+        start = time.perf_counter()
+        stream._receive_loop()
+        elapsed = time.perf_counter() - start
+        incomplete = len(stream.buffers)
+        stream.timeout = -1
+        stream._cleanup_expired()
+
+    return dict(
+        cfg,
+        datagrams=len(datagrams),
+        frames_complete=len(received),
+        frames_incomplete=incomplete,
+        datagrams_per_s=len(datagrams) / elapsed,
+        frames_per_s=len(received) / elapsed,
+        mb_per_s=sum(len(d) for d in datagrams) / elapsed / 1e6,
+    )
+
+
+def run(frames=300):
+    results = {}
+    for fragment in FRAGMENT_SIZES:
+        results[f"fragment={fragment}"] = run_case(frames, fragment=fragment)
+    for loss in LOSS_RATES[1:]:
+        results[f"loss={loss:g}"] = run_case(frames, loss=loss)
+    for in_flight in IN_FLIGHT[1:]:
+        results[f"in_flight={in_flight}"] = run_case(frames, in_flight=in_flight)
+    return results
+
+
+def main():
+    results = run()
+    print(f"frame de {FRAME_BYTES // 1000} KB; base: {BASE}")
+    print(f"{'caso':<16}{'dgram/s':>12}{'frames/s':>11}{'MB/s':>9}{'completos':>11}{'perdidos':>10}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['datagrams_per_s']:>12,.0f}{r['frames_per_s']:>11,.0f}{r['mb_per_s']:>9.0f}"
+              f"{r['frames_complete']:>11}{r['frames_incomplete']:>10}")
+
+
+if __name__ == "__main__":
+    main()
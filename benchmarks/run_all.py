@@ -0,0 +1,137 @@
+"""
+Roda a suíte de benchmarks e grava os resultados em JSON para comparar
+entre commits.
+
+Uso (na raiz do frontend):
+    python -m benchmarks.run_all                       # todos -> benchmarks/results/
+    python -m benchmarks.run_all --only udp_reassembly tcp_framing
+    python -m benchmarks.run_all --compare antes.json depois.json
+
+Sem display, os trechos que precisam de Tk ficam como null (ou use
+`xvfb-run python -m benchmarks.run_all`).
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# nome -> módulo (cada um expõe run() -> dict)
+BENCHMARKS = {
+    "udp_reassembly": "benchmarks.bench_udp_reassembly",
+    "tcp_framing": "benchmarks.bench_tcp_framing",
+    "decode_resize": "benchmarks.bench_decode_resize",
+    "backend_parse": "benchmarks.bench_backend_parse",
+    "commands": "benchmarks.bench_commands",
+    "network_core": "benchmarks.bench_network_core",
+    "tcp_send": "benchmarks.bench_tcp_send",
+    "thumbnails": "benchmarks.bench_thumbnails",
+    "log_render": "benchmarks.bench_log_render",
+    "log_formatting": "benchmarks.bench_log_formatting",
+    "sharpness": "benchmarks.bench_sharpness",
+    "startup": "benchmarks.bench_startup",
+}
+
+# Métricas em que maior é melhor (o resto é tempo: menor é melhor)
+HIGHER_IS_BETTER = ("per_s", "rate", "_rps")
+REGRESSION_PCT = 10.0
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def environment():
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or None,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "display": bool(os.getenv("DISPLAY")),
+        "timestamp": time.time(),
+    }
+
+
+def run_all(names):
+    results = {}
+    for name in names:
+        print(f"== {name}", flush=True)
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(BENCHMARKS[name])
+            results[name] = module.run()
+        except Exception as e:
+            traceback.print_exc()
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        print(f"   {time.perf_counter() - start:.1f} s", flush=True)
+    return results
+
+
+def _flatten(data, prefix=""):
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def compare(base_path, new_path):
+    """Imprime a variação de cada métrica numérica; retorna as regressões"""
+    base = _flatten(json.loads(Path(base_path).read_text(encoding="utf-8"))["results"])
+    new = _flatten(json.loads(Path(new_path).read_text(encoding="utf-8"))["results"])
+    regressions = []
+    print(f"{'métrica':<64}{'antes':>12}{'depois':>12}{'Δ%':>8}")
+    for key in sorted(base.keys() & new.keys()):
+        before, after = base[key], new[key]
+        if before == 0:
+            continue
+        delta = (after - before) / abs(before) * 100
+        higher_better = any(tag in key.rsplit(".", 1)[-1] for tag in HIGHER_IS_BETTER)
+        worse = -delta if higher_better else delta
+        flag = "  <-- regressão" if worse > REGRESSION_PCT else ""
+        if flag:
+            regressions.append(key)
+        print(f"{key:<64}{before:>12.3f}{after:>12.3f}{delta:>+8.1f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do frontend")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="rodar só estes benchmarks")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: benchmarks/results/<data>_<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTES", "DEPOIS"), help="compara dois resultados")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare) else 0
+
+    env = environment()
+    results = run_all(args.only or list(BENCHMARKS))
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        time.strftime("%Y%m%d_%H%M%S") + f"_{env['commit'] or 'nogit'}{'-dirty' if env['dirty'] else ''}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"environment": env, "results": results}, indent=2, ensure_ascii=False),
+                      encoding="utf-8")
+    print(f"resultados em {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
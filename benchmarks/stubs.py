@@ -0,0 +1,65 @@
+"""
+Substitutos locais usados pelos benchmarks: socket que reproduz datagramas
+e cliente TCP que grava os envios. O processamento de resultados sem Tk
+usa o próprio BackendRuntime com um RecordingPresenter (core.runtime).
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+LOGGER_PREFIX = "strawberry"
+
+
+class ReplaySocket:
+    """Entrega uma lista de datagramas via recvfrom e depois fecha (OSError)"""
+
+    def __init__(self, datagrams, addr=("127.0.0.1", 5005)):
+        self._it = iter(datagrams)
+        self._addr = addr
+
+    def recvfrom(self, bufsize):
+        try:
+            return next(self._it), self._addr
+        except StopIteration:
+            raise OSError("fim dos datagramas")
+
+    def close(self):
+        pass
+
+
+class RecordingTCPClient:
+    """Cliente TCP falso: guarda (ou repassa a `on_send`) o que seria enviado"""
+
+    def __init__(self, on_send=None):
+        self.sent = []
+        self.sock = None
+        self._connected = True
+        self._on_send = on_send
+        self._lock = threading.Lock()
+
+    def send(self, data: bytes):
+        if self._on_send is not None:
+            self._on_send(data)
+        else:
+            with self._lock:
+                self.sent.append(data)
+
+    def rtt_ms(self):
+        return None
+
+
+@contextmanager
+def quiet_logs(level=logging.WARNING):
+    """Sobe o nível dos loggers do app durante a medição (sem spam no console)"""
+    loggers = [
+        logging.getLogger(name) for name in list(logging.root.manager.loggerDict)
+        if name.startswith(LOGGER_PREFIX)
+    ]
+    previous = [lg.level for lg in loggers]
+    for lg in loggers:
+        lg.setLevel(level)
+    try:
+        yield
+    finally:
+        for lg, lvl in zip(loggers, previous):
+            lg.setLevel(lvl)
@@ -0,0 +1,325 @@
+"""
+Núcleo de rede opcional em asyncio: uma única thread ("Net-Loop") com o
+canal TCP de controle, o vídeo (DatagramProtocol para UDP, StreamReader
+para TCP), os timeouts de comandos e as tarefas periódicas. Substitui as
+threads bloqueantes por conexão do modo "threads" (padrão).
+
+Os frames são decodificados no próprio loop, como no receptor do modo
+threads: repassar cada frame a uma thread de decodificação custou ~4x
+mais trocas de contexto (bench_network_core). O presenter é chamado da
+thread do loop e repassa para o Tk (UiDispatchQueue); no sentido
+contrário, `call_soon`/`submit` são seguros a partir de qualquer thread.
+"""
+import asyncio
+import socket
+import struct
+import threading
+import time
+from typing import Callable, List, Optional
+
+from core.network import CONNECT_TIMEOUT_S, TCPClient, backoff_delay
+from utils.logger import network_logger, video_logger
+from utils.metrics import metrics
+
+CONTROL_LINE_LIMIT = 4 * 1024 * 1024  # respostas de LOGS chegam numa linha só
+
+
+class AsyncNetworkCore:
+    """Loop de eventos numa thread daemon, com ponte segura para as demais threads"""
+
+    def __init__(self, name: str = "Net-Loop"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._transports = []
+
+    # ============================
+    # Ciclo de vida / ponte entre threads
+    # ============================
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        network_logger.info("Núcleo de rede asyncio iniciado")
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def stop(self, timeout: float = 2.0):
+        if self.loop is None or self._thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout)
+        except Exception as e:
+            network_logger.debug(f"Erro encerrando tarefas do loop: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        network_logger.info("Núcleo de rede asyncio parado")
+
+    async def _shutdown(self):
+        for transport in self._transports:
+            transport.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def call_soon(self, func: Callable, *args):
+        """Executa `func` na thread do loop (chamável de qualquer thread)"""
+        self.loop.call_soon_threadsafe(func, *args)
+
+    def call_later(self, delay: float, func: Callable, *args):
+        """Timer do loop; serve de scheduler para o CommandHandler"""
+        self.loop.call_soon_threadsafe(self.loop.call_later, delay, func, *args)
+
+    def submit(self, coro):
+        """Agenda uma coroutine; retorna um concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def spawn(self, coro):
+        """Tarefa de longa duração, cancelada em stop()"""
+        def create():
+            self._tasks.append(self.loop.create_task(coro))
+        self.call_soon(create)
+
+    def every(self, interval: float, func: Callable, *args):
+        """Tarefa periódica (ex.: limpeza dos frames UDP incompletos)"""
+        async def periodic():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    func(*args)
+                except Exception as e:
+                    network_logger.error(f"Erro em tarefa periódica {getattr(func, '__name__', func)}: {e}")
+        self.spawn(periodic())
+
+    # ============================
+    # Vídeo
+    # ============================
+    def attach_udp_video(self, stream):
+        """Recebe o vídeo UDP de `stream` (VideoStreamUDP) por um DatagramProtocol"""
+        class _Protocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                try:
+                    done = stream._handle_datagram(data)
+                    if done is not None:
+                        stream._emit(*done)
+                except Exception as e:
+                    video_logger.error(f"Erro no datagrama de vídeo (UDP): {e}")
+
+            def error_received(self, exc):
+                video_logger.debug(f"Erro no socket UDP: {exc}")
+
+        async def open_endpoint():
+            transport, _ = await self.loop.create_datagram_endpoint(
+                _Protocol, local_addr=("0.0.0.0", stream.listen_port)
+            )
+            self._transports.append(transport)
+            video_logger.info(f"Vídeo UDP (asyncio) na porta {stream.listen_port}")
+
+        self.submit(open_endpoint()).result(5.0)
+        self.every(0.5, stream._cleanup_expired)
+
+    def attach_tcp_video(self, stream):
+        """Recebe o vídeo TCP de `stream` (VideoStreamTCP) por um StreamReader"""
+        self.spawn(self._tcp_video(stream))
+
+    async def _tcp_video(self, stream):
+        while True:
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(stream.host, stream.port), CONNECT_TIMEOUT_S
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                video_logger.warning(f"Erro de conexão TCP: {e}. Reconectando em {stream.reconnect_sec}s...")
+                await asyncio.sleep(stream.reconnect_sec)
+                continue
+
+            video_logger.info("✅ Conectado ao servidor de vídeo TCP (asyncio)")
+            try:
+                while True:
+                    (nbytes,) = struct.unpack("!I", await reader.readexactly(4))
+                    first_at = time.perf_counter()
+                    sent_at = None
+                    if nbytes & stream.TS_FLAG:
+                        nbytes &= ~stream.TS_FLAG
+                        (sent_at,) = struct.unpack("!d", await reader.readexactly(8))
+                    jpg = await reader.readexactly(nbytes)
+                    stream._emit(jpg, None, first_at, sent_at)
+            except asyncio.IncompleteReadError:
+                video_logger.warning("Conexão TCP fechada pelo servidor")
+            except OSError as e:
+                video_logger.warning(f"Erro de conexão TCP: {e}")
+            finally:
+                writer.close()
+            await asyncio.sleep(stream.reconnect_sec)
+
+
+class AsyncTCPClient(TCPClient):
+    """
+    Canal de controle no loop do AsyncNetworkCore, com os mesmos endpoints,
+    backoff e fila de envio do TCPClient. `send` só enfileira: o loop
+    escreve um lote por vez e espera o drain antes do próximo.
+    """
+
+    def __init__(self, core: AsyncNetworkCore, host, port, reconnect_delay=2, **options):
+        super().__init__(host, port, reconnect_delay, **options)
+        self.core = core
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._flush_scheduled = False
+        self.m_dropped_lost = metrics.counter(
+            "tcp_send_dropped_total", "Mensagens descartadas da fila de envio", {"reason": "lost"}
+        )
+
+    def run(self, on_line: Callable[[str], None], on_connect: Optional[Callable[[], None]] = None):
+        """Inicia a tarefa de conexão/leitura no loop"""
+        self.core.spawn(self._control(on_line, on_connect))
+
+    async def _open(self):
+        """Uma rodada pelos endpoints (failover imediato); None se todos falharem"""
+        for _ in range(len(self.endpoints)):
+            host, port = self.endpoints[self._endpoint_index]
+            try:
+                return await asyncio.wait_for(
+                    asyncio.open_connection(host, port, limit=CONTROL_LINE_LIMIT), CONNECT_TIMEOUT_S
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                self.m_connect_failures.inc()
+                network_logger.warning(f"⚠️ Erro TCP em {host}:{port}: {e or 'timeout'}")
+            if len(self.endpoints) > 1:
+                self._endpoint_index = (self._endpoint_index + 1) % len(self.endpoints)
+                self.m_failovers.inc()
+        return None
+
+    async def _control(self, on_line, on_connect):
+        network_logger.info(f"Conectando ao backend em {self.host}:{self.port}...")
+        while not self._closed:
+            opened = await self._open()
+            if opened is None:
+                delay = backoff_delay(self.reconnect_attempts, self.reconnect_delay, self.max_backoff)
+                self.reconnect_attempts += 1
+                network_logger.info(f"Tentando novamente em {delay:.1f}s (rodada {self.reconnect_attempts})...")
+                await asyncio.sleep(delay)
+                continue
+            reader, writer = opened
+            self.reconnect_attempts = 0
+
+            sock = writer.get_extra_info("socket")
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.host, self.port = self.endpoints[self._endpoint_index]
+            # Sem folga no transporte: o drain só volta quando o lote chegou ao socket
+            writer.transport.set_write_buffer_limits(high=0)
+            self.sock = sock
+            self._writer = writer
+            self._connected = True
+            self._connected_event.set()
+            self.m_connects.inc()
+            network_logger.info(f"✅ TCP conectado em {self.host}:{self.port}")
+            self._flush_queue()
+            if on_connect is not None:
+                on_connect()
+
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        network_logger.warning("Conexão fechada pelo servidor")
+                        break
+                    line = line.strip()
+                    if not line:
+                        continue
+                    self.m_messages_received.inc()
+                    try:
+                        on_line(line.decode("utf-8"))
+                    except UnicodeDecodeError:
+                        network_logger.warning("Mensagem com encoding inválido recebida")
+            except (OSError, ValueError) as e:
+                # ValueError: linha acima de CONTROL_LINE_LIMIT
+                network_logger.error(f"Erro recebendo resultado: {e}")
+            finally:
+                self._connected = False
+                self._connected_event.clear()
+                self._writer = None
+                self.sock = None
+                writer.close()
+            await asyncio.sleep(backoff_delay(0, self.reconnect_delay, self.max_backoff))
+
+    def start(self):
+        # A conexão é mantida pela tarefa de run()
+        pass
+
+    def send(self, data: bytes) -> bool:
+        """
+        Enfileira (chamável de qualquer thread); um único flush por volta
+        do loop escreve tudo o que acumulou num write só
+        """
+        if self._closed:
+            network_logger.debug(f"Cliente TCP fechado: {len(data)} bytes descartados")
+            return False
+        connected = self._connected
+        self._enqueue(data, block=connected and self._may_block())
+        with self._queue_cond:
+            scheduled, self._flush_scheduled = self._flush_scheduled, True
+        if not scheduled:
+            self.core.call_soon(self._flush_queue)
+        return connected
+
+    def _may_block(self) -> bool:
+        # Nunca espera na thread do loop (quem esvazia a fila é ela)
+        return super()._may_block() and threading.current_thread() is not self.core._thread
+
+    def _flush_queue(self):
+        """
+        Escreve um lote e espera o drain antes do próximo: a fila limitada
+        (e não o buffer do transporte) segura o que ainda não foi escrito
+        """
+        with self._queue_cond:
+            self._flush_scheduled = False
+            if self._writing:
+                return  # o fim do drain em andamento chama o próximo flush
+            writer = self._writer
+            if writer is None or writer.is_closing():
+                return  # fica na fila até a próxima conexão
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._writing = True
+        started = time.perf_counter()
+        writer.write(b"".join(self._frame(data) for _, data in batch))
+        self.core.loop.create_task(self._drain_batch(writer, batch, started))
+
+    async def _drain_batch(self, writer, batch, started):
+        try:
+            await writer.drain()
+        except OSError as e:
+            # Não dá para saber o que chegou: o lote não é reenviado (nada executa duas vezes)
+            self.m_send_errors.inc()
+            self.m_dropped_lost.inc(len(batch))
+            network_logger.error(f"❌ Falha ao enviar via TCP: {e} ({len(batch)} mensagens perdidas)")
+        else:
+            self._record_batch(batch, started)
+        finally:
+            with self._queue_cond:
+                self._writing = False
+                self._queue_cond.notify_all()
+        self._flush_queue()
+
+    def close(self):
+        self._closed = True
+        self._connected = False
+        writer = self._writer
+        if writer is not None and self.core.loop is not None and not self.core.loop.is_closed():
+            self.core.call_soon(writer.close)
+        network_logger.info("Conexão TCP fechada")
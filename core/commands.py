@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional, Callable
 from dataclasses import dataclass
 
 from utils.logger import command_logger
+from utils.metrics import metrics
 
 @dataclass
 class Command:
@@ -27,6 +28,13 @@ class CommandHandler:
         self.udp_port = udp_port
         self.pending_commands: Dict[str, Command] = {}
         self.executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="CmdHandler") 
+        # call_later(delay, func, *args) de um loop de eventos; sem ele os
+        # timeouts usam uma thread do executor por comando
+        self.scheduler: Optional[Callable] = None
+
+        self.m_timeouts = metrics.counter("command_timeouts_total", "Comandos sem resposta dentro do timeout")
+        self.m_rtt = metrics.histogram("command_rtt_seconds", "Tempo entre envio do comando e a resposta")
+        metrics.gauge("commands_pending", "Comandos aguardando resposta", fn=lambda: len(self.pending_commands))
         command_logger.debug(f"CommandHandler inicializado (UDP port: {udp_port})")
 
     def _generate_command_id(self) -> str:
@@ -44,9 +52,17 @@ class CommandHandler:
             command_logger.error(f"Erro no registro UDP: {e}")
 
     def send_capture(self, callback: Optional[Callable] = None) -> str:
-        """Envia comando de captura"""
+        """Envia comando de captura (o backend grava o arquivo)"""
         return self._send_command("CAPTURE", {}, callback)
 
+    def send_analyze_frame(self, frame_id: Optional[int] = None, callback: Optional[Callable] = None) -> str:
+        """
+        Pede só a análise de um frame já salvo pelo frontend (o backend não
+        grava arquivo). `frame_id` só quando o id veio do backend (vídeo UDP).
+        """
+        data = {"frame_id": frame_id} if frame_id is not None else {}
+        return self._send_command("ANALYZE_FRAME", data, callback)
+
     def send_wifi_connect(self, ssid: str, password: str, callback: Optional[Callable] = None) -> str:
         """Envia comando de conexão Wi-Fi"""
         return self._send_command("WIFI_CONNECT", {"ssid": ssid, "password": password}, callback)
@@ -82,14 +98,19 @@ class CommandHandler:
                 command_str = f"SHOW_LOGS:{command_id}:{data['lines']}:{data.get('log_type', 'all')}"
             elif command_name == "RESTART_SERVICE":
                 command_str = f"RESTART_SERVICE:{command_id}"
+            elif command_name == "ANALYZE_FRAME" and "frame_id" in data:
+                command_str = f"ANALYZE_FRAME:{command_id}:{data['frame_id']}"
             else:
                 command_str = f"{command_name}:{command_id}"
             
             self.tcp_client.send(command_str.encode('utf-8'))
+            metrics.counter("commands_sent_total", "Comandos enviados ao backend", {"command": command_name}).inc()
             command_logger.info(f"Comando enviado: {command_name} (ID: {command_id})")
             
+            if self.scheduler is not None:
+                self.scheduler(command.timeout, self._expire, command.id)
             # Inicia thread de timeout APENAS se tiver callback
-            if callback:
+            elif callback:
                 self.executor.submit(self._wait_for_response, command)
             else:
                 # Para comandos sem callback, remove após timeout
@@ -122,15 +143,35 @@ class CommandHandler:
         
         # Timeout
         if command.id in self.pending_commands:
+            self.m_timeouts.inc()
             command_logger.warning(f"Timeout no comando: {command.name} (ID: {command.id})")
             if command.callback:
                 command.callback(False, "Timeout", {})
             del self.pending_commands[command.id]
 
+    def _expire(self, command_id: str):
+        """Timeout agendado pelo scheduler: mesmo efeito de _wait_for_response/_cleanup_command"""
+        command = self.pending_commands.pop(command_id, None)
+        if command is None:
+            return
+        if command.callback:
+            self.m_timeouts.inc()
+            command_logger.warning(f"Timeout no comando: {command.name} (ID: {command.id})")
+            try:
+                command.callback(False, "Timeout", {})
+            except Exception as e:
+                command_logger.error(f"Erro no callback do comando {command.name}: {e}")
+        else:
+            command_logger.debug(f"Limpando comando sem callback: {command.name}")
+
     def handle_response(self, command_id: str, success: bool, message: str, data: Any = None):
         """Processa resposta do backend"""
         if command_id in self.pending_commands:
             command = self.pending_commands[command_id]
+            self.m_rtt.observe(time.time() - command.timestamp)
+            metrics.counter(
+                "command_responses_total", "Respostas de comando recebidas", {"success": str(bool(success)).lower()}
+            ).inc()
             
             try:
                 if command.callback:
@@ -0,0 +1,94 @@
+"""
+Anel com os últimos frames JPEG recebidos (bytes originais, sem re-encode)
+e escolha do frame mais nítido na hora da captura
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+def sharpness_score(jpeg_bytes: bytes) -> float:
+    """
+    Variância do Laplaciano da imagem em tons de cinza, decodificada já
+    reduzida a 1/4 pelo libjpeg (sem decodificar a resolução cheia).
+    Quanto maior, mais nítida. Retorna 0.0 se o JPEG for inválido.
+    """
+    import cv2
+    import numpy as np
+
+    gray = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if gray is None:
+        return 0.0
+    _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S, ksize=1))
+    return float(std[0][0]) ** 2
+
+
+@dataclass
+class RingFrame:
+    frame_id: int
+    jpeg: bytes
+    received_at: float
+    sharpness: Optional[float] = None  # calculada sob demanda e guardada
+
+    def score(self) -> float:
+        if self.sharpness is None:
+            self.sharpness = sharpness_score(self.jpeg)
+        return self.sharpness
+
+
+class FrameRing:
+    """
+    Guarda os `capacity` frames mais recentes. Escrito pela thread de
+    recepção de vídeo e lido pela captura; acesso protegido por lock.
+    """
+
+    def __init__(self, capacity: int = 8):
+        self.capacity = capacity
+        self._frames = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def append(self, frame_id: int, jpeg: bytes, received_at: Optional[float] = None) -> RingFrame:
+        frame = RingFrame(frame_id, jpeg, received_at if received_at is not None else time.time())
+        with self._lock:
+            self._frames.append(frame)
+        return frame
+
+    def latest(self) -> Optional[RingFrame]:
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def get(self, frame_id: int) -> Optional[RingFrame]:
+        """Frame com o id informado, se ainda estiver no anel"""
+        with self._lock:
+            for frame in reversed(self._frames):
+                if frame.frame_id == frame_id:
+                    return frame
+        return None
+
+    def sharpest(self, max_age: Optional[float] = None, now: Optional[float] = None) -> Optional[RingFrame]:
+        """
+        Frame mais nítido do anel (opcionalmente só os recebidos há no
+        máximo `max_age` segundos). Cada frame é pontuado uma única vez.
+        """
+        frames = self.snapshot()
+        if max_age is not None:
+            now = now if now is not None else time.time()
+            recent = [f for f in frames if now - f.received_at <= max_age]
+            frames = recent or frames[-1:]
+        if not frames:
+            return None
+        return max(frames, key=RingFrame.score)
+
+    def snapshot(self):
+        """Cópia dos frames, do mais antigo ao mais recente"""
+        with self._lock:
+            return list(self._frames)
+
+    def __len__(self):
+        return len(self._frames)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
@@ -0,0 +1,81 @@
+"""
+Modo headless: roda o pipeline completo (TCP, comandos, vídeo e
+processamento de resultados) sem display, com um RecordingPresenter no
+lugar da UI. Útil para testes de longa duração e benchmarks em nós sem X.
+
+Uso (na raiz do frontend):
+    python main.py --headless [--duration 600]
+    STRAWBERRY_HEADLESS=1 python main.py
+"""
+import json
+import signal
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from core.runtime import BackendRuntime, Presenter, RecordingPresenter
+from utils.logger import frontend_logger
+from utils.metrics import start_metrics_server
+
+SUMMARY_INTERVAL_S = 60.0
+
+
+def _summary(runtime: BackendRuntime, presenter: Presenter, started: float) -> Dict[str, Any]:
+    stream = runtime.video_stream
+    summary = {
+        "uptime_s": round(time.monotonic() - started, 1),
+        "transport": runtime.video_transport,
+        "tcp_connected": bool(getattr(runtime.tcp_client, "_connected", False)),
+        "raspberry": runtime.raspberry_info.get("ip"),
+        "frames_received": getattr(getattr(stream, "m_frames", None), "value", None),
+    }
+    if isinstance(presenter, RecordingPresenter):
+        summary["events"] = presenter.snapshot()["counts"]
+    return summary
+
+
+def run_headless(config: Dict[str, Any], duration: Optional[float] = None,
+                 presenter: Optional[Presenter] = None) -> Dict[str, Any]:
+    """
+    Roda até SIGINT/SIGTERM ou até `duration` segundos; loga um resumo a
+    cada SUMMARY_INTERVAL_S e retorna o resumo final.
+    """
+    presenter = presenter if presenter is not None else RecordingPresenter()
+    runtime = BackendRuntime(config, presenter=presenter)
+    stop = threading.Event()
+
+    def on_signal(signum, _frame):
+        frontend_logger.info(f"Sinal {signal.Signals(signum).name} recebido, encerrando modo headless")
+        stop.set()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, on_signal)
+        signal.signal(signal.SIGTERM, on_signal)
+
+    metrics_server = start_metrics_server(config)
+    started = time.monotonic()
+    deadline = started + duration if duration else None
+    frontend_logger.info("Modo headless iniciado" + (f" por {duration:.0f} s" if duration else ""))
+    runtime.start()
+    try:
+        while not stop.is_set():
+            timeout = SUMMARY_INTERVAL_S
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+            if stop.wait(timeout) or (deadline is not None and time.monotonic() >= deadline):
+                break
+            frontend_logger.info(f"Headless: {json.dumps(_summary(runtime, presenter, started))}")
+    finally:
+        try:
+            runtime.commands.cleanup()
+        except Exception as e:
+            frontend_logger.debug(f"Erro limpando comandos: {e}")
+        runtime.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+
+    summary = _summary(runtime, presenter, started)
+    frontend_logger.info(f"Modo headless encerrado: {json.dumps(summary)}")
+    return summary
@@ -1,9 +1,28 @@
+from collections import deque
 from enum import Enum
 import json
+import random
+import select
 import socket
+import struct
+import threading
 import time
 from utils.logger import network_logger
-from typing import Any, Dict, Optional, Callable
+from utils.metrics import metrics
+from typing import Any, Dict, List, Optional, Callable, Tuple
+
+# struct tcp_info: 8 campos u8 seguidos de u32; tcpi_rtt (µs) é o 16º u32
+_TCPI_RTT_OFFSET = 8 + 15 * 4
+
+CONNECT_TIMEOUT_S = 5.0
+DEFAULT_MAX_BACKOFF_S = 30.0
+DEFAULT_SEND_QUEUE = 100  # mensagens guardadas enquanto desconectado
+DEFAULT_MESSAGE_TTL_S = 10.0  # mensagens mais velhas que isso não são enviadas
+DEFAULT_SEND_BLOCK_S = 0.5  # espera máxima do send() com a fila cheia
+MESSAGE_DELIMITER = b"\n"
+MAX_BATCH_BYTES = 64 * 1024  # limite de um lote
+DEFAULT_WRITE_TIMEOUT_S = 5.0  # prazo para escrever um lote inteiro
+_SEND_FLAGS = getattr(socket, "MSG_DONTWAIT", 0)
 
 class ConnectionState(Enum):
     DISCONNECTED = "disconnected"
@@ -11,89 +30,367 @@ class ConnectionState(Enum):
     CONNECTED = "connected"
     ERROR = "error"
 
+def parse_endpoints(host, port, extra=None) -> List[Tuple[str, int]]:
+    """
+    Endpoint principal seguido dos alternativos, sem repetição. Aceita
+    "host:porta", [host, porta] ou {"host": ..., "port": ...}.
+    """
+    endpoints = [(host, int(port))]
+    for item in extra or []:
+        if isinstance(item, str):
+            h, _, p = item.rpartition(":")
+            ep = (h, int(p))
+        elif isinstance(item, dict):
+            ep = (item["host"], int(item.get("port", port)))
+        else:
+            ep = (item[0], int(item[1]))
+        if ep not in endpoints:
+            endpoints.append(ep)
+    return endpoints
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Espera exponencial limitada a `cap`, com jitter: metade fixa, metade aleatória"""
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.random() * delay / 2
+
+
 class TCPClient:
-    def __init__(self, host, port, reconnect_delay=2, max_reconnect_attempts=5):
-        self.host = host
-        self.port = port
+    """
+    Canal de controle com o backend. A conexão é mantida por uma thread
+    ("TCP-Connect") que tenta os endpoints em sequência (failover imediato)
+    e, após uma rodada sem sucesso, espera com backoff exponencial e jitter.
+    `send` nunca espera a conexão: as mensagens vão para uma fila limitada
+    e uma única thread ("TCP-Writer") as escreve com delimitador, várias
+    por escrita; desconectado, ficam na fila enquanto estiverem no prazo.
+    """
+
+    def __init__(self, host, port, reconnect_delay=2, max_reconnect_attempts=5, endpoints=None,
+                 max_backoff=DEFAULT_MAX_BACKOFF_S, send_queue=DEFAULT_SEND_QUEUE, message_ttl=DEFAULT_MESSAGE_TTL_S,
+                 send_block=DEFAULT_SEND_BLOCK_S, write_timeout=DEFAULT_WRITE_TIMEOUT_S):
+        self.endpoints = parse_endpoints(host, port, endpoints)
+        self.host, self.port = self.endpoints[0]
+        self._endpoint_index = 0
         self.sock: Optional[socket.socket] = None
         self.reconnect_delay = reconnect_delay
-        self.reconnect_delay = reconnect_delay
+        self.max_backoff = max_backoff
         self.max_reconnect_attempts = max_reconnect_attempts
-        self.reconnect_attempts = 0
+        self.reconnect_attempts = 0  # rodadas seguidas sem conexão (expoente do backoff)
+        self.message_ttl = message_ttl
         self._connected = False
+        self._connected_event = threading.Event()
+        self._wake = threading.Event()  # desconexão ou close(): acorda o gerenciador
+        self._closed = False
+        self._manager: Optional[threading.Thread] = None
+        self._writer: Optional[threading.Thread] = None
+        self._queue: deque = deque()  # (instante do send, dados)
+        self._queue_max = send_queue
+        self._queue_cond = threading.Condition()
+        self._writing = False
+        self.send_block = send_block
+        self.write_timeout = write_timeout
         self._message_handlers: list[Callable] = []
-        network_logger.debug(f"TCPClient inicializado: {host}:{port}")
+        self._connect_handlers: list[Callable] = []
+
+        self.m_connects = metrics.counter("tcp_connects_total", "Conexões TCP de controle estabelecidas")
+        self.m_connect_failures = metrics.counter("tcp_connect_failures_total", "Tentativas de conexão TCP que falharam")
+        self.m_failovers = metrics.counter("tcp_failovers_total", "Trocas de endpoint após falha de conexão")
+        self.m_bytes_sent = metrics.counter("tcp_bytes_sent_total", "Bytes enviados no canal de controle")
+        self.m_send_errors = metrics.counter("tcp_send_errors_total", "Falhas de envio no canal de controle")
+        self.m_queued = metrics.counter("tcp_send_queued_total", "Mensagens enfileiradas para envio")
+        self.m_batches = metrics.counter("tcp_write_batches_total", "Lotes escritos no socket")
+        self.m_write = metrics.histogram("tcp_write_seconds", "Duração da escrita de cada lote")
+        self.m_send_latency = metrics.histogram(
+            "tcp_send_latency_seconds", "Tempo entre o send() e a escrita da mensagem no socket"
+        )
+        self.m_dropped_overflow = metrics.counter(
+            "tcp_send_dropped_total", "Mensagens descartadas da fila de envio", {"reason": "overflow"}
+        )
+        self.m_dropped_expired = metrics.counter(
+            "tcp_send_dropped_total", "Mensagens descartadas da fila de envio", {"reason": "expired"}
+        )
+        self.m_messages_received = metrics.counter("tcp_messages_received_total", "Mensagens recebidas do backend")
+        metrics.gauge("tcp_connected", "1 se o canal de controle está conectado", fn=lambda: int(self._connected))
+        metrics.gauge("tcp_send_queue_depth", "Mensagens à espera da thread de escrita", fn=lambda: len(self._queue))
+        network_logger.debug(f"TCPClient inicializado: {', '.join(f'{h}:{p}' for h, p in self.endpoints)}")
 
     def add_message_handler(self, handler: Callable):
         """Adiciona handler para mensagens recebidas"""
         self._message_handlers.append(handler)
 
-    def connect(self):
-        """Conecta ao servidor TCP"""
+    def add_connect_handler(self, handler: Callable):
+        """Chamado na thread do gerenciador a cada conexão (inclusive reconexões)"""
+        self._connect_handlers.append(handler)
+
+    # ============================
+    # Gerenciador de conexão
+    # ============================
+    def start(self):
+        """
+        Inicia as threads de conexão (reconecta em background) e de escrita.
+        Depois de close() não faz nada: o cliente encerrado não volta a conectar.
+        """
+        if self._closed or (self._manager and self._manager.is_alive()):
+            return
+        self._manager = threading.Thread(target=self._manage, name="TCP-Connect", daemon=True)
+        self._manager.start()
+        self._writer = threading.Thread(target=self._write_loop, name="TCP-Writer", daemon=True)
+        self._writer.start()
+
+    def _manage(self):
         network_logger.info(f"Conectando ao backend em {self.host}:{self.port}...")
-        while not self._connected:
+        while not self._closed:
+            self._wake.clear()
+            if self._connected:
+                self._wake.wait()
+                continue
+            if self._connect_once():
+                self.reconnect_attempts = 0
+                self._after_connect()
+                continue
+            delay = backoff_delay(self.reconnect_attempts, self.reconnect_delay, self.max_backoff)
+            self.reconnect_attempts += 1
+            network_logger.info(f"Tentando novamente em {delay:.1f}s (rodada {self.reconnect_attempts})...")
+            self._wake.wait(delay)
+
+    def _connect_once(self) -> bool:
+        """Uma rodada pelos endpoints, a partir do último que funcionou"""
+        for _ in range(len(self.endpoints)):
+            if self._closed:
+                return False
+            host, port = self.endpoints[self._endpoint_index]
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5.0)  # Timeout para conexão
-                sock.connect((self.host, self.port))
-                
+                sock = socket.create_connection((host, port), timeout=CONNECT_TIMEOUT_S)
+
                 # Configurações de socket
                 sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
                 sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-                
-                self.sock = sock
-                self._connected = True
-                
-                network_logger.info(f"✅ TCP conectado em {self.host}:{self.port}")
-                return
-                
             except socket.timeout:
-                network_logger.warning(f"Timeout conectando em {self.host}:{self.port}")
+                network_logger.warning(f"Timeout conectando em {host}:{port}")
             except ConnectionRefusedError:
-                network_logger.warning(f"Conexão recusada em {self.host}:{self.port}")
+                network_logger.warning(f"Conexão recusada em {host}:{port}")
             except Exception as e:
                 network_logger.warning(f"⚠️ Erro TCP: {e}")
-            
-            network_logger.info(f"Tentando novamente em {self.reconnect_delay}s...")
-            time.sleep(self.reconnect_delay)
+            else:
+                self.host, self.port = host, port
+                self.sock = sock
+                self._connected = True
+                self._connected_event.set()
+                self.m_connects.inc()
+                network_logger.info(f"✅ TCP conectado em {host}:{port}")
+                return True
 
-    def ensure_connection(self):
-        """Garante que há uma conexão ativa"""
-        if not self._connected or not self.sock:
-            return self.connect_with_retry()
-        return True
+            self.m_connect_failures.inc()
+            if len(self.endpoints) > 1:
+                self._endpoint_index = (self._endpoint_index + 1) % len(self.endpoints)
+                self.m_failovers.inc()
+                next_host, next_port = self.endpoints[self._endpoint_index]
+                network_logger.info(f"Failover para {next_host}:{next_port}")
+        return False
 
-    def connect_with_retry(self):
-        """Tenta conectar com múltiplas tentativas"""
-        while self.reconnect_attempts < self.max_reconnect_attempts:
+    def _after_connect(self):
+        # A thread de escrita envia o que ficou na fila
+        with self._queue_cond:
+            self._queue_cond.notify_all()
+        for handler in self._connect_handlers:
             try:
-                self.connect()
-                self.reconnect_attempts = 0
-                return True
+                handler()
             except Exception as e:
-                self.reconnect_attempts += 1
-                network_logger.warning(f"Tentativa {self.reconnect_attempts}/{self.max_reconnect_attempts} falhou: {e}")
-                time.sleep(self.reconnect_delay)
+                network_logger.error(f"Erro no handler de conexão: {e}")
+
+    def mark_disconnected(self, sock=None):
+        """
+        Conexão perdida (erro ou recv vazio): fecha o socket e acorda o
+        gerenciador. Com `sock`, só age se ele ainda for o socket atual.
+        """
+        if sock is not None and sock is not self.sock:
+            return
+        was_connected = self._connected
+        self._connected = False
+        self._connected_event.clear()
+        old, self.sock = self.sock, None
+        if old is not None:
+            try:
+                old.close()
+            except OSError:
+                pass
+        if was_connected:
+            network_logger.warning(f"Conexão TCP com {self.host}:{self.port} perdida")
+        with self._queue_cond:
+            self._queue_cond.notify_all()  # quem espera espaço na fila não espera mais
+        self._wake.set()
+
+    def connect(self, timeout: Optional[float] = None) -> bool:
+        """Inicia o gerenciador e espera a conexão (sem timeout: até conectar ou close())"""
+        self.start()
+        return self.wait_connected(timeout)
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._closed:
+            remaining = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
+            if remaining <= 0:
+                return False
+            if self._connected_event.wait(remaining):
+                return True
         return False
 
-    def send(self, data: bytes):
-        """Envia dados via TCP"""
-        if not self._connected or not self.sock:
-            network_logger.debug("Socket TCP não conectado, tentando reconectar...")
-            self._connected = False
-            self.connect()
-            
+    def ensure_connection(self):
+        """Garante que o gerenciador está rodando; retorna se há conexão agora"""
+        self.start()
+        return self._connected
+
+    def connect_with_retry(self):
+        """Espera a conexão por até max_reconnect_attempts rodadas de reconexão"""
+        return self.connect(timeout=self.max_reconnect_attempts * self.max_backoff)
+
+    # ============================
+    # Envio (fila + thread de escrita)
+    # ============================
+    def send(self, data: bytes) -> bool:
+        """
+        Enfileira `data` para a thread de escrita e retorna se há conexão
+        agora. Com a fila cheia e conectado, espera até `send_block` s por
+        espaço (backpressure); depois disso descarta a mensagem mais antiga.
+        Na thread do Tk nunca espera: descarta a mais antiga na hora.
+        Depois de close() retorna False sem enfileirar.
+        """
+        if self._closed:
+            network_logger.debug(f"Cliente TCP fechado: {len(data)} bytes descartados")
+            return False
+        connected = self._connected
+        self._enqueue(data, block=connected and self._may_block())
+        self.start()
+        return connected
+
+    def _may_block(self) -> bool:
+        # A thread principal roda o mainloop do Tk (UI, exit_app)
+        return threading.current_thread() is not threading.main_thread()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a fila esvaziar e o lote em andamento ser escrito"""
+        with self._queue_cond:
+            return self._queue_cond.wait_for(lambda: not self._queue and not self._writing, timeout)
+
+    def _frame(self, data: bytes) -> bytes:
+        # Cada mensagem termina no delimitador: o backend separa comandos
+        # que chegam juntos no mesmo recv
+        return data if data.endswith(MESSAGE_DELIMITER) else data + MESSAGE_DELIMITER
+
+    def _enqueue(self, data: bytes, block: bool = False):
+        with self._queue_cond:
+            if self._queue_max and len(self._queue) >= self._queue_max:
+                if block:
+                    self._queue_cond.wait_for(
+                        lambda: len(self._queue) < self._queue_max or self._closed or not self._connected,
+                        self.send_block
+                    )
+                if len(self._queue) >= self._queue_max:
+                    self._queue.popleft()
+                    self.m_dropped_overflow.inc()
+                    network_logger.warning("Fila de envio TCP cheia, mensagem mais antiga descartada")
+            self._queue.append((time.monotonic(), data))
+            self._queue_cond.notify_all()
+        self.m_queued.inc()
+        if not self._connected:
+            network_logger.debug(f"Sem conexão TCP: {len(data)} bytes na fila ({len(self._queue)} mensagens)")
+
+    def _take_batch(self) -> list:
+        """
+        Retira da fila (lock já adquirido) as mensagens no prazo, até
+        MAX_BATCH_BYTES; as vencidas são descartadas
+        """
+        batch, size, now = [], 0, time.monotonic()
+        while self._queue and (not batch or size + len(self._queue[0][1]) <= MAX_BATCH_BYTES):
+            queued_at, data = self._queue.popleft()
+            if now - queued_at > self.message_ttl:
+                self.m_dropped_expired.inc()
+                network_logger.debug(f"Mensagem da fila TCP expirada ({len(data)} bytes)")
+                continue
+            batch.append((queued_at, data))
+            size += len(data) + len(MESSAGE_DELIMITER)
+        self._queue_cond.notify_all()  # libera quem espera espaço
+        return batch
+
+    def _record_batch(self, batch: list, started: float):
+        done = time.perf_counter()
+        self.m_write.observe(done - started)
+        self.m_batches.inc()
+        now = time.monotonic()
+        for queued_at, data in batch:
+            self.m_send_latency.observe(now - queued_at)
+        self.m_bytes_sent.inc(sum(len(data) + len(MESSAGE_DELIMITER) for _, data in batch))
+        network_logger.debug(f"Lote TCP enviado: {len(batch)} mensagens")
+
+    def _write_payload(self, sock, payload: bytes):
+        """
+        Escreve `payload` com prazo próprio (`write_timeout`): o socket é
+        compartilhado com o leitor, que o deixa com timeout de 1 s, então o
+        sendall não serve. Retorna (bytes escritos, erro ou None).
+        """
+        view = memoryview(payload)
+        written = 0
+        deadline = time.monotonic() + self.write_timeout
         try:
-            self.sock.sendall(data)
-            network_logger.debug(f"Dados enviados via TCP: {len(data)} bytes")
-        except BrokenPipeError:
-            network_logger.error("❌ Conexão quebrada, reconectando...")
-            self._connected = False
-            self.connect()
-            self.sock.sendall(data)  # Tenta enviar novamente após reconectar
-        except Exception as e:
-            network_logger.error(f"❌ Falha ao enviar via TCP: {e}")
-            self._connected = False
+            while written < len(view):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return written, socket.timeout(f"escrita do lote passou de {self.write_timeout:.1f}s")
+                if not select.select([], [sock], [], remaining)[1]:
+                    continue
+                try:
+                    written += sock.send(view[written:], _SEND_FLAGS)
+                except (BlockingIOError, InterruptedError):
+                    continue
+        except (OSError, ValueError, AttributeError) as e:
+            # ValueError/AttributeError: socket fechado por outra thread
+            return written, e
+        return written, None
+
+    def _split_written(self, batch: list, written: int):
+        """(entregues, pendentes): entregue é a mensagem escrita inteira, delimitador incluso"""
+        end = 0
+        for i, (_, data) in enumerate(batch):
+            end += len(self._frame(data))
+            if end > written:
+                return batch[:i], batch[i:]
+        return batch, []
+
+    def _write_loop(self):
+        """Única thread que escreve no socket: uma escrita por lote"""
+        while True:
+            with self._queue_cond:
+                while not self._closed and not (self._queue and self._connected):
+                    self._queue_cond.wait()
+                if self._closed:
+                    return
+                sock = self.sock
+                batch = self._take_batch()
+                self._writing = bool(batch)
+            if not batch:
+                continue
+
+            payload = b"".join(self._frame(data) for _, data in batch)
+            started = time.perf_counter()
+            written, error = self._write_payload(sock, payload)
+            delivered, pending = self._split_written(batch, written) if error else (batch, [])
+            try:
+                if delivered:
+                    self._record_batch(delivered, started)
+            finally:
+                with self._queue_cond:
+                    if pending:
+                        # Só o que não chegou inteiro volta para a frente da fila
+                        # (reenviado ao reconectar, se no prazo): nada é executado duas vezes
+                        self._queue.extendleft(reversed(pending))
+                    self._writing = False
+                    self._queue_cond.notify_all()
+            if error is not None:
+                network_logger.error(
+                    f"❌ Falha ao enviar via TCP: {error} ({len(delivered)} entregues, {len(pending)} de volta à fila)"
+                )
+                self.m_send_errors.inc()
+                self.mark_disconnected(sock)
 
     def send_command(self, command: str, data: Dict[str, Any] = None) -> bool:
         """Envia comando para o backend"""
@@ -144,6 +441,7 @@ class TCPClient:
                 while b"\n" in buffer:
                     line, buffer = buffer.split(b"\n", 1)
                     if line.strip():
+                        self.m_messages_received.inc()
                         try:
                             message = line.decode('utf-8').strip()
                             callback(message)
@@ -159,15 +457,34 @@ class TCPClient:
                 self._connected = False
                 break
         
-        # Tenta reconectar se desconectado
+        # O gerenciador reconecta em background
         if not self._connected:
-            network_logger.info("Tentando reconexão...")
-            time.sleep(self.reconnect_delay)
-            self.connect()
+            self.mark_disconnected()
+
+    def rtt_ms(self) -> Optional[float]:
+        """
+        RTT suavizado que o kernel mantém para o socket de controle
+        (TCP_INFO, Linux). None se indisponível ou desconectado.
+        """
+        sock = self.sock
+        if sock is None or not self._connected or not hasattr(socket, "TCP_INFO"):
+            return None
+        try:
+            info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, 104)
+        except OSError:
+            return None
+        if len(info) < _TCPI_RTT_OFFSET + 4:
+            return None
+        (rtt_us,) = struct.unpack_from("I", info, _TCPI_RTT_OFFSET)
+        return rtt_us / 1000.0
 
     def close(self):
-        """Fecha a conexão"""
+        """Fecha a conexão e para o gerenciador e a thread de escrita"""
+        self._closed = True
+        with self._queue_cond:
+            self._queue_cond.notify_all()
         self._connected = False
+        self._connected_event.clear()
         if self.sock:
             try:
                 self.sock.close()
@@ -175,6 +492,7 @@ class TCPClient:
                 pass
             finally:
                 self.sock = None
+        self._wake.set()
         network_logger.info("Conexão TCP fechada")
 class UDPClient:
     def __init__(self, host, port):
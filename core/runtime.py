@@ -0,0 +1,564 @@
+"""
+Pipeline do frontend sem dependência de display: cliente TCP, comandos,
+stream de vídeo e processamento dos resultados do backend. O que é
+exibido vai para um Presenter (a FrontendApp com Tk, ou um presenter
+nulo/gravador no modo headless).
+"""
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from core.commands import CommandHandler
+from core.network import TCPClient
+from core.video_stream import VideoStreamTCP, VideoStreamUDP
+from utils.cleanup import CleanupWorker
+from utils.logger import command_logger, network_logger, ui_logger, video_logger
+
+try:
+    # orjson (opcional) decodifica as mensagens do backend bem mais rápido
+    import orjson
+    _json_loads = orjson.loads
+    JSON_DECODER = "orjson"
+except ImportError:
+    _json_loads = json.loads
+    JSON_DECODER = "json"
+
+# "threads": uma thread bloqueante por conexão; "asyncio": AsyncNetworkCore
+NETWORK_DEFAULTS = {"core": "threads"}
+# Chaves opcionais de config["server"] repassadas ao cliente TCP
+TCP_OPTIONS = ("endpoints", "reconnect_delay", "max_backoff", "send_queue", "message_ttl")
+
+
+class Presenter:
+    """
+    Interface de saída do pipeline. Os métodos são chamados nas threads de
+    rede/vídeo: quem precisa de uma thread específica (Tk) faz o repasse.
+    Esta implementação descarta tudo (presenter nulo).
+    """
+
+    # False: o vídeo não é decodificado para RGB (só os JPEGs são recebidos)
+    wants_frames = False
+
+    def update_frame(self, frame_rgb, frame_id: Optional[int] = None, trace=None):
+        pass
+
+    def show_loading(self):
+        pass
+
+    def show_result(self, label: str, confidence: str):
+        pass
+
+    def show_video(self):
+        pass
+
+    def show_wifi_status(self, status: str, success: bool):
+        pass
+
+    def update_raspberry_info(self, info: Dict[str, Any]):
+        pass
+
+    def show_logs(self, content: str):
+        pass
+
+    def record_analysis(self, payload: Dict[str, Any]):
+        """Resultado de análise válido (para associar à captura)"""
+        pass
+
+
+class RecordingPresenter(Presenter):
+    """
+    Guarda os últimos `max_events` eventos como (instante, tipo, dados) e
+    conta quantos de cada tipo chegaram; frames só são contados.
+    """
+
+    def __init__(self, max_events: int = 1000, wants_frames: bool = False):
+        self.wants_frames = wants_frames
+        self.events = deque(maxlen=max_events)
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, kind: str, data=None):
+        with self._lock:
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            if data is not None:
+                self.events.append((time.time(), kind, data))
+
+    def update_frame(self, frame_rgb, frame_id=None, trace=None):
+        self._record("frame")
+
+    def show_loading(self):
+        self._record("loading", {})
+
+    def show_result(self, label, confidence):
+        self._record("result", {"label": label, "confidence": confidence})
+
+    def show_video(self):
+        self._record("video", {})
+
+    def show_wifi_status(self, status, success):
+        self._record("wifi_status", {"status": status, "success": success})
+
+    def update_raspberry_info(self, info):
+        self._record("raspberry_info", dict(info))
+
+    def show_logs(self, content):
+        self._record("logs", {"chars": len(content)})
+
+    def record_analysis(self, payload):
+        self._record("analysis", dict(payload))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"counts": dict(self.counts), "last_events": list(self.events)[-20:]}
+
+
+class BackendRuntime:
+    """
+    Monta e conecta TCPClient, CommandHandler e o stream de vídeo a partir
+    da configuração, e traduz as mensagens do backend em chamadas ao
+    presenter. Não importa Tk/PIL; cv2 só carrega se o presenter quiser
+    frames decodificados.
+    """
+
+    def __init__(self, config: Dict[str, Any], presenter: Optional[Presenter] = None):
+        self.config = config
+        self.presenter = presenter if presenter is not None else Presenter()
+        self.running = False
+        self.raspberry_info = {
+            "ip": "Buscando...",
+            "hostname": "Desconhecido",
+            "last_update": None
+        }
+        self._setup_backend()
+
+        # Tabelas de despacho de process_backend_result
+        self._json_handlers = {
+            "COMMAND_RESPONSE": self._handle_command_response,
+            "raspberry_info": self._on_raspberry_info_received,
+        }
+        self._prefix_handlers = {
+            "WIFI:": self._process_wifi_response,
+            "SERVICE:": self._process_service_response,
+            "LOGS:": self._process_logs_response,
+        }
+
+    # ============================
+    # Montagem
+    # ============================
+    def _setup_backend(self):
+        """Configura clientes de rede e handlers usando as classes core"""
+        server = self.config.get("server", {})
+        udp_cfg = self.config.get("udp", {})
+        video_cfg = self.config.get("video", {}) or {}
+
+        net_cfg = dict(NETWORK_DEFAULTS, **(self.config.get("network") or {}))
+        if os.getenv("STRAWBERRY_NET_CORE"):
+            net_cfg["core"] = os.environ["STRAWBERRY_NET_CORE"].lower().strip()
+
+        network_logger.info(f"Configurando conexões de rede (núcleo: {net_cfg['core']})...")
+
+        # Cliente TCP (comandos e resultados): endpoints alternativos, backoff e fila de envio
+        tcp_options = {key: server[key] for key in TCP_OPTIONS if key in server}
+        self.net_core = None
+        if net_cfg["core"] == "asyncio":
+            # Import tardio: o asyncio só entra no boot quando pedido
+            from core.aio_network import AsyncNetworkCore, AsyncTCPClient
+
+            self.net_core = AsyncNetworkCore()
+            self.tcp_client = AsyncTCPClient(
+                self.net_core,
+                server.get("host", "127.0.0.1"),
+                server.get("port", 5000),
+                **tcp_options
+            )
+        else:
+            self.tcp_client = TCPClient(
+                server.get("host", "127.0.0.1"),
+                server.get("port", 5000),
+                **tcp_options
+            )
+            self.tcp_client.add_connect_handler(self._register_with_backend)
+
+        udp_port = udp_cfg.get("port") or udp_cfg.get("listen_port") or 5005
+        self.commands = CommandHandler(self.tcp_client, udp_port)
+        if self.net_core is not None:
+            self.commands.scheduler = self.net_core.call_later
+
+        frame_callback = self._on_frame_received if self.presenter.wants_frames else None
+
+        # Seleção do transporte de vídeo
+        transport = (video_cfg.get("transport") or "udp").lower()
+
+        if transport == "tcp":
+            # TCP-JPEG: conecta no CameraServer do backend
+            tcp_host = video_cfg.get("tcp_host", "127.0.0.1")
+            tcp_port = int(video_cfg.get("tcp_port", 5050))
+            self.video_stream = VideoStreamTCP(
+                host=tcp_host,
+                port=tcp_port,
+                frame_callback=frame_callback
+            )
+            self.video_transport = "tcp"
+            video_logger.info(f"Vídeo configurado via TCP: {tcp_host}:{tcp_port}")
+        else:
+            # UDP (padrão): recebe datagramas fragmentados e remonta
+            udp_port = int(udp_cfg.get("listen_port") or udp_cfg.get("port") or 5005)
+            max_packet = int(udp_cfg.get("max_packet_size", 4096))
+            self.video_stream = VideoStreamUDP(
+                udp_port=udp_port,
+                max_packet=max_packet,
+                frame_callback=frame_callback
+            )
+            self.video_transport = "udp"
+            video_logger.info(f"Vídeo configurado via UDP: porta {udp_port} (max_packet={max_packet})")
+
+        # Cleanup worker (opcional): só se o stream expuser .cleanup()
+        self.cleanup_worker = None
+        if hasattr(self.video_stream, "cleanup") and callable(getattr(self.video_stream, "cleanup")):
+            self.cleanup_worker = CleanupWorker(self.video_stream.cleanup, interval=0.5)
+            ui_logger.debug("Cleanup worker configurado")
+
+    def _on_frame_received(self, frame_rgb):
+        """Callback do stream (thread de recepção) com o frame RGB decodificado"""
+        stream = self.video_stream
+        try:
+            self.presenter.update_frame(frame_rgb, stream.delivering_frame_id, stream.delivering_trace)
+        except Exception as e:
+            video_logger.error(f"Erro processando frame: {e}")
+
+    # ============================
+    # Threads / ciclo de vida
+    # ============================
+    def start(self):
+        """Inicia threads em background"""
+        ui_logger.debug("Iniciando threads em background")
+        self.running = True
+
+        if self.net_core is not None:
+            self._start_net_core()
+            return
+
+        # Conexão TCP em background (o gerenciador chama _register_with_backend a cada conexão)
+        self.tcp_client.start()
+
+        # Iniciar recepção de vídeo (a classe do stream cuida do loop internamente)
+        self.video_stream.start()
+
+        # Loop de escuta TCP para resultados
+        threading.Thread(target=self._tcp_result_listener, daemon=True).start()
+
+        # Cleanup worker (só se disponível)
+        if self.cleanup_worker:
+            self.cleanup_worker.start()
+
+        ui_logger.info("Threads em background iniciadas")
+
+    def _start_net_core(self):
+        """Modo asyncio: controle, vídeo e timeouts no loop do AsyncNetworkCore"""
+        self.net_core.start()
+        self.tcp_client.run(self._on_control_line, on_connect=self._on_control_connected)
+        if self.video_transport == "tcp":
+            self.net_core.attach_tcp_video(self.video_stream)
+        else:
+            self.net_core.attach_udp_video(self.video_stream)
+        ui_logger.info("Núcleo de rede asyncio no ar")
+
+    def _on_control_connected(self):
+        # Mesma sequência de _register_with_backend, sem bloquear o loop
+        self.net_core.call_later(0.5, self.tcp_client.send, "GET_INFO".encode("utf-8"))
+        if self.video_transport == "udp":
+            self.commands.register_udp()
+
+    def _on_control_line(self, line: str):
+        network_logger.debug(f"Dados recebidos: {line[:200]}...")
+        self.process_backend_result(line)
+
+    def stop(self):
+        """Para vídeo, workers e a conexão TCP"""
+        self.running = False
+        try:
+            if self.cleanup_worker:
+                self.cleanup_worker.stop(join=True, timeout=1.0)
+                ui_logger.debug("Cleanup worker parado")
+        except Exception as e:
+            ui_logger.debug(f"Erro parando cleanup worker: {e}")
+
+        try:
+            if hasattr(self.video_stream, "stop"):
+                self.video_stream.stop()
+                video_logger.info("Video stream parado")
+        except Exception as e:
+            video_logger.error(f"Erro parando video stream: {e}")
+
+        try:
+            if hasattr(self.tcp_client, "close"):
+                self.tcp_client.close()
+                network_logger.info("Cliente TCP fechado")
+        except Exception as e:
+            network_logger.error(f"Erro fechando cliente TCP: {e}")
+
+        if self.net_core is not None:
+            self.net_core.stop()
+
+    def _register_with_backend(self):
+        """Após cada conexão TCP: pede as informações e, se transporte for UDP, registra a porta UDP"""
+        try:
+            # Solicitar informações da Raspberry após conectar
+            try:
+                # Pequeno delay para garantir que a conexão está estável
+                time.sleep(0.5)
+                # Enviar comando para solicitar informações
+                self.tcp_client.send("GET_INFO".encode("utf-8"))
+                network_logger.info("Solicitação de informações da Raspberry enviada")
+            except Exception as e:
+                network_logger.warning(f"Falha ao solicitar informações: {e}")
+
+            if self.video_transport == "udp":
+                # Caso seu CommandHandler tenha método register_udp(), use-o.
+                if hasattr(self.commands, "register_udp") and callable(getattr(self.commands, "register_udp")):
+                    try:
+                        self.commands.register_udp()
+                        network_logger.info("Registro UDP enviado com sucesso")
+                    except Exception as e:
+                        network_logger.error(f"Falha no register_udp(): {e}")
+                else:
+                    # Fallback: mandar o comando explicitamente
+                    udp_cfg = self.config.get("udp", {})
+                    udp_port = int(udp_cfg.get("listen_port") or udp_cfg.get("port") or 5005)
+                    try:
+                        self.tcp_client.send(f"REGISTER_UDP:{udp_port}".encode("utf-8"))
+                        network_logger.info(f"Comando REGISTER_UDP enviado: {udp_port}")
+                    except Exception as e:
+                        network_logger.error(f"Falha ao enviar REGISTER_UDP:{udp_port}: {e}")
+
+        except Exception as e:
+            network_logger.error(f"Erro na conexão: {e}")
+
+    def _tcp_result_listener(self):
+        """Escuta resultados do backend via TCP"""
+        network_logger.info("Iniciando listener de resultados TCP")
+
+        buffer = b""
+        while self.running:
+            sock = self.tcp_client.sock
+            if sock is None or not self.tcp_client._connected:
+                # Sem conexão: espera o gerenciador do TCPClient reconectar
+                buffer = b""
+                self.tcp_client.wait_connected(1.0)
+                continue
+            try:
+                sock.settimeout(1.0)
+                data = sock.recv(65536)  # Buffer maior
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if self.running:
+                    network_logger.error(f"Erro recebendo resultado: {e}")
+                self.tcp_client.mark_disconnected(sock)
+                continue
+
+            if not data:
+                # recv vazio = conexão fechada pelo backend
+                network_logger.warning("Conexão fechada pelo servidor")
+                self.tcp_client.mark_disconnected(sock)
+                continue
+
+            buffer += data
+            # Processar linhas completas
+            while b"\n" in buffer:
+                raw, buffer = buffer.split(b"\n", 1)
+                line = raw.decode("utf-8", errors="replace").strip()
+                if line:
+                    network_logger.debug(f"Dados recebidos: {line[:200]}...")
+                    self.tcp_client.m_messages_received.inc()
+                    self.process_backend_result(line)
+
+    # ============================
+    # Processamento de resultados
+    # ============================
+    def _safe_json_parse(self, json_str: str):
+        """Tenta parsear JSON de forma segura"""
+        try:
+            return _json_loads(json_str)
+        except ValueError:
+            # Tenta recuperar JSON incompleto
+            if json_str.count('{') > json_str.count('}'):
+                # JSON incompleto - adicionar chave de fechamento
+                try:
+                    return _json_loads(json_str + '}')
+                except ValueError:
+                    pass
+            return None
+
+    def process_backend_result(self, result_str: str):
+        """
+        Processa resultado do backend. Linhas que começam com "{" vão para
+        o parser JSON (despachadas pelo campo "type"); as demais pelo prefixo
+        até o primeiro ":" (WIFI:, SERVICE:, LOGS:) ou pelo formato legado.
+        """
+        try:
+            result_str = result_str.strip()
+            if not result_str:
+                return
+
+            if result_str[0] == "{":
+                data = self._safe_json_parse(result_str)
+                if isinstance(data, dict) and self._dispatch_json(data):
+                    return
+            else:
+                handler = self._prefix_handlers.get(result_str[:result_str.find(":") + 1])
+                if handler is not None:
+                    handler(result_str)
+                    return
+
+            self._process_legacy_result(result_str)
+
+        except Exception as e:
+            command_logger.error(f"Erro processando resultado: {e}")
+
+    def _dispatch_json(self, data: dict) -> bool:
+        """Encaminha uma mensagem JSON; False se o formato não for reconhecido"""
+        handler = self._json_handlers.get(data.get("type"))
+        if handler is not None:
+            handler(data)
+            return True
+
+        # Resultado de inferência
+        if "label" in data and "confidence" in data:
+            label = data.get("label_pt", data.get("label", "Indeterminado"))
+            conf = data.get("confidence", 0)
+            payload = {"label": label, "confidence": conf}
+            for key in ("filename", "timestamp", "latitude", "longitude"):
+                if data.get(key) is not None:
+                    payload[key] = data[key]
+            self.handle_analysis_result(payload)
+            return True
+        return False
+
+    def _handle_command_response(self, data: dict):
+        """Processa resposta de comando JSON"""
+        try:
+            command_id = data.get("command_id")
+            success = data.get("success", False)
+            message = data.get("message", "")
+            response_data = data.get("data", {})
+
+            # Encaminha para o command handler
+            if command_id:
+                self.commands.handle_response(command_id, success, message, response_data)
+
+            # Log da resposta
+            status = "✅" if success else "❌"
+            command_logger.info(f"Resposta de comando: {status} {message}")
+
+        except Exception as e:
+            command_logger.error(f"Erro processando resposta de comando: {e}")
+
+    def _process_wifi_response(self, result_str: str):
+        """Processa resposta legada de Wi-Fi"""
+        parts = result_str.split(":", 2)
+        status = parts[1] if len(parts) > 1 else "UNKNOWN"
+        message = parts[2] if len(parts) > 2 else ""
+
+        if status == "SUCCESS":
+            ui_logger.info(f"Wi-Fi conectado: {message}")
+            self.presenter.show_wifi_status(f"✅ {message}", True)
+        elif status == "FAILED":
+            ui_logger.error(f"Falha Wi-Fi: {message}")
+            self.presenter.show_wifi_status(f"❌ {message}", False)
+        else:
+            ui_logger.error(f"Erro Wi-Fi: {message}")
+            self.presenter.show_wifi_status(f"⚠️ {message}", False)
+
+    def _process_service_response(self, result_str: str):
+        """Processa resposta legada de serviço"""
+        parts = result_str.split(":", 1)
+        status = parts[1] if len(parts) > 1 else "UNKNOWN"
+        ui_logger.info(f"Status do serviço: {status}")
+
+    def _process_logs_response(self, result_str: str):
+        """Processa resposta legada de logs"""
+        try:
+            # Remove o prefixo "LOGS:"
+            if result_str.startswith('LOGS:'):
+                log_content = result_str[5:]
+            else:
+                log_content = result_str
+
+            ui_logger.info(f"Logs recebidos: {len(log_content)} caracteres")
+
+            # Verifica se é uma mensagem de erro
+            if "erro" in log_content.lower() or "nenhum log" in log_content.lower():
+                ui_logger.warning(f"Resposta de logs com problema: {log_content[:100]}...")
+
+            self.presenter.show_logs(log_content)
+
+        except Exception as e:
+            ui_logger.error(f"Erro processando resposta de logs: {e}")
+            self.presenter.show_logs(f"Erro ao processar logs: {str(e)}")
+
+    def _process_legacy_result(self, result_str: str):
+        """Processa resultado no formato legado"""
+        try:
+            if ":" in result_str:
+                label_part, conf_part = result_str.split(":", 1)
+                label = label_part.strip()
+                conf_str = conf_part.strip().strip("%").replace(",", ".")
+                try:
+                    conf = float(conf_str)
+                except Exception:
+                    conf = conf_str
+            else:
+                label = result_str.strip()
+                conf = 0
+
+            # Normaliza confiança
+            if isinstance(conf, (int, float)):
+                conf_text = f"{conf:.1%}" if 0.0 <= conf <= 1.0 else f"{conf:.1f}%"
+            else:
+                conf_text = str(conf)
+
+            command_logger.info(f"Resultado processado: {label} ({conf_text})")
+            self.handle_analysis_result({"label": label, "confidence": conf_text})
+
+        except Exception as e:
+            command_logger.error(f"Erro processando resultado legado: {e}")
+
+    def _on_raspberry_info_received(self, raspberry_data: dict):
+        """Processa informações da Raspberry recebidas do backend"""
+        try:
+            self.raspberry_info = {
+                "ip": raspberry_data.get("ip", "Indisponível"),
+                "hostname": raspberry_data.get("hostname", "Desconhecido"),
+                "last_update": raspberry_data.get("timestamp")
+            }
+
+            ui_logger.info(f"Informações da Raspberry recebidas: {self.raspberry_info['ip']}")
+            self.presenter.update_raspberry_info(self.raspberry_info)
+
+        except Exception as e:
+            ui_logger.error(f"Erro ao processar informações da Raspberry: {e}")
+
+    def handle_analysis_result(self, payload):
+        """Processa resultado da análise"""
+        try:
+            if isinstance(payload, dict):
+                label = payload.get("label", "Indeterminado")
+                confidence = str(payload.get("confidence", "—"))
+            else:
+                label = str(payload)
+                confidence = "—"
+
+            ui_logger.info(f"Exibindo resultado: {label} ({confidence})")
+            self.presenter.show_result(label, confidence)
+
+            if isinstance(payload, dict) and not label.startswith("Erro"):
+                self.presenter.record_analysis(dict(payload, label=label))
+
+        except Exception as e:
+            ui_logger.error(f"Erro processando resultado: {e}")
+            self.presenter.show_result("Erro", "0%")
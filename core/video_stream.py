@@ -2,25 +2,172 @@ import socket
 import time
 import threading
 import struct
-import cv2
-import numpy as np
+from core.frame_ring import FrameRing
+from utils.latency import INTERVALS, frame_latency
 from utils.logger import video_logger
+from utils.metrics import metrics
+
+FRAME_RING_SIZE = 8  # frames JPEG originais guardados para captura local
+
+for _name in list(INTERVALS) + ["glass_to_glass"]:
+    metrics.register_histogram(
+        "video_frame_latency_seconds", frame_latency.histograms[_name],
+        "Latência dos frames por estágio do pipeline", {"interval": _name}
+    )
+
+
+def _decode_rgb(jpeg_bytes: bytes):
+    """
+    Decodifica JPEG para RGB. cv2/NumPy só são importados no primeiro frame,
+    para não pesar no boot da interface.
+    """
+    import cv2
+    import numpy as np
+
+    nparr = np.frombuffer(jpeg_bytes, np.uint8)
+    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+class BaseVideoStream:
+    """
+    Entrega de frames comum aos transportes: callback JPEG cru e callback RGB
+    decodificado. A decodificação pode ser pausada (ex.: HomeScreen oculta);
+    a recepção continua e o último JPEG fica guardado para retomar na hora.
+
+    Os JPEGs originais dos últimos frames ficam em `recent_frames`;
+    `delivering_frame_id` indica, durante o callback RGB, de qual frame
+    a imagem veio (usado para capturar exatamente o frame exibido) e
+    `delivering_trace` carrega os timestamps de latência desse frame.
+    """
+
+    transport_name = "?"
+    # Os ids dos frames vêm do emissor (o backend os reconhece)? No TCP são
+    # um contador local, que só serve dentro do frontend
+    sender_frame_ids = False
+
+    def __init__(self, frame_callback=None):
+        self._cb_jpeg = None
+        self._cb_rgb = frame_callback
+        self._decode_enabled = True
+        self._last_jpeg = None
+        self._last_frame_id = None
+        self._decode_lock = threading.Lock()
+        self._next_frame_id = 0
+        self.recent_frames = FrameRing(FRAME_RING_SIZE)
+        self.delivering_frame_id = None
+        self.delivering_trace = None
+
+        labels = {"transport": self.transport_name}
+        self.m_frames = metrics.counter("video_frames_received_total", "Frames JPEG completos recebidos", labels)
+        self.m_bytes = metrics.counter("video_bytes_received_total", "Bytes de JPEG recebidos", labels)
+        self.m_decoded = metrics.counter("video_frames_decoded_total", "Frames decodificados para RGB", labels)
+        self.m_decode_errors = metrics.counter("video_decode_errors_total", "Falhas de decodificação", labels)
+        self.m_skipped = metrics.counter(
+            "video_frames_not_decoded_total", "Frames recebidos com a decodificação pausada", labels
+        )
+
+    def on_frame(self, cb):
+        """Registra callback que recebe bytes JPEG."""
+        self._cb_jpeg = cb
+        video_logger.debug(f"Callback de frame registrado para {self.transport_name}")
+
+    @property
+    def decode_enabled(self) -> bool:
+        return self._decode_enabled
+
+    def set_decode_enabled(self, enabled: bool):
+        """
+        Liga/desliga a decodificação RGB. Ao religar, o último JPEG recebido
+        é decodificado imediatamente para a tela não ficar com frame velho.
+        """
+        if enabled == self._decode_enabled:
+            return
+        self._decode_enabled = enabled
+        video_logger.info(f"Decodificação de vídeo ({self.transport_name}) {'retomada' if enabled else 'pausada'}")
+        if enabled and self._last_jpeg is not None and self._cb_rgb:
+            # Fora da thread chamadora (normalmente a UI)
+            threading.Thread(
+                target=self._decode_and_deliver, args=(self._last_jpeg, self._last_frame_id),
+                daemon=True, name="Video-Resume"
+            ).start()
+
+    def _emit(self, jpeg_bytes: bytes, frame_id=None, first_fragment_at=None, sent_at=None):
+        # Transportes sem id próprio (TCP) usam um contador local
+        if frame_id is None:
+            frame_id = self._next_frame_id
+            self._next_frame_id += 1
+        self.recent_frames.append(frame_id, jpeg_bytes)
+        trace = frame_latency.start(frame_id, first_fragment_at, sent_at)
+        trace.mark("complete")
+        self.m_frames.inc()
+        self.m_bytes.inc(len(jpeg_bytes))
+        if self.m_frames.value % 100 == 0:
+            video_logger.debug(f"Frames {self.transport_name} recebidos: {self.m_frames.value}")
+
+        # 1) entrega JPEG para quem registrou via on_frame()
+        if self._cb_jpeg:
+            try:
+                self._cb_jpeg(jpeg_bytes)
+            except Exception as e:
+                video_logger.error(f"Erro no callback JPEG ({self.transport_name}): {e}")
+
+        # 2) compat: imagem RGB já decodificada (pulada enquanto pausado)
+        self._last_jpeg = jpeg_bytes
+        self._last_frame_id = frame_id
+        if self._cb_rgb and self._decode_enabled:
+            self._decode_and_deliver(jpeg_bytes, frame_id, trace)
+        else:
+            self.m_skipped.inc()
+            frame_latency.drop(trace)
+
+    def _decode_and_deliver(self, jpeg_bytes: bytes, frame_id=None, trace=None):
+        # Lock: o frame de retomada pode vir da thread da UI em paralelo à recepção
+        with self._decode_lock:
+            try:
+                if trace is not None:
+                    trace.mark("decode_start")
+                frame_rgb = _decode_rgb(jpeg_bytes)
+                if frame_rgb is None:
+                    self.m_decode_errors.inc()
+                    return
+                if trace is not None:
+                    trace.mark("decode_end")
+                self.m_decoded.inc()
+                self.delivering_frame_id = frame_id
+                self.delivering_trace = trace
+                self._cb_rgb(frame_rgb)
+            except Exception as e:
+                self.m_decode_errors.inc()
+                video_logger.error(f"Erro ao decodificar frame ({self.transport_name}): {e}")
+
 
 # =========================
 #  UDP (fragmentado)
 # =========================
-class VideoStreamUDP:
+class VideoStreamUDP(BaseVideoStream):
+    """
+    Cabeçalho por datagrama: frame_id:uint32, total:uint16, index:uint16.
+    Extensão opcional: com o bit 15 de `total` ligado, segue um double
+    (epoch, big-endian) com o instante em que o emissor gerou o frame.
+    """
     HEADER_FMT = "!IHH"  # frame_id:uint32, total:uint16, index:uint16
     HEADER_SIZE = struct.calcsize(HEADER_FMT)
+    TS_FLAG = 0x8000
+    TS_FMT = "!d"
+    TS_SIZE = struct.calcsize(TS_FMT)
+
+    transport_name = "UDP"
+    sender_frame_ids = True
 
     def __init__(self, udp_port: int, max_packet: int = 4096, timeout: float = 2.0, frame_callback=None):
+        super().__init__(frame_callback)
         self.listen_port = int(udp_port)
         self.max_packet = int(max_packet)
         self.timeout = float(timeout)
 
-        self._cb_jpeg = None
-        self._cb_rgb = frame_callback
-
         self.sock = None
         self.buffers = {}
         self.buffers_lock = threading.Lock()
@@ -28,14 +175,15 @@ class VideoStreamUDP:
         self._stop = threading.Event()
         self._recv_th = None
         self._clean_th = None
+
+        self.m_datagrams = metrics.counter("video_udp_datagrams_total", "Datagramas de vídeo recebidos")
+        self.m_expired = metrics.counter(
+            "video_udp_frames_expired_total", "Frames UDP descartados incompletos (fragmentos perdidos)"
+        )
+        metrics.gauge("video_udp_frames_in_flight", "Frames UDP em remontagem", fn=lambda: len(self.buffers))
         
         video_logger.debug(f"VideoStreamUDP inicializado: porta={udp_port}, max_packet={max_packet}")
 
-    def on_frame(self, cb):
-        """Registra callback que recebe bytes JPEG."""
-        self._cb_jpeg = cb
-        video_logger.debug("Callback de frame registrado para UDP")
-
     def start(self):
         if self._recv_th and self._recv_th.is_alive():
             video_logger.warning("VideoStreamUDP já está rodando")
@@ -67,46 +215,60 @@ class VideoStreamUDP:
 
     def _receive_loop(self):
         video_logger.debug("Loop de recepção UDP iniciado")
-        frames_received = 0
         
         while not self._stop.is_set():
             try:
                 data, addr = self.sock.recvfrom(65535)
-                if len(data) <= self.HEADER_SIZE:
-                    continue
-                    
-                frame_id, total, index = struct.unpack(self.HEADER_FMT, data[:self.HEADER_SIZE])
-                chunk = data[self.HEADER_SIZE:]
-
-                with self.buffers_lock:
-                    buf = self.buffers.get(frame_id)
-                    if buf is None:
-                        if total == 0 or total > 65535:
-                            continue
-                        buf = {"total": total, "parts": [None]*total, "received": 0, "last_seen": time.time()}
-                        self.buffers[frame_id] = buf
-
-                    if 0 <= index < buf["total"] and buf["parts"][index] is None:
-                        buf["parts"][index] = chunk
-                        buf["received"] += 1
-                        buf["last_seen"] = time.time()
-
-                    if buf["received"] == buf["total"]:
-                        frame_bytes = b"".join(buf["parts"])
-                        del self.buffers[frame_id]
-                        frames_received += 1
-                        
-                        if frames_received % 100 == 0:
-                            video_logger.debug(f"Frames UDP recebidos: {frames_received}")
-                            
-                        self._emit(frame_bytes)
+                done = self._handle_datagram(data)
+                if done is not None:
+                    self._emit(*done)
 
             except OSError:
                 break
             except Exception as e:
                 video_logger.error(f"Erro no receive_loop (UDP): {e}")
 
-        video_logger.info(f"Loop de recepção UDP finalizado - total de frames: {frames_received}")
+        video_logger.info(f"Loop de recepção UDP finalizado - total de frames: {self.m_frames.value}")
+
+    def _handle_datagram(self, data: bytes):
+        """
+        Guarda o fragmento; com o frame completo retorna os argumentos de
+        _emit (jpeg, frame_id, first_at, sent_at), senão None
+        """
+        if len(data) <= self.HEADER_SIZE:
+            return None
+
+        arrived = time.perf_counter()
+        self.m_datagrams.inc()
+        frame_id, total, index = struct.unpack(self.HEADER_FMT, data[:self.HEADER_SIZE])
+        sent_at = None
+        if total & self.TS_FLAG:
+            total &= ~self.TS_FLAG
+            (sent_at,) = struct.unpack_from(self.TS_FMT, data, self.HEADER_SIZE)
+            chunk = data[self.HEADER_SIZE + self.TS_SIZE:]
+        else:
+            chunk = data[self.HEADER_SIZE:]
+
+        with self.buffers_lock:
+            buf = self.buffers.get(frame_id)
+            if buf is None:
+                if total == 0 or total > 65535:
+                    return None
+                buf = {"total": total, "parts": [None]*total, "received": 0, "last_seen": time.time(),
+                       "first_at": arrived, "sent_at": sent_at}
+                self.buffers[frame_id] = buf
+
+            if 0 <= index < buf["total"] and buf["parts"][index] is None:
+                buf["parts"][index] = chunk
+                buf["received"] += 1
+                buf["last_seen"] = time.time()
+
+            if buf["received"] != buf["total"]:
+                return None
+            del self.buffers[frame_id]
+
+        # Fora do lock: a decodificação não segura o cleanup
+        return b"".join(buf["parts"]), frame_id, buf["first_at"], buf["sent_at"]
 
     def _cleanup_loop(self):
         video_logger.debug("Loop de cleanup UDP iniciado")
@@ -121,52 +283,35 @@ class VideoStreamUDP:
             expired = [fid for fid, buf in self.buffers.items() if now - buf["last_seen"] > self.timeout]
             if expired:
                 video_logger.debug(f"Limpando {len(expired)} frames UDP expirados")
+                self.m_expired.inc(len(expired))
                 for fid in expired:
                     del self.buffers[fid]
 
-    def _emit(self, jpeg_bytes: bytes):
-        # 1) entrega JPEG para quem registrou via on_frame()
-        if self._cb_jpeg:
-            try:
-                self._cb_jpeg(jpeg_bytes)
-            except Exception as e:
-                video_logger.error(f"Erro no callback JPEG (UDP): {e}")
-
-        # 2) compat: se quiser imagem RGB já decodificada
-        if self._cb_rgb:
-            try:
-                nparr = np.frombuffer(jpeg_bytes, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                if frame is not None:
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    self._cb_rgb(frame_rgb)
-            except Exception as e:
-                video_logger.error(f"Erro ao decodificar frame (UDP): {e}")
-
 
 # =========================
 #  TCP (CameraServer JPEG)
 # =========================
-class VideoStreamTCP:
+class VideoStreamTCP(BaseVideoStream):
+    """
+    Frames com prefixo de tamanho uint32. Extensão opcional: com o bit 31
+    do tamanho ligado, seguem 8 bytes (double, epoch) com o instante em
+    que o emissor gerou o frame, antes do JPEG.
+    """
+    transport_name = "TCP"
+    TS_FLAG = 0x80000000
+
     def __init__(self, host: str, port: int, reconnect_sec: float = 2.0, frame_callback=None):
+        super().__init__(frame_callback)
         self.host = host
         self.port = int(port)
         self.reconnect_sec = float(reconnect_sec)
 
-        self._cb_jpeg = None
-        self._cb_rgb = frame_callback
-
         self._stop = threading.Event()
         self._th = None
         self._sock = None
         
         video_logger.debug(f"VideoStreamTCP inicializado: {host}:{port}")
 
-    def on_frame(self, cb):
-        """Registra callback que recebe bytes JPEG."""
-        self._cb_jpeg = cb
-        video_logger.debug("Callback de frame registrado para TCP")
-
     def start(self):
         if self._th and self._th.is_alive():
             video_logger.warning("VideoStreamTCP já está rodando")
@@ -201,28 +346,8 @@ class VideoStreamTCP:
             data.extend(chunk)
         return bytes(data)
 
-    def _emit(self, jpeg_bytes: bytes):
-        # 1) JPEG cru
-        if self._cb_jpeg:
-            try:
-                self._cb_jpeg(jpeg_bytes)
-            except Exception as e:
-                video_logger.error(f"Erro no callback JPEG (TCP): {e}")
-
-        # 2) RGB decodificado (compat)
-        if self._cb_rgb:
-            try:
-                nparr = np.frombuffer(jpeg_bytes, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                if frame is not None:
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    self._cb_rgb(frame_rgb)
-            except Exception as e:
-                video_logger.error(f"Erro ao decodificar frame (TCP): {e}")
-
     def _loop(self):
         video_logger.debug("Loop principal TCP iniciado")
-        frames_received = 0
         connection_attempts = 0
         
         while not self._stop.is_set():
@@ -244,17 +369,22 @@ class VideoStreamTCP:
                     if header is None:
                         video_logger.warning("Conexão TCP fechada pelo servidor")
                         break
+                    first_at = time.perf_counter()
                     (nbytes,) = struct.unpack("!I", header)
+                    sent_at = None
+                    if nbytes & self.TS_FLAG:
+                        nbytes &= ~self.TS_FLAG
+                        stamp = self._recvn(8)
+                        if stamp is None:
+                            video_logger.warning("Stream TCP interrompido")
+                            break
+                        (sent_at,) = struct.unpack("!d", stamp)
                     jpg = self._recvn(nbytes)
                     if jpg is None:
                         video_logger.warning("Stream TCP interrompido")
                         break
                     
-                    frames_received += 1
-                    if frames_received % 100 == 0:
-                        video_logger.debug(f"Frames TCP recebidos: {frames_received}")
-                        
-                    self._emit(jpg)
+                    self._emit(jpg, first_fragment_at=first_at, sent_at=sent_at)
 
             except socket.timeout:
                 video_logger.warning(f"Timeout na conexão TCP com {self.host}:{self.port}")
@@ -278,4 +408,4 @@ class VideoStreamTCP:
                     video_logger.info(f"Tentando reconexão TCP em {self.reconnect_sec}s...")
                     time.sleep(self.reconnect_sec)
 
-        video_logger.info(f"Loop TCP finalizado - total de frames recebidos: {frames_received}")
\ No newline at end of file
+        video_logger.info(f"Loop TCP finalizado - total de frames recebidos: {self.m_frames.value}")
\ No newline at end of file
@@ -1,8 +1,13 @@
+import time
+
+# Referência para medir o tempo até o primeiro pixel (antes de qualquer import pesado)
+STARTUP_T0 = time.perf_counter()
+
+import argparse
 import json
 import os
 import traceback
-from ui.app import FrontendApp 
-from utils.logger import frontend_logger, log_frontend_start
+from utils.logger import frontend_logger
 
 from pathlib import Path
 
@@ -12,7 +17,7 @@ import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.json"
+CONFIG_PATH = Path(os.getenv("STRAWBERRY_CONFIG") or Path(__file__).resolve().parent.parent / "config.json")
 
 
 DEFAULTS = {
@@ -63,11 +68,18 @@ def load_config(path: str):
         frontend_logger.error(f"Erro ao carregar configuração: {e}")
         raise
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Frontend do detector de pragas em morango")
+    parser.add_argument("--headless", action="store_true",
+                        default=os.getenv("STRAWBERRY_HEADLESS", "").lower() in ("1", "true", "yes"),
+                        help="roda o pipeline sem display (também via STRAWBERRY_HEADLESS=1)")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="no modo headless, encerra após N segundos")
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
     try:
-        # Log de inicialização
-        log_frontend_start()
-        
         config = load_config(CONFIG_PATH)
         
         frontend_logger.info(
@@ -76,7 +88,17 @@ def main():
                if config['video']['transport']=='tcp' else "")
         )
         
-        app = FrontendApp(config)
+        if args.headless:
+            # Sem Tk: nada de ui.* é importado
+            from core.headless import run_headless
+            run_headless(config, duration=args.duration)
+            return
+
+        # Import tardio: customtkinter/PIL só carregam depois da configuração
+        # (o log de inicialização com psutil roda após o primeiro pixel)
+        from ui.app import FrontendApp
+
+        app = FrontendApp(config, started_at=STARTUP_T0)
         frontend_logger.info("Aplicação frontend criada, iniciando loop principal...")
         app.run()
         
@@ -2,39 +2,56 @@ import threading
 import os
 import time
 import json
-import socket
+import signal
 from datetime import datetime
 import customtkinter as ctk
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Callable
 from PIL import Image, ImageTk
 
 # Importar das classes core existentes
-from core.network import TCPClient
-from core.video_stream import VideoStreamUDP, VideoStreamTCP
-from core.commands import CommandHandler
-from utils.cleanup import CleanupWorker
+from core.runtime import BackendRuntime, Presenter
+from utils.captures_index import CapturesIndex
+from utils.capture_metadata import CaptureMetadataStore, normalize_confidence
+from utils.latency import frame_latency
+from utils.metrics import metrics, start_metrics_server
+from utils.sampling_profiler import profiler_from_env
+from ui.dispatch_queue import UiDispatchQueue
+from ui.lag_monitor import TkLagMonitor
 from ui.sidebar import Sidebar
 from ui.icons import COLORS, FONTS, WINDOW_PADDING
 from ui.screens.home_screen import HomeScreen
-from ui.screens.gallery_screen import GalleryScreen
-from ui.screens.map_screen import MapScreen
-from ui.screens.settings_screen import SettingsScreen
-from ui.screens.logs_screen import LogsScreen
+from ui.screens.screen_manager import ScreenManager
 
 # Importar loggers
-from utils.logger import ui_logger, network_logger, video_logger, command_logger
+from utils.logger import ui_logger, video_logger, command_logger, log_frontend_start, get_log_stats
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 CAPTURES_DIR = os.path.join(BASE_DIR, "backend", "capture")
-
-class FrontendApp(ctk.CTk):
+SCREEN_EVICTION_CHECK_MS = 30000  # intervalo da verificação de memória das telas
+METADATA_DB_NAME = ".metadata.sqlite3"
+LATENCY_DUMP_PATH = os.path.join("logs", "frame_latency.json")
+LAG_MONITOR_DEFAULTS = {"enabled": True, "interval_ms": 100, "threshold_ms": 150}
+# Quem grava o arquivo da captura: "backend" (CAPTURE:<id>, protocolo de
+# sempre) ou "frontend" (bytes JPEG originais + ANALYZE_FRAME; o backend
+# precisa implementar esse comando)
+CAPTURE_DEFAULTS = {"saved_by": "backend"}
+CAPTURE_MATCH_SLACK_S = 2.0  # tolerância entre o pedido de captura e o mtime do arquivo
+PRECAPTURE_WINDOW_S = 0.5  # frames considerados na escolha do mais nítido
+
+class FrontendApp(ctk.CTk, Presenter):
     """
-    Controlador principal da UI - otimizado para 800x480
+    Controlador principal da UI - otimizado para 800x480.
+    É o Presenter do BackendRuntime: as saídas do pipeline chegam nas
+    threads de rede/vídeo e são repassadas à thread do Tk com `after`.
     """
 
-    def __init__(self, config: Dict[str, Any]):
+    wants_frames = True
+
+    def __init__(self, config: Dict[str, Any], started_at: Optional[float] = None):
         super().__init__()
-        self._rxbuf = b""
+        self._started_at = started_at if started_at is not None else time.perf_counter()
+        self._first_paint_done = False
         self.title("Detector de Pragas em Morango - TCC")
         
         ui_logger.info("Inicializando aplicação frontend")
@@ -50,85 +67,130 @@ class FrontendApp(ctk.CTk):
 
         self.config = config
         self.running = True
+
+        # Profiler por amostragem (STRAWBERRY_PROFILE=1 já liga aqui, cobrindo o boot)
+        self.profiler = profiler_from_env()
         self.current_capture_filename = None
 
-        self.screens = {}  # Dicionário de telas
+        self.screen_manager: Optional[ScreenManager] = None
+
+        # Índice das capturas (watcher iniciado no estágio 2)
+        self.captures_index = CapturesIndex(CAPTURES_DIR)
+        self.captures_index.add_listener(self._on_captures_changed)
+        self.capture_metadata: Optional[CaptureMetadataStore] = None
+        self._capture_requested_at: Optional[float] = None
+        self._displayed_frame_id: Optional[int] = None
+        self.capture_saved_by = self._capture_saved_by()
+        self._capture_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Capture-Writer")
+        self._pending_analysis: Optional[Dict[str, Any]] = None  # resultado à espera do arquivo
+
+        # Atualizações vindas das threads do backend: um único dreno periódico no Tk
+        self.ui_queue = UiDispatchQueue(self)
+        self.ui_queue.start()
 
-        # Setup do backend (TCP/UDP + vídeo)
-        self._setup_backend()
+        # Setup do backend (TCP/UDP + vídeo); a própria app recebe as saídas
+        self.runtime = BackendRuntime(config, presenter=self)
+        self.tcp_client = self.runtime.tcp_client
+        self.commands = self.runtime.commands
+        self.video_stream = self.runtime.video_stream
 
         # Setup da UI
         self._setup_ui()
 
         # Registrar screens
         self._register_screens()
-
-        # Armazenar informações da Raspberry
-        self.raspberry_info = {
-            "ip": "Buscando...",
-            "hostname": "Desconhecido",
-            "last_update": None
-        }
-
-        # Iniciar threads
-        self._start_background_workers()
-
-        # Criar diretório de capturas
-        os.makedirs(CAPTURES_DIR, exist_ok=True)
+        self.metrics_server = None
+        self.lag_monitor: Optional[TkLagMonitor] = None
+        self._register_ui_metrics()
+        self._setup_perf_hud()
+
+        # Estágio 2 (threads, rede, log de sistema) só depois do primeiro pixel
+        self.bind("<Map>", self._on_first_map, add="+")
+
+        # `kill -USR1 <pid>` grava o resumo de latência dos frames e o relatório de lag do Tk
+        # (via after: o handler pode interromper a thread da UI com um lock do monitor em uso)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.after(0, self._dump_diagnostics))
         
         ui_logger.info("Aplicação frontend inicializada com sucesso")
 
     # ============================
-    # Backend / Rede / Vídeo
+    # Inicialização em estágios
     # ============================
-    def _setup_backend(self):
-        """Configura clientes de rede e handlers usando as classes core"""
-        server = self.config.get("server", {})
-        udp_cfg = self.config.get("udp", {})
-        video_cfg = self.config.get("video", {}) or {}
-
-        network_logger.info("Configurando conexões de rede...")
-
-        # Cliente TCP (comandos e resultados)
-        self.tcp_client = TCPClient(
-            server.get("host", "127.0.0.1"), 
-            server.get("port", 5000)
-        )
+    def _on_first_map(self, event):
+        """Janela principal mapeada: agenda o estágio 2 para depois do redraw"""
+        if event.widget is not self or self._first_paint_done:
+            return
+        self._first_paint_done = True
+        self.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self):
+        """Primeiro pixel na tela: mede o tempo de boot e inicia o restante"""
+        elapsed_ms = (time.perf_counter() - self._started_at) * 1000
+        ui_logger.info(f"Primeiro pixel em {elapsed_ms:.0f} ms")
+
+        if os.getenv("STRAWBERRY_STARTUP_PROBE"):
+            # Usado pelo benchmark de inicialização: mede e encerra
+            print(f"STARTUP_FIRST_PIXEL_MS={elapsed_ms:.1f}", flush=True)
+            self.after(0, self.quit)
+            return
+
+        self.after(0, self._start_deferred)
+
+    def _start_deferred(self):
+        """Estágio 2: workers de rede/vídeo e tarefas que não afetam o primeiro frame"""
+        # Criar diretório de capturas
+        os.makedirs(CAPTURES_DIR, exist_ok=True)
+        try:
+            self.capture_metadata = CaptureMetadataStore(os.path.join(CAPTURES_DIR, METADATA_DB_NAME))
+        except Exception as e:
+            ui_logger.error(f"Índice de metadados indisponível: {e}")
+        self.captures_index.start()
+        threading.Thread(target=self._backfill_capture_metadata, name="Metadata-Backfill-Start", daemon=True).start()
 
-        udp_port = udp_cfg.get("port") or udp_cfg.get("listen_port") or 5005
-        self.commands = CommandHandler(self.tcp_client, udp_port)
+        # Iniciar threads
+        self.runtime.start()
 
-        # Seleção do transporte de vídeo
-        transport = (video_cfg.get("transport") or "udp").lower()
+        self.metrics_server = start_metrics_server(self.config)
+        self._start_lag_monitor()
 
-        if transport == "tcp":
-            # TCP-JPEG: conecta no CameraServer do backend
-            tcp_host = video_cfg.get("tcp_host", "127.0.0.1")
-            tcp_port = int(video_cfg.get("tcp_port", 5050))
-            self.video_stream = VideoStreamTCP(
-                host=tcp_host,
-                port=tcp_port,
-                frame_callback=self._on_frame_received
-            )
-            self._video_transport = "tcp"
-            video_logger.info(f"Vídeo configurado via TCP: {tcp_host}:{tcp_port}")
-        else:
-            # UDP (padrão): recebe datagramas fragmentados e remonta
-            udp_port = int(udp_cfg.get("listen_port") or udp_cfg.get("port") or 5005)
-            max_packet = int(udp_cfg.get("max_packet_size", 4096))
-            self.video_stream = VideoStreamUDP(
-                udp_port=udp_port,
-                max_packet=max_packet,
-                frame_callback=self._on_frame_received
-            )
-            self._video_transport = "udp"
-            video_logger.info(f"Vídeo configurado via UDP: porta {udp_port} (max_packet={max_packet})")
-
-        # Cleanup worker (opcional): só se o stream expuser .cleanup()
-        self.cleanup_worker = None
-        if hasattr(self.video_stream, "cleanup") and callable(getattr(self.video_stream, "cleanup")):
-            self.cleanup_worker = CleanupWorker(self.video_stream.cleanup, interval=0.5)
-            ui_logger.debug("Cleanup worker configurado")
+        # Log de sistema (importa psutil) fora do caminho crítico
+        try:
+            log_frontend_start()
+        except Exception as e:
+            ui_logger.debug(f"Falha no log de inicialização: {e}")
+
+    def _register_ui_metrics(self):
+        """Métricas da UI e da fila de logs no registro do processo"""
+        self.m_frames_presented = metrics.counter("ui_frames_presented_total", "Frames entregues à HomeScreen")
+        metrics.gauge("ui_screens_resident", "Telas construídas em memória",
+                      fn=lambda: len(self.screen_manager.screens))
+        metrics.gauge("log_queue_dropped", "Registros de log descartados com a fila cheia",
+                      fn=lambda: get_log_stats().get("dropped", 0))
+        metrics.gauge("captures_indexed", "Imagens no índice de capturas", fn=lambda: len(self.captures_index))
+
+    def _setup_perf_hud(self):
+        """Liga o HUD de desempenho da HomeScreen aos contadores de vídeo/rede/UI"""
+        from ui.components.perf_hud import PerfHudStats
+
+        video_state = self.screens["home"].video_state
+        stats = PerfHudStats(
+            self.video_stream, self.tcp_client, self.commands, self.m_frames_presented,
+            interval_ms=video_state.perf_hud.interval_ms
+        )
+        video_state.set_hud_provider(lambda: stats.sample(video_state.perf_hud.last_cost_ms))
+
+    def _start_lag_monitor(self):
+        """Watchdog do loop do Tk (config "lag_monitor" ou STRAWBERRY_LAG_THRESHOLD_MS)"""
+        cfg = dict(LAG_MONITOR_DEFAULTS, **(self.config.get("lag_monitor") or {}))
+        if os.getenv("STRAWBERRY_LAG_THRESHOLD_MS"):
+            cfg.update(enabled=True, threshold_ms=int(os.environ["STRAWBERRY_LAG_THRESHOLD_MS"]))
+        if not cfg.get("enabled"):
+            return
+        self.lag_monitor = TkLagMonitor(
+            self, interval_ms=int(cfg["interval_ms"]), threshold_ms=int(cfg["threshold_ms"])
+        )
+        self.lag_monitor.start()
 
     # ============================
     # UI
@@ -158,274 +220,114 @@ class FrontendApp(ctk.CTk):
         self.content.grid_columnconfigure(0, weight=1)
 
     def _register_screens(self):
-        """Registra todas as telas da aplicação"""
+        """Registra as telas: Home é criada já, as demais na primeira navegação"""
         ui_logger.debug("Registrando telas da aplicação")
+        self.screen_manager = ScreenManager(self.content)
         
-        # Home screen (vídeo principal)
+        # Home screen (vídeo principal) - sempre residente
         home_screen = HomeScreen(self.content, on_capture=self._on_capture_requested)
-        self._register_screen("home", home_screen)
+        self.screen_manager.add_screen("home", home_screen)
+
+        # Demais telas (módulos importados só quando usados; podem ser descartadas)
+        self.screen_manager.register_factory("gallery", self._build_gallery_screen)
+        self.screen_manager.register_factory("map", self._build_map_screen)
+        self.screen_manager.register_factory("settings", self._build_settings_screen)
+        self.screen_manager.register_factory("logs", self._build_logs_screen)
+
+        # Mostrar tela inicial
+        self.show_screen("home")
+
+        # Verificação periódica de memória para descartar telas ociosas
+        self.after(SCREEN_EVICTION_CHECK_MS, self._check_screen_memory)
+        
+        ui_logger.info("Telas registradas (construção sob demanda)")
+
+    @property
+    def screens(self) -> Dict[str, Any]:
+        """Telas atualmente construídas (compatibilidade)"""
+        return self.screen_manager.screens if self.screen_manager else {}
+
+    def _build_gallery_screen(self):
+        from ui.screens.gallery_screen import GalleryScreen
 
-        # Gallery screen  
-        gallery_screen = GalleryScreen(self.content, captures_dir=CAPTURES_DIR)
+        gallery_screen = GalleryScreen(
+            self.content,
+            captures_dir=CAPTURES_DIR,
+            index=self.captures_index,
+            metadata=self.capture_metadata
+        )
         gallery_screen.back_btn.configure(command=self._on_home)
-        self._register_screen("gallery", gallery_screen)
+        return gallery_screen
+
+    def _build_map_screen(self):
+        from ui.screens.map_screen import MapScreen
 
-        # Map screen 
         map_screen = MapScreen(self.content)
         map_screen.back_btn.configure(command=self._on_home)
-        self._register_screen("map", map_screen)
+        return map_screen
+
+    def _build_settings_screen(self):
+        from ui.screens.settings_screen import SettingsScreen
 
-        # Settings screen 
+        # O SettingsScreen já tem seu próprio _on_back configurado
         settings_screen = SettingsScreen(
             self.content,
             on_save=self._on_settings_save
         )
-        # O SettingsScreen já tem seu próprio _on_back configurado
-        self._register_screen("settings", settings_screen)
-
-        # Logs screen
-        logs_screen = LogsScreen(self.content)
-        self._register_screen("logs", logs_screen)
+        settings_screen.update_raspberry_info(self.raspberry_info)
+        return settings_screen
 
-        # Mostrar tela inicial
-        self.show_screen("home")
-        
-        ui_logger.info("Todas as telas registradas")
+    def _build_logs_screen(self):
+        from ui.screens.logs_screen import LogsScreen
 
-    def _register_screen(self, name: str, screen):
-        """Registra uma tela no gerenciador - CORRIGIDO"""
-        screen.grid(row=0, column=0, sticky="nsew")
-        self.screens[name] = screen
-        screen.grid_remove()  # Esconder inicialmente
-        
-        ui_logger.debug(f"Tela registrada: {name}")
+        return LogsScreen(self.content)
 
     def show_screen(self, name: str):
-        """Mostra uma tela específica - CORRIGIDO"""
+        """Mostra uma tela específica (construída na primeira vez)"""
         ui_logger.debug(f"Alternando para tela: {name}")
-        
-        # Esconder todas as telas
-        for screen_name, screen in self.screens.items():
-            screen.grid_remove()
-        
-        # Mostrar tela solicitada
-        if name in self.screens:
-            self.screens[name].grid()
-            self.screens[name].lift()
-            ui_logger.info(f"Tela ativa: {name}")
-
-    # ============================
-    # Threads / ciclo de vida
-    # ============================
-    def _start_background_workers(self):
-        """Inicia threads em background"""
-        ui_logger.debug("Iniciando threads em background")
-        
-        # Conectar TCP e (se UDP) registrar porta
-        threading.Thread(target=self._tcp_connect_and_register, daemon=True).start()
-
-        # Iniciar recepção de vídeo (a classe do stream cuida do loop internamente)
-        self.video_stream.start()
-
-        # Loop de escuta TCP para resultados
-        threading.Thread(target=self._tcp_result_listener, daemon=True).start()
-
-        # Cleanup worker (só se disponível)
-        if self.cleanup_worker:
-            self.cleanup_worker.start()
-            
-        ui_logger.info("Threads em background iniciadas")
-
-    def _tcp_connect_and_register(self):
-        """Conecta TCP e, se transporte for UDP, registra porta UDP"""
+        self.screen_manager.show_screen(name)
+        self._set_video_active(self.screen_manager.current_screen == "home")
+
+    def _set_video_active(self, active: bool):
+        """Pausa a decodificação do vídeo enquanto a Home não está visível"""
+        stream = getattr(self, "video_stream", None)
+        if stream is not None and hasattr(stream, "set_decode_enabled"):
+            stream.set_decode_enabled(active)
+
+    def _check_screen_memory(self):
+        """Descarta telas ociosas se a RAM estiver acima do limite"""
+        if not self.running:
+            return
         try:
-            network_logger.info("Conectando ao backend via TCP...")
-            self.tcp_client.connect()
-
-            # Solicitar informações da Raspberry após conectar
-            try:
-                # Pequeno delay para garantir que a conexão está estável
-                time.sleep(0.5)
-                # Enviar comando para solicitar informações
-                self.tcp_client.send("GET_INFO".encode("utf-8"))
-                network_logger.info("Solicitação de informações da Raspberry enviada")
-            except Exception as e:
-                network_logger.warning(f"Falha ao solicitar informações: {e}")
-
-            if self._video_transport == "udp":
-                # Caso seu CommandHandler tenha método register_udp(), use-o.
-                if hasattr(self.commands, "register_udp") and callable(getattr(self.commands, "register_udp")):
-                    try:
-                        self.commands.register_udp()
-                        network_logger.info("Registro UDP enviado com sucesso")
-                    except Exception as e:
-                        network_logger.error(f"Falha no register_udp(): {e}")
-                else:
-                    # Fallback: mandar o comando explicitamente
-                    udp_cfg = self.config.get("udp", {})
-                    udp_port = int(udp_cfg.get("listen_port") or udp_cfg.get("port") or 5005)
-                    try:
-                        self.tcp_client.send(f"REGISTER_UDP:{udp_port}".encode("utf-8"))
-                        network_logger.info(f"Comando REGISTER_UDP enviado: {udp_port}")
-                    except Exception as e:
-                        network_logger.error(f"Falha ao enviar REGISTER_UDP:{udp_port}: {e}")
-
+            evicted = self.screen_manager.evict_under_pressure()
+            if evicted:
+                ui_logger.warning(f"Memória alta: tela '{evicted}' descartada")
         except Exception as e:
-            network_logger.error(f"Erro na conexão: {e}")
+            ui_logger.debug(f"Erro na verificação de memória das telas: {e}")
+        self.after(SCREEN_EVICTION_CHECK_MS, self._check_screen_memory)
 
-    def _tcp_result_listener(self):
-        """Escuta resultados do backend via TCP"""
-        network_logger.info("Iniciando listener de resultados TCP")
-        
-        buffer = ""  # Adicionar buffer simples
-        while self.running:
-            try:
-                if self.tcp_client.sock:
-                    self.tcp_client.sock.settimeout(1.0)
-                    try:
-                        data = self.tcp_client.sock.recv(65536)  # Buffer maior
-                        if data:
-                            received_text = data.decode('utf-8')
-                            buffer += received_text
-                            
-                            # Processar linhas completas
-                            while '\n' in buffer:
-                                line, buffer = buffer.split('\n', 1)
-                                line = line.strip()
-                                if line:
-                                    network_logger.debug(f"Dados recebidos: {line[:200]}...")
-                                    self._process_backend_result(line)
-                                    
-                    except socket.timeout:
-                        continue
-                    except Exception as e:
-                        network_logger.error(f"Erro recebendo resultado: {e}")
-                        time.sleep(0.1)
-                else:
-                    time.sleep(1)
-            except Exception as e:
-                network_logger.error(f"Erro no listener TCP: {e}")
-                time.sleep(1)
+    @property
+    def raspberry_info(self) -> Dict[str, Any]:
+        return self.runtime.raspberry_info
 
     # ============================
-    # Processamento de resultados
+    # Presenter (saídas do BackendRuntime)
     # ============================
-    def _safe_json_parse(self, json_str: str):
-        """Tenta parsear JSON de forma segura"""
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            # Tenta recuperar JSON incompleto
-            if json_str.count('{') > json_str.count('}'):
-                # JSON incompleto - adicionar chave de fechamento
-                json_str += '}'
-                try:
-                    return json.loads(json_str)
-                except:
-                    pass
-            return None
+    # Chegam pela ui_queue; a chave coalesce atualizações do mesmo alvo
+    def show_wifi_status(self, status: str, success: bool):
+        self.ui_queue.post(self._show_wifi_status, status, success, key="wifi_status")
 
-    def _process_backend_result(self, result_str: str):
-        """Processa resultado do backend"""
-        try:
-            result_str = result_str.strip()
-            if not result_str:
-                return
-                
-            # Tenta parsear como JSON primeiro
-            data = self._safe_json_parse(result_str)
-            if data:
-                # Resposta de comando
-                if data.get("type") == "COMMAND_RESPONSE":
-                    self._handle_command_response(data)
-                    return
-                    
-                # Informações da Raspberry
-                elif data.get("type") == "raspberry_info":
-                    self._on_raspberry_info_received(data)
-                    return
-                
-                # Resultado de inferência
-                elif "label" in data and "confidence" in data:
-                    label = data.get("label_pt", data.get("label", "Indeterminado"))
-                    conf = data.get("confidence", 0)
-                    self._on_analysis_result({"label": label, "confidence": conf})
-                    return
-            
-            if result_str.startswith("WIFI:"):
-                self._process_wifi_response(result_str)
-            elif result_str.startswith("SERVICE:"):
-                self._process_service_response(result_str)
-            elif result_str.startswith("LOGS:"):
-                self._process_logs_response(result_str)
-            else:
-                self._process_legacy_result(result_str)
-        
-        except Exception as e:
-            command_logger.error(f"Erro processando resultado: {e}")
+    def update_raspberry_info(self, info: Dict[str, Any]):
+        self.ui_queue.post(self._update_settings_display, key="raspberry_info")
 
-    def _handle_command_response(self, data: dict):
-        """Processa resposta de comando JSON"""
-        try:
-            command_id = data.get("command_id")
-            success = data.get("success", False)
-            message = data.get("message", "")
-            response_data = data.get("data", {})
-            
-            # Encaminha para o command handler
-            if hasattr(self, 'commands') and command_id:
-                self.commands.handle_response(command_id, success, message, response_data)
-            
-            # Log da resposta
-            status = "✅" if success else "❌"
-            command_logger.info(f"Resposta de comando: {status} {message}")
-            
-        except Exception as e:
-            command_logger.error(f"Erro processando resposta de comando: {e}")
+    def show_logs(self, content: str):
+        self.ui_queue.post(self._open_logs_dialog, content, key="logs")
 
-    def _process_wifi_response(self, result_str: str):
-        """Processa resposta legada de Wi-Fi"""
-        parts = result_str.split(":", 2)
-        status = parts[1] if len(parts) > 1 else "UNKNOWN"
-        message = parts[2] if len(parts) > 2 else ""
-        
-        if status == "SUCCESS":
-            ui_logger.info(f"Wi-Fi conectado: {message}")
-            self.after(0, lambda: self.screens["settings"]._show_wifi_status(f"✅ {message}", True))
-        elif status == "FAILED":
-            ui_logger.error(f"Falha Wi-Fi: {message}")
-            self.after(0, lambda: self.screens["settings"]._show_wifi_status(f"❌ {message}", False))
-        else:
-            ui_logger.error(f"Erro Wi-Fi: {message}")
-            self.after(0, lambda: self.screens["settings"]._show_wifi_status(f"⚠️ {message}", False))
-
-    def _process_service_response(self, result_str: str):
-        """Processa resposta legada de serviço"""
-        parts = result_str.split(":", 1)
-        status = parts[1] if len(parts) > 1 else "UNKNOWN"
-        ui_logger.info(f"Status do serviço: {status}")
-
-    def _process_logs_response(self, result_str: str):
-        """Processa resposta legada de logs"""
-        try:
-            # Remove o prefixo "LOGS:" 
-            if result_str.startswith('LOGS:'):
-                log_content = result_str[5:]
-            else:
-                log_content = result_str
-                
-            ui_logger.info(f"Logs recebidos: {len(log_content)} caracteres")
-            
-            # Verifica se é uma mensagem de erro
-            if "erro" in log_content.lower() or "nenhum log" in log_content.lower():
-                ui_logger.warning(f"Resposta de logs com problema: {log_content[:100]}...")
-            
-            # Abre o diálogo de logs na thread principal
-            self.after(0, lambda: self._open_logs_dialog(log_content))
-            
-        except Exception as e:
-            ui_logger.error(f"Erro processando resposta de logs: {e}")
-            self.after(0, lambda: self._open_logs_dialog(f"Erro ao processar logs: {str(e)}"))
+    def _show_wifi_status(self, status: str, success: bool):
+        """Repassa o status do Wi-Fi à tela de configurações (se já construída)"""
+        settings_screen = self.screens.get("settings")
+        if settings_screen is not None:
+            settings_screen._show_wifi_status(status, success)
 
     def _open_logs_dialog(self, logs_content: str):
         """Abre o diálogo de logs com o conteúdo recebido"""
@@ -498,56 +400,12 @@ class FrontendApp(ctk.CTk):
         except Exception as e:
             ui_logger.error(f"Erro ao processar atualização de logs: {e}")
 
-    def _process_legacy_result(self, result_str: str):
-        """Processa resultado no formato legado"""
-        try:
-            if ":" in result_str:
-                label_part, conf_part = result_str.split(":", 1)
-                label = label_part.strip()
-                conf_str = conf_part.strip().strip("%").replace(",", ".")
-                try:
-                    conf = float(conf_str)
-                except Exception:
-                    conf = conf_str
-            else:
-                label = result_str.strip()
-                conf = 0
-
-            # Normaliza confiança
-            if isinstance(conf, (int, float)):
-                conf_text = f"{conf:.1%}" if 0.0 <= conf <= 1.0 else f"{conf:.1f}%"
-            else:
-                conf_text = str(conf)
-
-            command_logger.info(f"Resultado processado: {label} ({conf_text})")
-            self._on_analysis_result({"label": label, "confidence": conf_text})
-        
-        except Exception as e:
-            command_logger.error(f"Erro processando resultado legado: {e}")
-
-    def _on_raspberry_info_received(self, raspberry_data: dict):
-        """Processa informações da Raspberry recebidas do backend"""
-        try:
-            self.raspberry_info = {
-                "ip": raspberry_data.get("ip", "Indisponível"),
-                "hostname": raspberry_data.get("hostname", "Desconhecido"),
-                "last_update": raspberry_data.get("timestamp")
-            }
-            
-            ui_logger.info(f"Informações da Raspberry recebidas: {self.raspberry_info['ip']}")
-            
-            # Atualizar a tela de configurações se estiver visível
-            self._update_settings_display()
-            
-        except Exception as e:
-            ui_logger.error(f"Erro ao processar informações da Raspberry: {e}")
-
     def _update_settings_display(self):
         """Atualiza a exibição na tela de configurações"""
         try:
             settings_screen = self.screens.get("settings")
             if settings_screen and hasattr(settings_screen, "update_raspberry_info"):
-                self.after(0, lambda: settings_screen.update_raspberry_info(self.raspberry_info))
+                settings_screen.update_raspberry_info(self.raspberry_info)
         except Exception as e:
             ui_logger.debug(f"Erro ao atualizar display de configurações: {e}")
 
@@ -564,10 +422,7 @@ class FrontendApp(ctk.CTk):
 
     def _on_gallery(self):
         ui_logger.debug("Navegando para tela Galeria")
-        # Reconstruir grid da galeria ao abrir
-        gallery = self.screens.get("gallery")
-        if gallery and hasattr(gallery, "_build_grid"):
-            gallery._build_grid()
+        # A galeria se atualiza pelo índice de capturas no on_show
         self.show_screen("gallery")
 
     def _on_config(self):
@@ -582,49 +437,156 @@ class FrontendApp(ctk.CTk):
         ui_logger.info("Captura solicitada pelo usuário")
         # Feedback imediato
         self.show_loading()
+        self._capture_requested_at = time.time()
+        displayed_id = self._displayed_frame_id
 
-        # Salvar frame atual como imagem
         def capture_worker():
             try:
-                # Obter frame atual
-                home_screen = self.screens.get("home")
-                if hasattr(home_screen, "get_current_frame"):
-                    frame = home_screen.get_current_frame()
-                    if frame:
-                        # Enviar comando de captura para backend
-                        if hasattr(self.commands, "send_capture"):
-                            self.commands.send_capture()
-                            command_logger.info("Comando CAPTURE enviado para backend")
-                    else:
+                if self.capture_saved_by == "backend":
+                    # O backend grava o arquivo; a análise é associada à captura
+                    # mais recente (_match_capture_file)
+                    self.current_capture_filename = None
+                    if self.video_stream.recent_frames.latest() is None:
                         ui_logger.warning("Nenhum frame disponível para captura")
                         self._on_analysis_result({"label": "Erro: Sem frame", "confidence": "0%"})
-                else:
-                    ui_logger.error("Método get_current_frame não disponível")
-                    self._on_analysis_result({"label": "Erro: UI", "confidence": "0%"})
+                        return
+                    self.commands.send_capture()
+                    command_logger.info("Comando CAPTURE enviado para backend")
+                    return
 
+                frame = self._pick_capture_frame(displayed_id)
+                if frame is None:
+                    ui_logger.warning("Nenhum frame disponível para captura")
+                    self._on_analysis_result({"label": "Erro: Sem frame", "confidence": "0%"})
+                    return
+
+                filename = datetime.now().strftime("capture_%Y%m%d_%H%M%S_%f")[:-3] + f"_{frame.frame_id}.jpg"
+                self.current_capture_filename = filename
+
+                # Gravação em disco em thread própria; o comando segue sem esperar o disco
+                self._capture_writer.submit(self._write_capture, filename, frame.jpeg)
+                frame_id = frame.frame_id if self.video_stream.sender_frame_ids else None
+                self.commands.send_analyze_frame(frame_id)
+                command_logger.info(f"Comando ANALYZE_FRAME enviado para backend (frame {frame_id})")
             except Exception as e:
                 ui_logger.error(f"Erro na captura: {e}")
                 self._on_analysis_result({"label": f"Erro: {str(e)}", "confidence": "0%"})
 
         threading.Thread(target=capture_worker, daemon=True).start()
 
-    def _on_analysis_result(self, payload):
-        """Processa resultado da análise"""
+    def _capture_saved_by(self) -> str:
+        """Config "capture.saved_by" ou STRAWBERRY_CAPTURE_SAVED_BY"""
+        cfg = dict(CAPTURE_DEFAULTS, **(self.config.get("capture") or {}))
+        if os.getenv("STRAWBERRY_CAPTURE_SAVED_BY"):
+            cfg["saved_by"] = os.environ["STRAWBERRY_CAPTURE_SAVED_BY"]
+        saved_by = str(cfg["saved_by"]).lower().strip()
+        if saved_by not in ("backend", "frontend"):
+            ui_logger.warning(f"capture.saved_by inválido ({saved_by!r}), usando \"backend\"")
+            saved_by = "backend"
+        return saved_by
+
+    def _pick_capture_frame(self, displayed_id: Optional[int]):
+        """
+        Frame mais nítido da janela de pré-captura; se a pontuação falhar,
+        o frame exibido na Home ou o mais recente
+        """
+        ring = self.video_stream.recent_frames
         try:
-            if isinstance(payload, dict):
-                label = payload.get("label", "Indeterminado")
-                confidence = str(payload.get("confidence", "—"))
-            else:
-                label = str(payload)
-                confidence = "—"
+            frame = ring.sharpest(max_age=PRECAPTURE_WINDOW_S)
+            if frame is not None:
+                ui_logger.debug(f"Frame {frame.frame_id} escolhido (nitidez {frame.sharpness:.1f})")
+                return frame
+        except Exception as e:
+            ui_logger.warning(f"Falha na pontuação de nitidez: {e}")
+
+        frame = ring.get(displayed_id) if displayed_id is not None else None
+        return frame or ring.latest()
+
+    def _write_capture(self, filename: str, jpeg_bytes: bytes):
+        """Grava os bytes JPEG originais em CAPTURES_DIR (escrita atômica)"""
+        path = os.path.join(CAPTURES_DIR, filename)
+        tmp_path = os.path.join(CAPTURES_DIR, f".{filename}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(jpeg_bytes)
+            os.replace(tmp_path, path)
+            ui_logger.info(f"Captura salva: {filename} ({len(jpeg_bytes)} bytes)")
+        except OSError as e:
+            ui_logger.error(f"Erro salvando captura {filename}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
 
-            ui_logger.info(f"Exibindo resultado: {label} ({confidence})")
-            # Atualizar UI na thread principal
-            self.after(0, lambda: self.show_result(label, confidence))
+    def _on_analysis_result(self, payload):
+        """Resultado local (ex.: erro na captura) pelo mesmo caminho dos do backend"""
+        self.runtime.handle_analysis_result(payload)
 
+    # ============================
+    # Metadados das capturas
+    # ============================
+    def _backfill_capture_metadata(self):
+        """Indexa no SQLite as capturas que ainda não têm metadados"""
+        if self.capture_metadata is None or not self.captures_index.wait_ready(timeout=30):
+            return
+        try:
+            self.capture_metadata.backfill(CAPTURES_DIR, self.captures_index.names())
         except Exception as e:
-            ui_logger.error(f"Erro processando resultado: {e}")
-            self.after(0, lambda: self.show_result("Erro", "0%"))
+            ui_logger.error(f"Erro no backfill de metadados: {e}")
+
+    def record_analysis(self, payload: Dict[str, Any]):
+        """Associa o resultado da análise ao arquivo capturado"""
+        name = payload.get("filename") or self.current_capture_filename
+        if name:
+            name = os.path.basename(str(name))
+            self.current_capture_filename = None
+        else:
+            name = self._match_capture_file()
+        if name is None:
+            # O arquivo ainda não apareceu: associa quando o índice o detectar
+            self._pending_analysis = dict(payload, requested_at=self._capture_requested_at)
+            return
+        self._store_analysis(name, payload)
+
+    def _match_capture_file(self, requested_at: Optional[float] = None) -> Optional[str]:
+        """Captura mais recente criada depois do último pedido de captura"""
+        requested_at = requested_at if requested_at is not None else self._capture_requested_at
+        if requested_at is None:
+            return None
+        newest = self.captures_index.page(0, 1)
+        if newest and newest[0].mtime >= requested_at - CAPTURE_MATCH_SLACK_S:
+            return newest[0].name
+        return None
+
+    def _on_captures_changed(self):
+        """Listener do índice de capturas (thread do watcher)"""
+        pending = self._pending_analysis
+        if pending is None:
+            return
+        name = self._match_capture_file(pending.get("requested_at"))
+        if name is not None:
+            self._pending_analysis = None
+            self._store_analysis(name, pending)
+
+    def _store_analysis(self, name: str, payload: Dict[str, Any]):
+        label = payload.get("label")
+        confidence = payload.get("confidence")
+        try:
+            captured_at = float(payload["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            captured_at = None
+        if self.capture_metadata is not None:
+            try:
+                self.capture_metadata.record(
+                    name, label, confidence,
+                    captured_at=captured_at,
+                    latitude=payload.get("latitude"),
+                    longitude=payload.get("longitude"),
+                )
+            except Exception as e:
+                ui_logger.error(f"Erro gravando metadados de {name}: {e}")
+        self.captures_index.set_metadata(name, label, normalize_confidence(confidence))
+        ui_logger.debug(f"Metadados registrados para {name}: {label}")
 
     def _on_settings_save(self, new_settings):
         """Salva configurações"""
@@ -642,14 +604,24 @@ class FrontendApp(ctk.CTk):
     # ============================
     # Integração com a HomeScreen
     # ============================
-    def update_frame(self, pil_image: Image.Image):
-        """Atualiza frame de vídeo (chamado pelo backend)"""
+    def update_frame(self, pil_image, frame_id: Optional[int] = None, trace=None):
+        """Atualiza frame de vídeo (chamado pelo backend com o array RGB ou uma imagem PIL)"""
+        if not isinstance(pil_image, Image.Image):
+            pil_image = Image.fromarray(pil_image)
 
         def update_ui():
+            # Frames em trânsito quando a Home foi escondida são descartados
+            if self.screen_manager.current_screen != "home":
+                frame_latency.drop(trace)
+                return
             home_screen = self.screens.get("home")
             if home_screen and hasattr(home_screen, "update_frame"):
-                home_screen.update_frame(pil_image)
+                home_screen.update_frame(pil_image, trace)
+                self._displayed_frame_id = frame_id
+                self.m_frames_presented.inc()
 
+        if trace is not None:
+            trace.mark("handed_to_tk")
         self.after(0, update_ui)
 
     def show_loading(self):
@@ -660,7 +632,7 @@ class FrontendApp(ctk.CTk):
             if home_screen and hasattr(home_screen, "show_state"):
                 home_screen.show_state("loading")
 
-        self.after(0, show_loading_ui)
+        self.ui_queue.post(show_loading_ui, key="home_state")
 
     def show_result(self, result_text: str, confidence: str):
         """Mostra resultado da análise"""
@@ -671,7 +643,7 @@ class FrontendApp(ctk.CTk):
                 home_screen.set_result(result_text, confidence)
                 home_screen.show_state("result")
 
-        self.after(0, show_result_ui)
+        self.ui_queue.post(show_result_ui, key="home_state")
 
     def show_video(self):
         """Volta para estado de vídeo"""
@@ -681,22 +653,43 @@ class FrontendApp(ctk.CTk):
             if home_screen and hasattr(home_screen, "show_state"):
                 home_screen.show_state("video")
 
-        self.after(0, show_video_ui)
+        self.ui_queue.post(show_video_ui, key="home_state")
 
-    def _on_frame_received(self, frame_rgb):
-        """Callback quando novo frame é recebido (dos streams UDP/TCP)"""
+    def _dump_latency(self):
+        """Grava os histogramas de latência de frames em LATENCY_DUMP_PATH"""
         try:
-            from PIL import Image
-            import numpy as np
-
-            if isinstance(frame_rgb, np.ndarray):
-                pil_image = Image.fromarray(frame_rgb)
-            else:
-                return
+            data = frame_latency.dump(LATENCY_DUMP_PATH)
+            total = data["intervals"].get("total", {})
+            video_logger.info(
+                f"Latência de frames gravada em {LATENCY_DUMP_PATH}: {data['frames']} frames, "
+                f"total p50={total.get('p50', 0):.1f} ms p99={total.get('p99', 0):.1f} ms"
+            )
+        except Exception as e:
+            video_logger.error(f"Erro gravando latência de frames: {e}")
 
-            self.update_frame(pil_image)
+    def _dump_lag_report(self):
+        """Grava o relatório de travamentos do loop do Tk"""
+        if self.lag_monitor is None:
+            return
+        try:
+            data = self.lag_monitor.dump()
+            top = data["hot_spots"][0]["handler"] if data["hot_spots"] else "nenhum"
+            ui_logger.info(
+                f"Relatório de lag do Tk gravado em {self.lag_monitor.report_path}: "
+                f"{len(data['events'])} travamentos, maior ofensor: {top}"
+            )
         except Exception as e:
-            video_logger.error(f"Erro processando frame: {e}")
+            ui_logger.error(f"Erro gravando relatório de lag do Tk: {e}")
+
+    def toggle_profiler(self):
+        """Liga/desliga o profiler por amostragem; retorna (ligado, arquivo)"""
+        running = self.profiler.toggle()
+        return running, self.profiler.path
+
+    def _dump_diagnostics(self):
+        """SIGUSR1: latência de frames + travamentos do Tk"""
+        self._dump_latency()
+        self._dump_lag_report()
 
     # ============================
     # Encerramento
@@ -711,34 +704,41 @@ class FrontendApp(ctk.CTk):
             if hasattr(self, 'tcp_client') and self.tcp_client and self.tcp_client._connected:
                 ui_logger.info("Enviando comando de desligamento para o backend...")
                 self.tcp_client.send("SHUTDOWN_SYSTEM".encode('utf-8'))
-                
-                # Pequeno delay para garantir que o comando foi enviado
-                time.sleep(1)
+
+                # Espera a thread de escrita entregar o comando (até 1 s)
+                self.tcp_client.flush(1.0)
                 
         except Exception as e:
             ui_logger.error(f"Erro ao enviar comando de desligamento: {e}")
 
         # Limpeza normal da aplicação frontend
+        self.ui_queue.stop()
+        if frame_latency.frames:
+            self._dump_latency()
+        if self.lag_monitor is not None:
+            self.lag_monitor.stop()
+            self._dump_lag_report()
         try:
-            if self.cleanup_worker:
-                self.cleanup_worker.stop(join=True, timeout=1.0)
-                ui_logger.debug("Cleanup worker parado")
+            self.profiler.stop()
         except Exception as e:
-            ui_logger.debug(f"Erro parando cleanup worker: {e}")
+            ui_logger.debug(f"Erro parando profiler: {e}")
 
-        try:
-            if hasattr(self.video_stream, "stop"):
-                self.video_stream.stop()
-                video_logger.info("Video stream parado")
-        except Exception as e:
-            video_logger.error(f"Erro parando video stream: {e}")
+        if self.metrics_server is not None:
+            try:
+                self.metrics_server.stop()
+            except Exception as e:
+                ui_logger.debug(f"Erro parando exportador de métricas: {e}")
 
         try:
-            if hasattr(self.tcp_client, "close"):
-                self.tcp_client.close()
-                network_logger.info("Cliente TCP fechado")
+            self._capture_writer.shutdown(wait=True)
+            self.captures_index.stop()
+            if self.capture_metadata is not None:
+                self.capture_metadata.close()
         except Exception as e:
-            network_logger.error(f"Erro fechando cliente TCP: {e}")
+            ui_logger.debug(f"Erro parando índice de capturas: {e}")
+
+        # Vídeo, workers e conexão TCP
+        self.runtime.stop()
 
         ui_logger.info("Aplicação frontend encerrada - sistema será desligado")
         self.destroy()
@@ -0,0 +1,81 @@
+# ui/components/debug_overlay.py
+import time
+import tkinter as tk
+from typing import Callable, Optional
+from ui.icons import COLORS
+from utils.metrics import metrics
+
+
+class DebugOverlay(tk.Label):
+    """
+    Caixa de texto monoespaçada sobreposta ao vídeo. O texto vem de
+    `text_provider` a cada `interval_ms` enquanto visível; o widget só é
+    reconfigurado quando o texto muda (nada é recriado a cada tick).
+    O custo de cada tick fica em `last_cost_ms` e na métrica
+    ui_overlay_update_seconds.
+    """
+
+    def __init__(self, master, text_provider: Callable[[], str], interval_ms: int = 1000, **kwargs):
+        super().__init__(
+            master,
+            text="",
+            justify="left",
+            anchor="nw",
+            font=("DejaVu Sans Mono", 9),
+            fg=COLORS["text"],
+            bg=COLORS["bg"],
+            padx=6,
+            pady=4,
+            **kwargs
+        )
+        self.text_provider = text_provider
+        self.interval_ms = interval_ms
+        self._job: Optional[str] = None
+        self._last_text = ""
+        self.visible = False
+        self.last_cost_ms: Optional[float] = None
+        self._m_cost = metrics.histogram("ui_overlay_update_seconds", "Custo de atualização dos overlays")
+
+    def show(self, **place_kwargs):
+        if self.visible:
+            return
+        self.visible = True
+        self.place(**(place_kwargs or {"relx": 0.01, "rely": 0.01, "anchor": "nw"}))
+        self.lift()
+        self._tick()
+
+    def hide(self):
+        self.visible = False
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        self.place_forget()
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def _tick(self):
+        self._job = None
+        if not self.visible:
+            return
+        start = time.perf_counter()
+        try:
+            text = self.text_provider()
+        except Exception as e:
+            text = f"overlay: {e}"
+        if text != self._last_text:
+            self._last_text = text
+            self.configure(text=text)
+        elapsed = time.perf_counter() - start
+        self.last_cost_ms = elapsed * 1000
+        self._m_cost.observe(elapsed)
+        self._job = self.after(self.interval_ms, self._tick)
+
+    def destroy(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        super().destroy()
@@ -0,0 +1,86 @@
+# ui/components/perf_hud.py
+import time
+from typing import Optional
+
+from utils.latency import frame_latency
+
+
+class PerfHudStats:
+    """
+    Gera o texto do HUD de desempenho a partir dos contadores já existentes
+    (métricas do stream, do TCP e da UI). Cada amostra só calcula deltas
+    desde a anterior; nada é varrido nem alocado além da string final.
+    """
+
+    def __init__(self, stream, tcp_client, commands, presented_counter, interval_ms: int = 1000):
+        self.stream = stream
+        self.tcp_client = tcp_client
+        self.commands = commands
+        self.presented = presented_counter
+        self.interval_s = interval_ms / 1000.0
+        self._process = None
+        self._last = None
+        self.last_lag_ms = 0.0
+
+    def _read(self):
+        decode = frame_latency.histograms["decode"]
+        expired = getattr(self.stream, "m_expired", None)
+        return (
+            time.perf_counter(),
+            self.stream.m_frames.value,
+            self.stream.m_decoded.value,
+            self.presented.value,
+            expired.value if expired is not None else 0,
+            decode.count,
+            decode.total_us,
+        )
+
+    def _system(self):
+        """CPU do processo e RAM (psutil importado só quando o HUD é aberto)"""
+        try:
+            if self._process is None:
+                import psutil
+                self._process = psutil.Process()
+                self._process.cpu_percent(None)  # primeira leitura só arma o contador
+                self._psutil = psutil
+            cpu = self._process.cpu_percent(None)
+            rss_mb = self._process.memory_info().rss / (1024 * 1024)
+            ram = self._psutil.virtual_memory().percent
+            return f"cpu {cpu:4.0f}%  rss {rss_mb:4.0f}MB  ram {ram:3.0f}%"
+        except Exception:
+            return "cpu/ram indisponível"
+
+    def _rtt(self) -> str:
+        rtt = self.tcp_client.rtt_ms() if hasattr(self.tcp_client, "rtt_ms") else None
+        if rtt is not None:
+            return f"rtt tcp {rtt:5.1f} ms"
+        cmd_rtt = getattr(self.commands, "m_rtt", None)
+        if cmd_rtt is not None and cmd_rtt.count:
+            return f"rtt cmd {cmd_rtt.percentile(50):5.1f} ms"
+        return "rtt tcp   —"
+
+    def sample(self, own_cost_ms: Optional[float] = None) -> str:
+        now = self._read()
+        last, self._last = self._last, now
+        if last is None:
+            return "HUD: medindo..."
+
+        dt = now[0] - last[0]
+        # Atraso do loop do Tk: quanto o tick atrasou além do intervalo pedido
+        self.last_lag_ms = max(0.0, (dt - self.interval_s) * 1000)
+        rx, dec, shown = ((now[i] - last[i]) / dt for i in (1, 2, 3))
+        lost = now[4] - last[4]
+        total = (now[1] - last[1]) + lost
+        loss_pct = lost / total * 100 if total else 0.0
+        n_decode = now[5] - last[5]
+        decode_ms = (now[6] - last[6]) / n_decode / 1000 if n_decode else 0.0
+
+        lines = [
+            f"fps rx {rx:4.1f}  dec {dec:4.1f}  tela {shown:4.1f}",
+            f"perda {loss_pct:4.1f}%  decode {decode_ms:5.1f} ms",
+            f"lag tk {self.last_lag_ms:5.1f} ms  {self._rtt()}",
+            self._system(),
+        ]
+        if own_cost_ms is not None:
+            lines.append(f"hud {own_cost_ms:.2f} ms/tick")
+        return "\n".join(lines)
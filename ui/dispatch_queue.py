@@ -0,0 +1,108 @@
+"""
+Fila de atualizações da UI: threads de rede/vídeo enfileiram chamadas e
+um único callback periódico do Tk as executa, com orçamento de tempo por
+tick. Entradas com chave são coalescidas (a mais recente vence).
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from utils.logger import ui_logger
+from utils.metrics import metrics
+
+DEFAULT_INTERVAL_MS = 20
+DEFAULT_BUDGET_MS = 8.0
+
+
+class UiDispatchQueue:
+    """
+    `post(func, *args, key=None)` pode ser chamado de qualquer thread.
+    O dreno roda na thread do Tk a cada `interval_ms`; se a fila não
+    esvaziar em `budget_ms`, o restante fica para o próximo tick.
+    """
+
+    def __init__(self, root, interval_ms: int = DEFAULT_INTERVAL_MS, budget_ms: float = DEFAULT_BUDGET_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.budget_s = budget_ms / 1000.0
+        self._lock = threading.Lock()
+        # Itens: (chave, func, args, instante do post); com chave, o item é
+        # só um marcador de posição e a chamada vigente fica em _keyed
+        self._queue: deque = deque()
+        self._keyed: Dict[Hashable, tuple] = {}
+        self._after_id: Optional[str] = None
+
+        self.m_depth = metrics.gauge("ui_dispatch_queue_depth", "Chamadas à espera na fila da UI", fn=self.depth)
+        self.m_posted = metrics.counter("ui_dispatch_posted_total", "Chamadas enfileiradas para a UI")
+        self.m_coalesced = metrics.counter(
+            "ui_dispatch_coalesced_total", "Chamadas substituídas por uma mais recente da mesma chave"
+        )
+        self.m_wait = metrics.histogram(
+            "ui_dispatch_wait_seconds", "Tempo entre o post e a execução na thread do Tk"
+        )
+        self.m_drain = metrics.histogram("ui_dispatch_drain_seconds", "Duração de cada tick de dreno")
+
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def post(self, func: Callable, *args: Any, key: Optional[Hashable] = None):
+        now = time.perf_counter()
+        with self._lock:
+            self.m_posted.inc()
+            if key is None:
+                self._queue.append((None, func, args, now))
+            elif key in self._keyed:
+                # Mantém a posição (e o instante) da primeira; troca a chamada
+                _, _, first = self._keyed[key]
+                self._keyed[key] = (func, args, first)
+                self.m_coalesced.inc()
+            else:
+                self._keyed[key] = (func, args, now)
+                self._queue.append((key, None, None, now))
+
+    def start(self):
+        """Agenda o dreno periódico (chamar na thread do Tk)"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _pop(self):
+        with self._lock:
+            if not self._queue:
+                return None
+            key, func, args, posted = self._queue.popleft()
+            if key is not None:
+                func, args, posted = self._keyed.pop(key)
+            return func, args, posted
+
+    def _drain(self):
+        start = time.perf_counter()
+        deadline = start + self.budget_s
+        ran = 0
+        try:
+            while True:
+                item = self._pop()
+                if item is None:
+                    break
+                ran += 1
+                func, args, posted = item
+                self.m_wait.observe(time.perf_counter() - posted)
+                try:
+                    func(*args)
+                except Exception as e:
+                    ui_logger.error(f"Erro em atualização da UI ({getattr(func, '__name__', func)}): {e}")
+                if time.perf_counter() >= deadline:
+                    break
+        finally:
+            if ran:
+                self.m_drain.observe(time.perf_counter() - start)
+            if self._after_id is not None:
+                self._after_id = self.root.after(self.interval_ms, self._drain)
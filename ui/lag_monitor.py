@@ -0,0 +1,212 @@
+"""
+Watchdog do loop de eventos do Tk: mede o atraso de um heartbeat agendado
+com `after` e, durante travamentos, amostra a pilha da thread da UI para
+descobrir qual callback/handler estava rodando
+"""
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+from utils.frames import code_label
+from utils.logger import ui_logger
+from utils.metrics import metrics
+
+LAG_REPORT_PATH = os.path.join("logs", "tk_lag.json")
+
+
+
+def _package_dirs(*names):
+    dirs = []
+    for name in names:
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.submodule_search_locations:
+            dirs.extend(os.path.abspath(p) for p in spec.submodule_search_locations)
+    return tuple(dirs)
+
+
+# Código de biblioteca entre o loop do Tk e o handler da aplicação
+_LIBRARY_DIRS = _package_dirs("tkinter", "customtkinter")
+_STACK_DEPTH = 12  # frames guardados por amostra (a partir do handler)
+
+
+def _describe(frame) -> str:
+    return code_label(frame.f_code, frame.f_lineno)
+
+
+def _is_library(frame) -> bool:
+    return frame.f_code.co_filename.startswith(_LIBRARY_DIRS)
+
+
+def summarize_stack(frame):
+    """
+    Retorna (handler, pilha) de uma amostra da thread do Tk. O handler é o
+    primeiro frame da aplicação chamado pelo tkinter/customtkinter
+    (CallWrapper, callit do `after`, `command` dos botões);
+    a pilha vai do handler até o frame em execução.
+    """
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()  # do mais externo (mainloop) ao mais interno
+
+    start = None
+    for i in range(len(frames) - 1):
+        if _is_library(frames[i]) and not _is_library(frames[i + 1]):
+            start = i + 1  # último ponto em que a biblioteca entregou para a aplicação
+    if start is None:
+        # Travado dentro do próprio Tcl/Tk (redraw, geometria...)
+        return "(tcl/tk)", [_describe(f) for f in frames[-3:]]
+
+    name = code_label(frames[start].f_code)
+    stack = [_describe(f) for f in frames[start:]]
+    if len(stack) > _STACK_DEPTH:
+        stack = stack[:2] + ["..."] + stack[-(_STACK_DEPTH - 3):]
+    return name, stack
+
+
+class _Stall:
+    __slots__ = ("started_wall", "samples", "stacks")
+
+    def __init__(self):
+        self.started_wall = time.time()
+        self.samples: Counter = Counter()
+        self.stacks: Dict[str, List[str]] = {}
+
+
+class TkLagMonitor:
+    """
+    Um heartbeat a cada `interval_ms` na thread do Tk mede o quanto o loop
+    atrasou. Uma thread "Tk-Lag-Watchdog" percebe o heartbeat vencido há
+    mais de `threshold_ms` e amostra a pilha do Tk (sys._current_frames)
+    enquanto o travamento durar. Os eventos ficam num relatório rotativo,
+    agregado por handler, gravado em `report_path`.
+    """
+
+    def __init__(self, root, interval_ms: int = 100, threshold_ms: int = 150, sample_ms: int = 20,
+                 max_events: int = 200, report_path: str = LAG_REPORT_PATH):
+        self.root = root
+        self.interval = interval_ms / 1000.0
+        self.threshold = threshold_ms / 1000.0
+        self.sample_interval = sample_ms / 1000.0
+        self.report_path = report_path
+        self.events = deque(maxlen=max_events)
+        self.hot_spots: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._tk_ident: Optional[int] = None
+        self._expected = 0.0
+        self._stall: Optional[_Stall] = None
+        self._job = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.m_lag = metrics.histogram("ui_tk_lag_seconds", "Atraso do heartbeat do loop do Tk")
+        self.m_stalls = metrics.counter("ui_tk_stalls_total", "Travamentos do loop do Tk acima do limite")
+
+    def start(self):
+        """Deve ser chamado na thread do Tk"""
+        if self._thread is not None:
+            return
+        self._tk_ident = threading.get_ident()
+        self._stop.clear()
+        self._expected = time.perf_counter() + self.interval
+        self._job = self.root.after(int(self.interval * 1000), self._beat)
+        self._thread = threading.Thread(target=self._watch, name="Tk-Lag-Watchdog", daemon=True)
+        self._thread.start()
+        ui_logger.debug(f"Monitor de lag do Tk ativo (limite {self.threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        self._stop.set()
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _beat(self):
+        now = time.perf_counter()
+        lag = now - self._expected
+        self.m_lag.observe(max(0.0, lag))
+        with self._lock:
+            stall, self._stall = self._stall, None
+        if lag > self.threshold:
+            self._close_stall(stall, lag)
+        self._expected = now + self.interval
+        if not self._stop.is_set():
+            self._job = self.root.after(int(self.interval * 1000), self._beat)
+
+    def _watch(self):
+        current_frames = sys._current_frames
+        while not self._stop.wait(self.sample_interval):
+            if time.perf_counter() - self._expected < self.threshold:
+                continue
+            frame = current_frames().get(self._tk_ident)
+            if frame is None:
+                continue
+            handler, stack = summarize_stack(frame)
+            del frame
+            with self._lock:
+                if time.perf_counter() - self._expected < self.threshold:
+                    continue  # o heartbeat rodou enquanto a pilha era lida
+                if self._stall is None:
+                    self._stall = _Stall()
+                self._stall.samples[handler] += 1
+                self._stall.stacks.setdefault(handler, stack)
+
+    def _close_stall(self, stall: Optional[_Stall], lag: float):
+        """Registra um travamento encerrado (chamado pelo heartbeat, na thread do Tk)"""
+        lag_ms = lag * 1000
+        if stall is not None and stall.samples:
+            handler, hits = stall.samples.most_common(1)[0]
+            stack = stall.stacks[handler]
+            started = stall.started_wall
+        else:
+            # Travou e voltou entre duas amostras do watchdog
+            handler, hits, stack, started = "(sem amostra)", 0, [], time.time() - lag
+        self.m_stalls.inc()
+        event = {
+            "at": started,
+            "lag_ms": round(lag_ms, 1),
+            "handler": handler,
+            "samples": hits,
+            "others": {h: n for h, n in stall.samples.items() if h != handler} if stall else {},
+            "stack": stack,
+        }
+        with self._lock:
+            self.events.append(event)
+            spot = self.hot_spots.setdefault(handler, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            spot["count"] += 1
+            spot["total_ms"] += lag_ms
+            spot["max_ms"] = max(spot["max_ms"], lag_ms)
+        ui_logger.warning(f"Loop do Tk travado por {lag_ms:.0f} ms em {handler}")
+
+    def report(self) -> dict:
+        with self._lock:
+            spots = sorted(self.hot_spots.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+            events = list(self.events)
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "lag": self.m_lag.summary(),
+            "hot_spots": [dict(handler=h, **{k: round(v, 1) for k, v in s.items()}) for h, s in spots],
+            "events": events,
+        }
+
+    def dump(self, path: Optional[str] = None) -> dict:
+        """Grava o relatório em JSON (escrita atômica)"""
+        path = path or self.report_path
+        data = self.report()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return data
@@ -1,18 +1,121 @@
 # ui/screens/gallery_screen.py
 import customtkinter as ctk
+import tkinter as tk
+from collections import OrderedDict
 from ui.icons import COLORS, FONTS, ICONS
+from utils.logger import ui_logger
 import os
-from PIL import Image, ImageTk
+import queue
+import threading
+import time
+from typing import List, Optional
+from PIL import ImageTk
+from utils.captures_index import CaptureEntry, CapturesIndex
+from utils.thumbnail_cache import ThumbnailCache
+
+THUMB_SIZE = (150, 150)
+READY_POLL_MS = 30       # intervalo de leitura dos thumbnails prontos
+READY_PER_TICK = 6       # PhotoImages criados por tick (não travar a UI)
+
+# Grade virtualizada: um pool fixo de tiles é reposicionado conforme o scroll
+TILE_WIDTH = 160
+TILE_HEIGHT = 180
+TILE_GAP = 10
+OVERSCAN_ROWS = 1        # linhas extras acima/abaixo da área visível
+PHOTO_CACHE_SIZE = 48    # PhotoImages mantidos em memória (LRU)
+SCROLL_STEP = 40         # pixels por passo da roda do mouse
+
+# Filtros por metadados (índice SQLite)
+ALL_OPTION = "todos"
+CONFIDENCE_FILTERS = {"todos": None, ">50%": 50.0, ">80%": 80.0, ">90%": 90.0}
+PERIOD_FILTERS = {"tudo": None, "hoje": 24 * 3600, "semana": 7 * 24 * 3600, "mês": 30 * 24 * 3600}
+
+
+class GalleryTile(ctk.CTkFrame):
+    """Tile reutilizável: mostra a captura que estiver associada a ele"""
+
+    def __init__(self, master, *args, **kwargs):
+        super().__init__(master, fg_color=COLORS["pill_dark"], corner_radius=8,
+                         width=TILE_WIDTH, height=TILE_HEIGHT, *args, **kwargs)
+        self.pack_propagate(False)
+        self.image_file = None
+        self.photo_key = None
+
+        # Label da imagem (placeholder até o thumbnail ficar pronto)
+        self.image_label = ctk.CTkLabel(
+            self,
+            text="…",
+            width=THUMB_SIZE[0],
+            height=THUMB_SIZE[1] - 20,
+            text_color=COLORS["muted"]
+        )
+        self.image_label.image = None
+        self.image_label.pack(padx=5, pady=5)
+
+        # Nome do arquivo
+        self.name_label = ctk.CTkLabel(
+            self,
+            text="",
+            text_color=COLORS["text_secondary"],
+            font=FONTS["small"],
+            wraplength=150
+        )
+        self.name_label.pack(pady=(0, 5))
+
+    def bind_file(self, image_file, photo_key, photo=None):
+        """Associa o tile a uma captura (com thumbnail, se já disponível)"""
+        if photo_key != self.photo_key:
+            self.image_file = image_file
+            self.photo_key = photo_key
+            self.name_label.configure(
+                text=image_file[:20] + "..." if len(image_file) > 20 else image_file
+            )
+            self.set_photo(photo)
+        elif photo is not None and self.image_label.image is not photo:
+            self.set_photo(photo)
+
+    def set_photo(self, photo):
+        if photo is None:
+            self.image_label.configure(image="", text="…")
+            self.image_label.image = None
+        else:
+            self.image_label.configure(image=photo, text="")
+            self.image_label.image = photo  # Manter referência
+
 
 class GalleryScreen(ctk.CTkFrame):
-    def __init__(self, master, captures_dir: str, *args, **kwargs):
+    def __init__(self, master, captures_dir: str, index: Optional[CapturesIndex] = None,
+                 metadata=None, *args, **kwargs):
         super().__init__(master, fg_color=COLORS["panel"], corner_radius=16, *args, **kwargs)
         self.captures_dir = captures_dir
-        
+        self.metadata = metadata               # CaptureMetadataStore (opcional)
+        self._filtered: Optional[List[CaptureEntry]] = None  # None = sem filtro
+
+        # Índice compartilhado pelo app; sem ele a tela mantém o seu próprio
+        self._owns_index = index is None
+        self.index = index if index is not None else CapturesIndex(captures_dir)
+        self._index_version = -1
+        self._index_pending = threading.Event()
+        self._shown = False
+        self.index.add_listener(self._on_index_changed)
+        self.thumbnails = ThumbnailCache(os.path.join(captures_dir, ".thumbs"), size=THUMB_SIZE)
+        self._ready = queue.Queue()   # (geração, arquivo, PIL.Image) vindos do worker
+        self._generation = 0
+        self._poll_job = None
+
+        self._count = 0               # capturas no índice na última atualização
+        self._columns = 1
+        self._pool = []               # [(tile, id da janela no canvas)]
+        self._wanted = set()          # arquivos visíveis/próximos (thumbnails desejados)
+        self._requested = set()       # thumbnails já pedidos ao worker
+        self._photos = OrderedDict()  # (arquivo, mtime) -> PhotoImage (LRU)
+        self._layout_job = None
+        self._drag_y = 0
+
         # Configurar grid principal
         self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
-        
+
         # Botão voltar NO TOPO - usando grid
         self.back_btn = ctk.CTkButton(
             self,
@@ -27,7 +130,7 @@ class GalleryScreen(ctk.CTkFrame):
             command=self._on_back
         )
         self.back_btn.grid(row=0, column=0, sticky="nw", padx=10, pady=10)
-        
+
         self._build_ui()
 
     def _on_back(self):
@@ -38,9 +141,9 @@ class GalleryScreen(ctk.CTkFrame):
         # Container principal - usando grid
         self.container = ctk.CTkFrame(self, fg_color=COLORS["bg"], corner_radius=12)
         self.container.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
-        self.container.grid_rowconfigure(1, weight=1)
+        self.container.grid_rowconfigure(2, weight=1)
         self.container.grid_columnconfigure(0, weight=1)
-        
+
         # Título
         title = ctk.CTkLabel(
             self.container,
@@ -48,86 +151,337 @@ class GalleryScreen(ctk.CTkFrame):
             text_color=COLORS["text"],
             font=FONTS["title"]
         )
-        title.grid(row=0, column=0, pady=10, sticky="n")
-        
-        # Frame para as imagens
-        self.images_frame = ctk.CTkScrollableFrame(
-            self.container, 
-            fg_color=COLORS["bg"]
+        title.grid(row=0, column=0, columnspan=2, pady=10, sticky="n")
+
+        if self.metadata is not None:
+            self._build_filters()
+
+        # Canvas com scroll virtual para as imagens
+        self.canvas = tk.Canvas(
+            self.container,
+            bg=COLORS["bg"],
+            highlightthickness=0,
+            bd=0
         )
-        self.images_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
-        
-        self._build_grid()
+        self.canvas.grid(row=2, column=0, sticky="nsew", padx=(10, 0), pady=10)
 
-    def _build_grid(self):
-        """Constrói a grade de imagens"""
-        # Limpar frame existente
-        for widget in self.images_frame.winfo_children():
-            widget.destroy()
-        
-        # Verificar se o diretório existe
-        if not os.path.exists(self.captures_dir):
-            label = ctk.CTkLabel(
-                self.images_frame,
-                text="Nenhuma captura encontrada",
-                text_color=COLORS["muted"],
-                font=FONTS["body"]
-            )
-            label.pack(pady=50)
+        self.scrollbar = ctk.CTkScrollbar(self.container, command=self.canvas.yview)
+        self.scrollbar.grid(row=2, column=1, sticky="ns", padx=(0, 5), pady=10)
+        self.canvas.configure(yscrollcommand=self._on_canvas_scrolled)
+
+        self.empty_text = self.canvas.create_text(
+            0, 0, text="", fill=COLORS["muted"], font=FONTS["body"], anchor="n"
+        )
+
+        self.canvas.bind("<Configure>", lambda e: self._schedule_layout())
+        self._bind_scroll(self.canvas)
+
+        self._refresh_from_index(keep_scroll=False)
+
+    def _build_filters(self):
+        """Filtros por rótulo, confiança mínima e período"""
+        filters_frame = ctk.CTkFrame(self.container, fg_color="transparent")
+        filters_frame.grid(row=1, column=0, columnspan=2, sticky="ew", padx=10)
+
+        combo_style = dict(
+            height=28,
+            state="readonly",
+            command=lambda _: self._apply_filters(),
+            fg_color=COLORS["pill"],
+            border_color=COLORS["border"],
+            button_color=COLORS["neutral"]
+        )
+
+        # Rótulo (praga/doença)
+        self.label_var = ctk.StringVar(value=ALL_OPTION)
+        self.label_combo = ctk.CTkComboBox(
+            filters_frame,
+            values=[ALL_OPTION],
+            variable=self.label_var,
+            width=180,
+            **combo_style
+        )
+        self.label_combo.pack(side="left", padx=(0, 5))
+
+        # Confiança mínima
+        self.confidence_var = ctk.StringVar(value="todos")
+        self.confidence_combo = ctk.CTkComboBox(
+            filters_frame,
+            values=list(CONFIDENCE_FILTERS),
+            variable=self.confidence_var,
+            width=90,
+            **combo_style
+        )
+        self.confidence_combo.pack(side="left", padx=(0, 5))
+
+        # Período
+        self.period_var = ctk.StringVar(value="tudo")
+        self.period_combo = ctk.CTkComboBox(
+            filters_frame,
+            values=list(PERIOD_FILTERS),
+            variable=self.period_var,
+            width=90,
+            **combo_style
+        )
+        self.period_combo.pack(side="left", padx=(0, 5))
+
+        self.filter_status = ctk.CTkLabel(
+            filters_frame,
+            text="",
+            text_color=COLORS["text_secondary"],
+            font=FONTS["small"]
+        )
+        self.filter_status.pack(side="right")
+
+    def _refresh_label_options(self):
+        if self.metadata is None:
             return
-        
-        # Listar arquivos de imagem
-        image_files = [f for f in os.listdir(self.captures_dir) 
-                      if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-        
-        if not image_files:
-            label = ctk.CTkLabel(
-                self.images_frame,
-                text="Nenhuma imagem na galeria",
-                text_color=COLORS["muted"],
-                font=FONTS["body"]
-            )
-            label.pack(pady=50)
+        try:
+            labels = self.metadata.labels()
+        except Exception as e:
+            ui_logger.debug(f"Erro lendo rótulos das capturas: {e}")
+            return
+        self.label_combo.configure(values=[ALL_OPTION] + labels)
+
+    def _apply_filters(self):
+        """Reconsulta o índice de metadados e redesenha a grade"""
+        self._update_filtered()
+        self._refresh_from_index(keep_scroll=False)
+
+    def _update_filtered(self):
+        if self.metadata is None:
+            self._filtered = None
+            return
+        label = self.label_var.get()
+        min_confidence = CONFIDENCE_FILTERS.get(self.confidence_var.get())
+        period = PERIOD_FILTERS.get(self.period_var.get())
+        if label == ALL_OPTION and min_confidence is None and period is None:
+            self._filtered = None
+            self.filter_status.configure(text="")
             return
-        
-        # Criar grid de imagens (2 colunas)
-        row_frame = None
-        for i, image_file in enumerate(image_files):
-            if i % 2 == 0:
-                row_frame = ctk.CTkFrame(self.images_frame, fg_color="transparent")
-                row_frame.pack(fill="x", pady=5)
-            
-            self._create_image_preview(row_frame, image_file)
-
-    def _create_image_preview(self, parent, image_file):
-        """Cria preview de uma imagem"""
+
         try:
-            filepath = os.path.join(self.captures_dir, image_file)
-            
-            # Carregar e redimensionar imagem
-            image = Image.open(filepath)
-            image.thumbnail((150, 150))  # Thumbnail pequeno para preview
-            photo = ImageTk.PhotoImage(image)
-            
-            # Frame da imagem
-            image_frame = ctk.CTkFrame(parent, fg_color=COLORS["pill_dark"], corner_radius=8, width=160, height=180)
-            image_frame.pack(side="left", padx=5, pady=5)
-            image_frame.pack_propagate(False)
-            
-            # Label da imagem
-            image_label = ctk.CTkLabel(image_frame, image=photo, text="")
-            image_label.image = photo  # Manter referência
-            image_label.pack(padx=5, pady=5)
-            
-            # Nome do arquivo
-            name_label = ctk.CTkLabel(
-                image_frame, 
-                text=image_file[:20] + "..." if len(image_file) > 20 else image_file,
-                text_color=COLORS["text_secondary"],
-                font=FONTS["small"],
-                wraplength=150
+            names = self.metadata.query(
+                label=None if label == ALL_OPTION else label,
+                min_confidence=min_confidence,
+                since=time.time() - period if period else None,
             )
-            name_label.pack(pady=(0, 5))
-            
         except Exception as e:
-            print(f"Erro carregando imagem {image_file}: {e}")
\ No newline at end of file
+            ui_logger.error(f"Erro filtrando capturas: {e}")
+            names = []
+        entries = [e for e in map(self.index.get, names) if e is not None]
+        entries.sort(key=lambda e: e.sort_key)
+        self._filtered = entries
+        self.filter_status.configure(text=f"{len(entries)} de {len(self.index)}")
+
+    def _page(self, start: int, count: int) -> List[CaptureEntry]:
+        if self._filtered is None:
+            return self.index.page(start, count)
+        return self._filtered[start:start + count]
+
+    # ----- Scroll -----
+    def _bind_scroll(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", lambda e: self._scroll_pixels(-SCROLL_STEP))  # Linux
+        widget.bind("<Button-5>", lambda e: self._scroll_pixels(SCROLL_STEP))   # Linux
+        # Arrastar com o dedo (touchscreen)
+        widget.bind("<ButtonPress-1>", self._on_drag_start, add="+")
+        widget.bind("<B1-Motion>", self._on_drag, add="+")
+
+    def _on_mousewheel(self, event):
+        self._scroll_pixels(-SCROLL_STEP if event.delta > 0 else SCROLL_STEP)
+
+    def _on_drag_start(self, event):
+        self._drag_y = event.y_root
+
+    def _on_drag(self, event):
+        delta = self._drag_y - event.y_root
+        self._drag_y = event.y_root
+        self._scroll_pixels(delta)
+
+    def _scroll_pixels(self, delta):
+        total = self._content_height()
+        view = self.canvas.winfo_height()
+        if total <= view:
+            return
+        top = self.canvas.canvasy(0) + delta
+        top = max(0, min(top, total - view))
+        self.canvas.yview_moveto(top / total)
+
+    def _on_canvas_scrolled(self, first, last):
+        self.scrollbar.set(first, last)
+        self._update_visible()
+
+    # ----- Layout -----
+    def _schedule_layout(self):
+        if self._layout_job is None:
+            self._layout_job = self.after_idle(self._relayout)
+
+    def _content_height(self):
+        rows = -(-self._count // self._columns)
+        return rows * (TILE_HEIGHT + TILE_GAP) + TILE_GAP
+
+    def _relayout(self):
+        """Recalcula colunas, tamanho do pool e região de scroll"""
+        self._layout_job = None
+        width = max(self.canvas.winfo_width(), TILE_WIDTH + 2 * TILE_GAP)
+        height = max(self.canvas.winfo_height(), TILE_HEIGHT)
+        self._columns = max(1, (width - TILE_GAP) // (TILE_WIDTH + TILE_GAP))
+
+        visible_rows = -(-height // (TILE_HEIGHT + TILE_GAP)) + 1
+        pool_size = (visible_rows + 2 * OVERSCAN_ROWS) * self._columns
+        while len(self._pool) < pool_size:
+            tile = GalleryTile(self.canvas)
+            self._bind_scroll(tile)
+            for child in (tile.image_label, tile.name_label):
+                self._bind_scroll(child)
+            window = self.canvas.create_window(0, 0, window=tile, anchor="nw", state="hidden")
+            self._pool.append((tile, window))
+        while len(self._pool) > pool_size:
+            tile, window = self._pool.pop()
+            self.canvas.delete(window)
+            tile.destroy()
+
+        self.canvas.configure(scrollregion=(0, 0, width, self._content_height()))
+        self.canvas.coords(self.empty_text, width // 2, 50)
+        self._update_visible()
+
+    def _update_visible(self):
+        """Associa os tiles do pool às linhas visíveis (e próximas)"""
+        if not self._pool:
+            return
+        row_height = TILE_HEIGHT + TILE_GAP
+        first_row = max(0, int(self.canvas.canvasy(0) // row_height) - OVERSCAN_ROWS)
+        first_index = first_row * self._columns
+        entries = self._page(first_index, len(self._pool))
+
+        wanted = set()
+        for slot, (tile, window) in enumerate(self._pool):
+            if slot >= len(entries):
+                self.canvas.itemconfigure(window, state="hidden")
+                continue
+            entry = entries[slot]
+            key = (entry.name, entry.mtime_ns)
+            row, col = divmod(first_index + slot, self._columns)
+            self.canvas.coords(window, TILE_GAP + col * (TILE_WIDTH + TILE_GAP), TILE_GAP + row * row_height)
+            self.canvas.itemconfigure(window, state="normal")
+
+            photo = self._photos.get(key)
+            if photo is not None:
+                self._photos.move_to_end(key)
+            else:
+                self._request_thumbnail(key)
+            tile.bind_file(entry.name, key, photo)
+            wanted.add(key)
+
+        # Pedidos fora da janela atual deixam de ser desejados (o worker os pula)
+        self._wanted = wanted
+        self._requested &= wanted
+
+    # ----- Dados -----
+    def on_show(self):
+        self._shown = True
+        if self._owns_index:
+            self.index.start()
+        self._refresh_label_options()
+        self._build_grid()
+
+    def on_hide(self):
+        self._shown = False
+
+    def _on_index_changed(self):
+        """Listener do índice (thread do watcher): agenda um único refresh na UI"""
+        if self._shown and not self._index_pending.is_set():
+            self._index_pending.set()
+            self.after(0, self._apply_index_change)
+
+    def _apply_index_change(self):
+        self._index_pending.clear()
+        if self._shown:
+            if self._filtered is not None:
+                self._update_filtered()
+            self._refresh_from_index(keep_scroll=True)
+
+    def _build_grid(self):
+        """Atualiza a grade a partir do índice (sem listar o diretório)"""
+        if self._filtered is not None:
+            # Filtros por período dependem do relógio: sempre reconsulta
+            self._apply_filters()
+        elif self._index_version != self.index.version:
+            self._refresh_from_index(keep_scroll=False)
+
+    def _refresh_from_index(self, keep_scroll: bool):
+        self._index_version = self.index.version
+        self._count = len(self.index) if self._filtered is None else len(self._filtered)
+
+        if self._count:
+            message = ""
+        elif self._filtered is not None:
+            message = "Nenhuma captura com esses filtros"
+        elif not os.path.exists(self.captures_dir):
+            message = "Nenhuma captura encontrada"
+        else:
+            message = "Nenhuma imagem na galeria"
+        self.canvas.itemconfigure(self.empty_text, text=message)
+
+        if not keep_scroll:
+            self.canvas.yview_moveto(0)
+        self._relayout()
+
+    def _request_thumbnail(self, key):
+        """Agenda a geração do thumbnail no worker (uma vez por arquivo)"""
+        if key in self._requested:
+            return
+        self._requested.add(key)
+        generation = self._generation
+        filepath = os.path.join(self.captures_dir, key[0])
+
+        def on_ready(path, image):
+            self._ready.put((generation, key, image))
+
+        self.thumbnails.submit(
+            filepath, on_ready,
+            should_run=lambda: generation == self._generation and key in self._wanted
+        )
+        if self._poll_job is None:
+            self._poll_job = self.after(READY_POLL_MS, self._drain_ready)
+
+    def _drain_ready(self):
+        """Cria os PhotoImage dos thumbnails prontos (thread da UI)"""
+        self._poll_job = None
+        for _ in range(READY_PER_TICK):
+            try:
+                generation, key, image = self._ready.get_nowait()
+            except queue.Empty:
+                break
+            self._requested.discard(key)
+            if generation != self._generation or image is None:
+                continue
+
+            photo = ImageTk.PhotoImage(image)
+            self._photos[key] = photo
+            self._photos.move_to_end(key)
+            while len(self._photos) > PHOTO_CACHE_SIZE:
+                self._photos.popitem(last=False)
+
+            for tile, _ in self._pool:
+                if tile.photo_key == key:
+                    tile.set_photo(photo)
+
+        if self._requested or not self._ready.empty():
+            self._poll_job = self.after(READY_POLL_MS, self._drain_ready)
+
+    def destroy(self):
+        self._generation += 1
+        self._shown = False
+        self.index.remove_listener(self._on_index_changed)
+        if self._owns_index:
+            self.index.stop()
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+        if self._layout_job is not None:
+            self.after_cancel(self._layout_job)
+            self._layout_job = None
+        self.thumbnails.shutdown()
+        super().destroy()
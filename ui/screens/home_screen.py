@@ -1,4 +1,5 @@
 # ui/screens/home_screen.py
+import os
 import customtkinter as ctk
 from customtkinter import CTkImage
 from PIL import Image, ImageTk
@@ -6,6 +7,21 @@ from typing import Callable, Optional
 from ui.icons import COLORS, FONTS, ICONS
 from ui.components.capture_button import CaptureButton
 from ui.components.battery_widget import BatteryWidget
+from ui.components.debug_overlay import DebugOverlay
+from utils.latency import frame_latency
+
+VIDEO_FALLBACK_SIZE = (580, 320)  # área do vídeo antes do primeiro layout
+
+
+def cover_size(image_width: int, image_height: int, box_width: int, box_height: int):
+    """Tamanho que cobre toda a área mantendo o aspect ratio da imagem"""
+    img_ratio = image_width / image_height
+    if img_ratio > box_width / box_height:
+        # Imagem mais larga - preencher altura
+        return int(box_height * img_ratio), box_height
+    # Imagem mais alta - preencher largura
+    return box_width, int(box_width / img_ratio)
+
 
 class VideoState(ctk.CTkFrame):
     """Estado de vídeo com botão sobreposto"""
@@ -52,6 +68,17 @@ class VideoState(ctk.CTkFrame):
         )
         self.capture_btn.place(relx=0.55, rely=0.95, anchor="se")
 
+        # Overlays de depuração: duplo toque no vídeo alterna HUD → latência → nenhum
+        self.perf_hud = DebugOverlay(self.video_container, lambda: "HUD indisponível")
+        self.debug_overlay = DebugOverlay(self.video_container, frame_latency.overlay_text)
+        self._overlay_cycle = [None, self.perf_hud, self.debug_overlay]
+        self._overlay_index = 0
+        self.video_label.bind("<Double-Button-1>", lambda e: self.cycle_overlay())
+        if os.getenv("STRAWBERRY_PERF_HUD"):
+            self.cycle_overlay(1)
+        elif os.getenv("STRAWBERRY_DEBUG_OVERLAY"):
+            self.cycle_overlay(2)
+
     def _on_click_capture(self):
         self.capture_btn.disable()
         if callable(self.on_capture):
@@ -61,7 +88,7 @@ class VideoState(ctk.CTkFrame):
                 print("Erro no on_capture:", e)
                 self.capture_btn.enable()
 
-    def update_frame_image(self, pil_image):
+    def update_frame_image(self, pil_image, trace=None):
         try:
             self.current_image = pil_image  # Guardar referência para captura
             
@@ -71,33 +98,44 @@ class VideoState(ctk.CTkFrame):
             
             # Usar dimensões reais se disponíveis, senão usar estimativas
             if container_width < 10:  # Se ainda não foi renderizado
-                container_width = 580
-                container_height = 320
+                container_width, container_height = VIDEO_FALLBACK_SIZE
             
             # Manter aspect ratio
-            img_ratio = pil_image.width / pil_image.height
-            target_ratio = container_width / container_height
-            
-            if img_ratio > target_ratio:
-                # Imagem mais larga - preencher altura
-                new_height = container_height
-                new_width = int(container_height * img_ratio)
-            else:
-                # Imagem mais alta - preencher largura
-                new_width = container_width
-                new_height = int(container_width / img_ratio)
+            new_width, new_height = cover_size(pil_image.width, pil_image.height, container_width, container_height)
             
             resized_image = pil_image.resize((new_width, new_height), Image.LANCZOS)
+            if trace is not None:
+                trace.mark("resize")
 
             ctk_img = CTkImage(light_image=resized_image, size=(new_width, new_height))
             
             self.video_label.configure(image=ctk_img, text="")
             self.video_label.image = ctk_img
+
+            if trace is not None:
+                # Callbacks de idle rodam depois do redraw já agendado
+                self.after_idle(frame_latency.finish, trace)
             
         except Exception as e:
             print("Falha ao atualizar frame:", e)
             self.video_label.configure(text="Erro no vídeo")
 
+    def set_hud_provider(self, provider):
+        """Define a função que gera o texto do HUD de desempenho"""
+        self.perf_hud.text_provider = provider
+
+    def cycle_overlay(self, index=None):
+        """Mostra o próximo overlay (ou o de índice informado)"""
+        current = self._overlay_cycle[self._overlay_index]
+        if current is not None:
+            current.hide()
+        if index is None:
+            index = (self._overlay_index + 1) % len(self._overlay_cycle)
+        self._overlay_index = index
+        overlay = self._overlay_cycle[index]
+        if overlay is not None:
+            overlay.show()
+
     def enable_capture(self):
         self.capture_btn.enable()
 
@@ -344,9 +382,9 @@ class HomeScreen(ctk.CTkFrame):
             self.states[state_name].grid()  # Mostra no grid
             self.states[state_name].lift()  # Traz para frente
 
-    def update_frame(self, pil_image):
+    def update_frame(self, pil_image, trace=None):
         """Atualiza frame de vídeo"""
-        self.video_state.update_frame_image(pil_image)
+        self.video_state.update_frame_image(pil_image, trace)
 
     def set_result(self, text: str, confidence: str):
         """Define resultado da análise"""
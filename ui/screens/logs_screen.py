@@ -1,10 +1,25 @@
 import customtkinter as ctk
 from ui.icons import COLORS, FONTS
-from utils.logger import ui_logger
+from utils.logger import ui_logger, get_structured_sink
+from utils.log_index import LogIndex, LEVELS
+import re
 import threading
 import time
 from datetime import datetime
 
+ALL_OPTION = "todos"
+LOCAL_LOG_TYPE = "local"  # logs do próprio frontend, lidos do ring em memória
+LOCAL_LOG_LIMIT = 5000
+
+# Janelas de tempo do filtro (segundos)
+TIME_RANGES = {
+    "tudo": None,
+    "5 min": 5 * 60,
+    "15 min": 15 * 60,
+    "1 h": 60 * 60,
+    "24 h": 24 * 60 * 60,
+}
+
 class LogsScreen(ctk.CTkFrame):
     def __init__(self, master, *args, **kwargs):
         super().__init__(master, fg_color=COLORS["panel"], corner_radius=16, *args, **kwargs)
@@ -16,6 +31,9 @@ class LogsScreen(ctk.CTkFrame):
         self._auto_scroll = True
         self._is_auto_refresh = False
         self._refresh_interval = 2000  # 2 segundos
+        self._filter_job = None
+        self._filter_delay = 150  # ms de debounce na busca
+        self.log_index = LogIndex()
         
         self._build_ui()
         self._setup_bindings()
@@ -40,7 +58,7 @@ class LogsScreen(ctk.CTkFrame):
         # Container principal
         self.main_container = ctk.CTkFrame(self, fg_color="transparent")
         self.main_container.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
-        self.main_container.grid_rowconfigure(1, weight=1)
+        self.main_container.grid_rowconfigure(2, weight=1)
         self.main_container.grid_columnconfigure(0, weight=1)
         
        # ===== HEADER COM CONTROLES =====
@@ -73,7 +91,7 @@ class LogsScreen(ctk.CTkFrame):
         self.log_type_var = ctk.StringVar(value="all")
         self.log_type_combo = ctk.CTkComboBox(
             controls_frame,
-            values=["all", "backend", "frontend", "kiosk", "metrics"],
+            values=["all", "backend", "frontend", "kiosk", "metrics", LOCAL_LOG_TYPE],
             variable=self.log_type_var,
             width=120,
             height=28,
@@ -137,13 +155,16 @@ class LogsScreen(ctk.CTkFrame):
         )
         self.copy_btn.pack(side="left")
         
+        # ===== FILTROS =====
+        self._build_filters()
+        
         # ===== ÁREA DE LOGS =====
         logs_container = ctk.CTkFrame(
             self.main_container, 
             fg_color=COLORS["pill_dark"], 
             corner_radius=12
         )
-        logs_container.grid(row=1, column=0, sticky="nsew")
+        logs_container.grid(row=2, column=0, sticky="nsew")
         logs_container.grid_rowconfigure(0, weight=1)
         logs_container.grid_columnconfigure(0, weight=1)
         
@@ -162,7 +183,7 @@ class LogsScreen(ctk.CTkFrame):
         
         # ===== STATUS BAR =====
         status_frame = ctk.CTkFrame(self.main_container, fg_color="transparent")
-        status_frame.grid(row=2, column=0, sticky="ew", pady=(10, 0))
+        status_frame.grid(row=3, column=0, sticky="ew", pady=(10, 0))
         
         self.status_label = ctk.CTkLabel(
             status_frame,
@@ -181,6 +202,80 @@ class LogsScreen(ctk.CTkFrame):
         )
         self.lines_label.pack(side="right")
 
+    def _build_filters(self):
+        """Linha de filtros locais (nível, logger, período e busca)"""
+        filters_frame = ctk.CTkFrame(self.main_container, fg_color="transparent")
+        filters_frame.grid(row=1, column=0, sticky="ew", pady=(0, 8))
+        
+        combo_style = dict(
+            height=28,
+            state="readonly",
+            command=self._schedule_filter,
+            fg_color=COLORS["pill"],
+            border_color=COLORS["border"],
+            button_color=COLORS["neutral"]
+        )
+        
+        # Nível mínimo
+        self.level_var = ctk.StringVar(value=ALL_OPTION)
+        self.level_combo = ctk.CTkComboBox(
+            filters_frame,
+            values=[ALL_OPTION] + list(LEVELS[1:]),
+            variable=self.level_var,
+            width=100,
+            **combo_style
+        )
+        self.level_combo.pack(side="left", padx=(0, 5))
+        
+        # Logger
+        self.logger_var = ctk.StringVar(value=ALL_OPTION)
+        self.logger_combo = ctk.CTkComboBox(
+            filters_frame,
+            values=[ALL_OPTION],
+            variable=self.logger_var,
+            width=160,
+            **combo_style
+        )
+        self.logger_combo.pack(side="left", padx=(0, 5))
+        
+        # Período
+        self.range_var = ctk.StringVar(value="tudo")
+        self.range_combo = ctk.CTkComboBox(
+            filters_frame,
+            values=list(TIME_RANGES),
+            variable=self.range_var,
+            width=80,
+            **combo_style
+        )
+        self.range_combo.pack(side="left", padx=(0, 5))
+        
+        # Busca (substring ou regex)
+        self.search_var = ctk.StringVar()
+        self.search_entry = ctk.CTkEntry(
+            filters_frame,
+            textvariable=self.search_var,
+            placeholder_text="Buscar...",
+            fg_color=COLORS["pill"],
+            border_color=COLORS["border"],
+            text_color=COLORS["text"],
+            height=28,
+            placeholder_text_color=COLORS["text_secondary"]
+        )
+        self.search_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.search_var.trace_add("write", lambda *args: self._schedule_filter())
+        
+        self.regex_var = ctk.BooleanVar(value=False)
+        regex_cb = ctk.CTkCheckBox(
+            filters_frame,
+            text="Regex",
+            variable=self.regex_var,
+            command=self._schedule_filter,
+            fg_color=COLORS["primary"],
+            hover_color=COLORS["primary_hover"],
+            font=FONTS["body_small"]
+        )
+        regex_cb.pack(side="left")
+
     def _on_log_type_change(self, *args):
         """Callback quando o tipo de log é alterado"""
         self._refresh_logs()
@@ -252,6 +347,9 @@ class LogsScreen(ctk.CTkFrame):
 
     def _refresh_logs(self):
         """Atualiza os logs """
+        if self.log_type_var.get() == LOCAL_LOG_TYPE:
+            self._load_local_logs()
+            return
         try:
             self.status_label.configure(text="Solicitando logs...")
             self.refresh_btn.configure(state="disabled")
@@ -313,8 +411,75 @@ class LogsScreen(ctk.CTkFrame):
             self.status_label.configure(text=f"Erro no processamento: {str(e)}")
             self._update_logs_display(f"ERRO NO PROCESSAMENTO:\n{str(e)}")
 
+    def _load_local_logs(self):
+        """Carrega os logs do frontend direto do sink estruturado (sem I/O)"""
+        sink = get_structured_sink()
+        if sink is None:
+            self.status_label.configure(text="Sink local de logs desativado")
+            return
+        try:
+            self.log_index.reset()
+            for entry in sink.records(limit=LOCAL_LOG_LIMIT):
+                self.log_index.add_record(
+                    entry["ts"], entry["level"], entry["logger"], sink.format_entry(entry)
+                )
+            self._refresh_logger_options()
+            self._apply_filters()
+            self.status_label.configure(text=f"Logs locais - {datetime.now().strftime('%H:%M:%S')}")
+        except Exception as e:
+            ui_logger.error(f"Erro ao carregar logs locais: {e}")
+            self.status_label.configure(text=f"Erro: {str(e)}")
+
     def _update_logs_display(self, logs_content: str):
-        """Atualiza a exibição dos logs"""
+        """Reindexa o chunk recebido e exibe aplicando os filtros atuais"""
+        try:
+            self.log_index.reset()
+            self.log_index.add_chunk(logs_content)
+            self._refresh_logger_options()
+            self._apply_filters()
+        except Exception as e:
+            ui_logger.error(f"Erro ao indexar logs: {e}")
+            self._render_logs(logs_content, len(logs_content.split('\n')))
+
+    def _refresh_logger_options(self):
+        """Atualiza a lista de loggers conhecidos no combo"""
+        loggers = self.log_index.loggers
+        self.logger_combo.configure(values=[ALL_OPTION] + loggers)
+        if self.logger_var.get() not in loggers:
+            self.logger_var.set(ALL_OPTION)
+
+    def _schedule_filter(self, *args):
+        """Agenda a filtragem (debounce para não filtrar a cada tecla)"""
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(self._filter_delay, self._apply_filters)
+
+    def _apply_filters(self):
+        """Filtra as linhas indexadas e atualiza a exibição"""
+        self._filter_job = None
+        level = self.level_var.get()
+        levels = LEVELS[LEVELS.index(level):] if level in LEVELS else None
+        logger = self.logger_var.get()
+        loggers = [logger] if logger != ALL_OPTION else None
+        window = TIME_RANGES.get(self.range_var.get())
+        since = time.time() - window if window else None
+        
+        try:
+            lines = self.log_index.filter(
+                levels=levels,
+                loggers=loggers,
+                since=since,
+                text=self.search_var.get(),
+                regex=self.regex_var.get()
+            )
+        except re.error as e:
+            self.status_label.configure(text=f"Regex inválida: {e}")
+            return
+        
+        self._render_logs("\n".join(lines), len(lines))
+
+    def _render_logs(self, logs_content: str, shown: int):
+        """Escreve o conteúdo no textbox"""
         try:
             # Habilita edição temporariamente
             self.logs_text.configure(state="normal")
@@ -333,8 +498,11 @@ class LogsScreen(ctk.CTkFrame):
                 self.logs_text.see("end")
             
             # Atualiza contador de linhas
-            lines = len(logs_content.split('\n'))
-            self.lines_label.configure(text=f"{lines} linhas")
+            total = len(self.log_index)
+            if total and shown != total:
+                self.lines_label.configure(text=f"{shown} de {total} linhas")
+            else:
+                self.lines_label.configure(text=f"{shown} linhas")
             
         except Exception as e:
             ui_logger.error(f"Erro ao atualizar exibição de logs: {e}")
@@ -384,6 +552,7 @@ class LogsScreen(ctk.CTkFrame):
 
     def on_show(self):
         """Chamado quando a tela é mostrada"""
+        # Sem conexão o SHOW_LOGS fica na fila de envio até reconectar
         self._refresh_logs()
         if self._is_auto_refresh:
             self.status_label.configure(text="Auto-refresh ativado")
@@ -1,47 +1,105 @@
 # screen_manager.py
+import time
 import customtkinter as ctk
 from typing import Dict, Any, Optional, Callable
 from utils.logger import ui_logger
 
 class ScreenManager:
-    """Gerencia transições entre telas com cache e lifecycle"""
-    
-    def __init__(self, master):
+    """
+    Registro de telas com construção sob demanda, hooks de ciclo de vida
+    (on_show/on_hide) e descarte de telas pouco usadas sob pressão de memória
+    """
+
+    def __init__(self, master, memory_threshold: float = 85.0):
         self.master = master
+        self.memory_threshold = memory_threshold  # % de RAM a partir do qual telas são descartadas
         self.screens: Dict[str, ctk.CTkFrame] = {}
+        self.factories: Dict[str, Callable[[], ctk.CTkFrame]] = {}
+        self.evictable: Dict[str, bool] = {}
+        self.build_times: Dict[str, float] = {}  # ms da última construção de cada tela
+        self.last_used: Dict[str, float] = {}
         self.current_screen: Optional[str] = None
         self.screen_stack = []
-        
+
+    def register_factory(self, name: str, factory: Callable[[], ctk.CTkFrame], evictable: bool = True):
+        """Registra uma tela pela sua factory; a construção acontece no primeiro show"""
+        if name in self.factories or name in self.screens:
+            ui_logger.warning(f"Tela {name} já registrada. Substituindo.")
+            self.evict(name, force=True)
+        self.factories[name] = factory
+        self.evictable[name] = evictable
+        ui_logger.debug(f"Factory de tela registrada: {name}")
+
+    def add_screen(self, name: str, screen: ctk.CTkFrame):
+        """Registra uma tela já construída (nunca é descartada)"""
+        self.evictable[name] = False
+        self._place(name, screen)
+        return screen
+
     def register_screen(self, name: str, screen_class: type, *args, **kwargs):
         """Registra uma tela - mesma interface que antes"""
-        if name in self.screens:
-            ui_logger.warning(f"Tela {name} já registrada. Substituindo.")
-            
-        screen = screen_class(self.master, *args, **kwargs)
+        self.register_factory(name, lambda: screen_class(self.master, *args, **kwargs), evictable=False)
+        return self.ensure_screen(name)
+
+    def _place(self, name: str, screen: ctk.CTkFrame):
         screen.grid(row=0, column=0, sticky="nsew")
+        screen.grid_remove()  # Esconde por padrão
         self.screens[name] = screen
-        screen.lower()  # Esconde por padrão
-        
         ui_logger.debug(f"Tela registrada: {name}")
+
+    def ensure_screen(self, name: str) -> Optional[ctk.CTkFrame]:
+        """Retorna a tela, construindo-a pela factory se necessário"""
+        screen = self.screens.get(name)
+        if screen is not None:
+            return screen
+        factory = self.factories.get(name)
+        if factory is None:
+            return None
+
+        start = time.perf_counter()
+        screen = factory()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.build_times[name] = elapsed_ms
+        self._place(name, screen)
+        ui_logger.info(f"Tela '{name}' construída em {elapsed_ms:.0f} ms")
         return screen
 
     def show_screen(self, name: str):
         """Mostra tela específica - mesma interface que antes"""
-        if name not in self.screens:
+        screen = self.ensure_screen(name)
+        if screen is None:
             ui_logger.error(f"Tela não registrada: {name}")
             return
 
         # Esconde tela atual
-        if self.current_screen:
-            self.screens[self.current_screen].lower()
+        if self.current_screen and self.current_screen != name:
+            previous = self.screens.get(self.current_screen)
+            if previous is not None:
+                previous.grid_remove()
+                self._call_hook(previous, "on_hide")
 
         # Mostra nova tela
-        self.screens[name].lift()
+        changed = self.current_screen != name
+        screen.grid()
+        screen.lift()
         self.current_screen = name
+        self.last_used[name] = time.monotonic()
+        if changed:
+            self.screen_stack.append(name)
+            self._call_hook(screen, "on_show")
         ui_logger.info(f"Tela ativa: {name}")
 
+    @staticmethod
+    def _call_hook(screen, hook: str):
+        callback = getattr(screen, hook, None)
+        if callable(callback):
+            try:
+                callback()
+            except Exception as e:
+                ui_logger.error(f"Erro no {hook} de {type(screen).__name__}: {e}")
+
     def get_screen(self, name: str) -> Optional[ctk.CTkFrame]:
-        """Obtém referência para uma tela"""
+        """Obtém referência para uma tela (None se ainda não construída)"""
         return self.screens.get(name)
 
     def show_previous(self):
@@ -49,4 +107,51 @@ class ScreenManager:
         if len(self.screen_stack) > 1:
             self.screen_stack.pop()  # Remove atual
             previous = self.screen_stack.pop()  # Pega anterior
-            self.show_screen(previous)
\ No newline at end of file
+            self.show_screen(previous)
+
+    def evict(self, name: str, force: bool = False) -> bool:
+        """Destrói uma tela oculta; ela será reconstruída no próximo show"""
+        screen = self.screens.get(name)
+        if screen is None or name == self.current_screen:
+            return False
+        if not force and not (self.evictable.get(name) and name in self.factories):
+            return False
+
+        try:
+            screen.destroy()
+        except Exception as e:
+            ui_logger.debug(f"Erro destruindo tela {name}: {e}")
+        del self.screens[name]
+        self.last_used.pop(name, None)
+        ui_logger.info(f"Tela '{name}' descartada")
+        return True
+
+    def evict_under_pressure(self) -> Optional[str]:
+        """
+        Se o uso de RAM passou do limite, descarta a tela oculta usada
+        há mais tempo. Retorna o nome da tela descartada.
+        """
+        try:
+            import psutil
+            if psutil.virtual_memory().percent < self.memory_threshold:
+                return None
+        except Exception as e:
+            ui_logger.debug(f"Não foi possível ler uso de memória: {e}")
+            return None
+
+        candidates = [
+            name for name in self.screens
+            if name != self.current_screen and self.evictable.get(name) and name in self.factories
+        ]
+        if not candidates:
+            return None
+        oldest = min(candidates, key=lambda n: self.last_used.get(n, 0.0))
+        return oldest if self.evict(oldest) else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Telas residentes e tempos de construção"""
+        return {
+            "resident": sorted(self.screens),
+            "current": self.current_screen,
+            "build_ms": dict(self.build_times),
+        }
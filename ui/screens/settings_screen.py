@@ -418,7 +418,29 @@ class SettingsScreen(ctk.CTkFrame):
             font=FONTS["body"],
             height=32
         )
-        logs_btn.pack(fill="x", padx=12, pady=(0, 10))
+        logs_btn.pack(fill="x", padx=12, pady=(0, 6))
+
+        # Profiler por amostragem (gera .folded para flamegraph em logs/profiles)
+        self.profiler_btn = ctk.CTkButton(
+            system_frame,
+            text=self._profiler_button_text(),
+            command=self._toggle_profiler,
+            fg_color=COLORS["neutral"],
+            hover_color=COLORS["neutral_hover"],
+            font=FONTS["body"],
+            height=32
+        )
+        self.profiler_btn.pack(fill="x", padx=12, pady=(0, 4))
+
+        self.profiler_status = ctk.CTkLabel(
+            system_frame,
+            text="",
+            text_color=COLORS["text_secondary"],
+            font=FONTS["body_small"],
+            anchor="w",
+            wraplength=420
+        )
+        self.profiler_status.pack(fill="x", padx=12, pady=(0, 10))
 
     def _build_action_buttons(self):
         """Botões de ação principais"""
@@ -530,21 +552,18 @@ class SettingsScreen(ctk.CTkFrame):
             self._show_wifi_status(f"Erro: {str(e)}", False)
 
     def _show_wifi_status(self, status: str, success: bool = None):
-        """Mostra status da conexão Wi-Fi"""
-        def update_ui():
-            self.wifi_status_label.configure(text=status)
-            
-            if success is True:
-                self.wifi_status_label.configure(text_color=COLORS["success"])
-                # Limpar campos em caso de sucesso
-                self.ssid_var.set("")
-                self.password_var.set("")
-            elif success is False:
-                self.wifi_status_label.configure(text_color=COLORS["accent"])
-            else:
-                self.wifi_status_label.configure(text_color=COLORS["text_secondary"])
-        
-        self.after(0, update_ui)
+        """Mostra status da conexão Wi-Fi (thread do Tk: a app repassa pela UiDispatchQueue)"""
+        self.wifi_status_label.configure(text=status)
+
+        if success is True:
+            self.wifi_status_label.configure(text_color=COLORS["success"])
+            # Limpar campos em caso de sucesso
+            self.ssid_var.set("")
+            self.password_var.set("")
+        elif success is False:
+            self.wifi_status_label.configure(text_color=COLORS["accent"])
+        else:
+            self.wifi_status_label.configure(text_color=COLORS["text_secondary"])
 
     def _restart_service(self):
         """Reinicia o serviço da aplicação"""
@@ -574,6 +593,30 @@ class SettingsScreen(ctk.CTkFrame):
             ui_logger.error(f"Erro ao navegar para logs: {e}")
             self._show_error_message(f"Erro: {str(e)}")
             
+    def _profiler_button_text(self) -> str:
+        profiler = getattr(self._get_app_instance(), "profiler", None)
+        running = profiler is not None and profiler.running
+        return "Parar Profiler" if running else "Iniciar Profiler"
+
+    def _toggle_profiler(self):
+        """Liga/desliga o profiler por amostragem do app"""
+        app = self._get_app_instance()
+        if not hasattr(app, "toggle_profiler"):
+            self.profiler_status.configure(text="Profiler indisponível")
+            return
+        try:
+            running, path = app.toggle_profiler()
+        except Exception as e:
+            ui_logger.error(f"Erro alternando profiler: {e}")
+            self.profiler_status.configure(text=f"Erro: {e}")
+            return
+        if running:
+            text = "Amostrando todas as threads..."
+        else:
+            text = f"Perfil gravado em {path} (overhead {app.profiler.overhead_pct:.2f}%)"
+        self.profiler_btn.configure(text=self._profiler_button_text())
+        self.profiler_status.configure(text=text)
+
     def _show_error_message(self, message: str):
         """Mostra mensagem de erro temporária"""
         try:
@@ -642,9 +685,11 @@ class SettingsScreen(ctk.CTkFrame):
 
     def on_show(self):
         """Chamado quando a tela é mostrada - atualiza informações"""
+        self.profiler_btn.configure(text=self._profiler_button_text())
         try:
             # Solicitar informações atualizadas da Raspberry
             app = self._get_app_instance()
+            # send não bloqueia: sem conexão, o pedido fica na fila até reconectar
             if hasattr(app, 'tcp_client'):
                 app.tcp_client.send("GET_INFO".encode('utf-8'))
                 ui_logger.debug("Solicitando informações atualizadas da Raspberry")
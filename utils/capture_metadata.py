@@ -0,0 +1,251 @@
+"""
+Índice SQLite com os metadados das capturas (rótulo, confiança, data, local)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import ui_logger
+
+BACKFILL_BATCH = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    name        TEXT PRIMARY KEY,
+    label       TEXT,
+    confidence  REAL,
+    captured_at REAL NOT NULL,
+    latitude    REAL,
+    longitude   REAL,
+    source      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_captures_label ON captures(label, confidence);
+CREATE INDEX IF NOT EXISTS idx_captures_time ON captures(captured_at);
+"""
+
+# SQL constante + parâmetros: o sqlite3 reaproveita o statement preparado
+_UPSERT = """
+INSERT INTO captures (name, label, confidence, captured_at, latitude, longitude, source)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(name) DO UPDATE SET
+    label = excluded.label,
+    confidence = excluded.confidence,
+    captured_at = excluded.captured_at,
+    latitude = COALESCE(excluded.latitude, captures.latitude),
+    longitude = COALESCE(excluded.longitude, captures.longitude),
+    source = excluded.source
+"""
+_INSERT_IGNORE = """
+INSERT OR IGNORE INTO captures (name, label, confidence, captured_at, latitude, longitude, source)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SELECT_ONE = "SELECT name, label, confidence, captured_at, latitude, longitude, source FROM captures WHERE name = ?"
+_SELECT_LABELS = "SELECT DISTINCT label FROM captures WHERE label IS NOT NULL ORDER BY label"
+_SELECT_NAMES = "SELECT name FROM captures"
+_DELETE_ONE = "DELETE FROM captures WHERE name = ?"
+
+Row = Tuple[str, Optional[str], Optional[float], float, Optional[float], Optional[float], str]
+
+
+def normalize_confidence(value: Any) -> Optional[float]:
+    """Converte "87,5%", 0.875 ou 87.5 para porcentagem (0–100)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        text = value.strip().rstrip("%").replace(",", ".").strip()
+        try:
+            number = float(text)
+        except ValueError:
+            return None
+        # Texto com "%" já vem em porcentagem
+        return number if value.strip().endswith("%") or number > 1.0 else number * 100.0
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number * 100.0 if 0.0 <= number <= 1.0 else number
+
+
+class CaptureMetadataStore:
+    """
+    Banco SQLite (modo WAL) ao lado das imagens em CAPTURES_DIR.
+
+    Uma única conexão compartilhada entre threads, serializada por lock;
+    com WAL as leituras da galeria não esperam as escritas do backfill.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=64)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # ----- Escrita -----
+    def record(
+        self,
+        name: str,
+        label: Optional[str],
+        confidence: Any,
+        captured_at: Optional[float] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        source: str = "analysis",
+    ):
+        """Grava (ou substitui) o resultado de uma captura"""
+        row = (name, label, normalize_confidence(confidence),
+               captured_at if captured_at is not None else time.time(),
+               latitude, longitude, source)
+        with self._lock:
+            self._conn.execute(_UPSERT, row)
+            self._conn.commit()
+
+    def record_many(self, rows: Iterable[Row], replace: bool = False) -> int:
+        """Grava várias linhas numa única transação"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(_UPSERT if replace else _INSERT_IGNORE, rows)
+            self._conn.commit()
+        return len(rows)
+
+    def remove(self, name: str):
+        with self._lock:
+            self._conn.execute(_DELETE_ONE, (name,))
+            self._conn.commit()
+
+    # ----- Consultas -----
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(_SELECT_ONE, (name,)).fetchone()
+        if row is None:
+            return None
+        keys = ("name", "label", "confidence", "captured_at", "latitude", "longitude", "source")
+        return dict(zip(keys, row))
+
+    def labels(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(_SELECT_LABELS)]
+
+    def known_names(self) -> set:
+        with self._lock:
+            return {row[0] for row in self._conn.execute(_SELECT_NAMES)}
+
+    def query(
+        self,
+        label: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Nomes das capturas que atendem aos filtros, mais recentes primeiro.
+        min_confidence em porcentagem (80 = 80%); since/until em epoch.
+        """
+        clauses, params = [], []
+        if label is not None:
+            clauses.append("label = ?")
+            params.append(label)
+        if min_confidence is not None:
+            clauses.append("confidence >= ?")
+            params.append(float(min_confidence))
+        if since is not None:
+            clauses.append("captured_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("captured_at <= ?")
+            params.append(until)
+
+        sql = "SELECT name FROM captures"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY captured_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    # ----- Backfill -----
+    def backfill(self, directory: str, names: Iterable[str], max_workers: int = 2):
+        """
+        Indexa em background as imagens ainda sem linha no banco.
+        Lê sidecar JSON (<nome>.json) e EXIF quando existirem; caso contrário
+        registra só a data do arquivo. Não sobrescreve resultados de análise.
+        """
+        known = self.known_names()
+        missing = [n for n in names if n not in known]
+        if not missing:
+            return []
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Metadata-Backfill")
+
+        ui_logger.info(f"Backfill de metadados: {len(missing)} capturas")
+        chunks = [missing[i:i + BACKFILL_BATCH] for i in range(0, len(missing), BACKFILL_BATCH)]
+        return [self._executor.submit(self._backfill_chunk, directory, chunk) for chunk in chunks]
+
+    def _backfill_chunk(self, directory: str, names: List[str]) -> int:
+        rows = []
+        for name in names:
+            try:
+                rows.append(self._read_file_metadata(directory, name))
+            except OSError:
+                continue  # arquivo removido no meio do caminho
+            except Exception as e:
+                ui_logger.debug(f"Erro lendo metadados de {name}: {e}")
+        return self.record_many(rows)
+
+    @staticmethod
+    def _read_file_metadata(directory: str, name: str) -> Row:
+        path = os.path.join(directory, name)
+        captured_at = os.stat(path).st_mtime
+        label = confidence = latitude = longitude = None
+
+        sidecar = os.path.splitext(path)[0] + ".json"
+        has_sidecar = os.path.exists(sidecar)
+        if has_sidecar:
+            with open(sidecar, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            label = data.get("label_pt", data.get("label"))
+            confidence = normalize_confidence(data.get("confidence"))
+            captured_at = float(data.get("timestamp", captured_at))
+            latitude = data.get("latitude")
+            longitude = data.get("longitude")
+
+        if has_sidecar:
+            return (name, label, confidence, captured_at, latitude, longitude, "backfill")
+
+        try:
+            from PIL import Image
+            with Image.open(path) as img:
+                exif = img.getexif()
+            # 0x0132 = DateTime; GPS (0x8825) fica para quando houver GPS no campo
+            stamp = exif.get(0x0132)
+            if stamp:
+                captured_at = datetime.strptime(stamp, "%Y:%m:%d %H:%M:%S").timestamp()
+        except Exception:
+            pass
+
+        return (name, label, confidence, captured_at, latitude, longitude, "backfill")
+
+    def close(self):
+        if self._executor is not None:
+            # Chunks pendentes são cancelados; o que já está rodando termina antes do close
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,315 @@
+"""
+Índice em memória das capturas, mantido por inotify (Linux) ou polling
+"""
+import bisect
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.logger import ui_logger
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+FULL_RESCAN_POLLS = 15  # no modo polling, varredura completa a cada N ciclos
+
+# Constantes de <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+_WATCH_MASK = (_IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_MOVED_FROM | _IN_DELETE
+               | _IN_DELETE_SELF | _IN_MOVE_SELF)
+
+
+@dataclass
+class CaptureEntry:
+    """Uma captura no diretório, com metadados de análise quando conhecidos"""
+    name: str
+    mtime_ns: int
+    size: int
+    label: Optional[str] = None
+    confidence: Optional[float] = None
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    @property
+    def sort_key(self) -> Tuple[int, str]:
+        # Mais recentes primeiro; nome desempata de forma estável
+        return (-self.mtime_ns, self.name)
+
+
+class _Inotify:
+    """Wrapper mínimo de inotify via ctypes (sem dependências externas)"""
+
+    def __init__(self, path: str):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc não encontrada")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify indisponível")
+
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch falhou em {path}")
+
+    def read(self, timeout: float) -> List[Tuple[int, str]]:
+        """Eventos (máscara, nome) disponíveis em até `timeout` segundos"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append((mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class CapturesIndex:
+    """
+    Lista ordenada (mais recentes primeiro) das imagens de um diretório.
+
+    O diretório é lido uma vez no `start`; depois disso só os arquivos
+    que mudaram são atualizados, via inotify quando disponível ou por
+    polling comparando mtime/tamanho. Consultas (`__len__`, `page`) não
+    tocam o disco. Listeners são chamados na thread do watcher.
+    """
+
+    def __init__(self, directory: str, extensions=IMAGE_EXTENSIONS, poll_interval: float = 2.0):
+        self.directory = directory
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.poll_interval = poll_interval
+        self.backend: Optional[str] = None  # "inotify" ou "polling"
+        self.version = 0                    # incrementado a cada mudança
+
+        self._lock = threading.RLock()
+        self._entries: Dict[str, CaptureEntry] = {}
+        self._order: List[Tuple[int, str]] = []  # sort_keys em ordem crescente
+        self._listeners: List[Callable[[], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    # ----- Ciclo de vida -----
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="Captures-Watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda a leitura inicial do diretório"""
+        return self._ready.wait(timeout)
+
+    def add_listener(self, callback: Callable[[], None]):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    # ----- Consultas -----
+    def __len__(self):
+        return len(self._order)
+
+    def page(self, start: int, count: int) -> List[CaptureEntry]:
+        """Entradas [start, start+count) na ordem de exibição"""
+        with self._lock:
+            keys = self._order[max(0, start):max(0, start) + count]
+            return [self._entries[name] for _, name in keys]
+
+    def get(self, name: str) -> Optional[CaptureEntry]:
+        return self._entries.get(name)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return [name for _, name in self._order]
+
+    def set_metadata(self, name: str, label: Optional[str] = None, confidence: Optional[float] = None):
+        """Associa o resultado da análise a uma captura já indexada"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            entry.label = label
+            entry.confidence = confidence
+            self.version += 1
+        self._notify()
+
+    # ----- Atualização -----
+    def refresh(self, name: str) -> bool:
+        """Relê um único arquivo (inclusão, alteração ou remoção)"""
+        if not self._accepts(name):
+            return False
+        try:
+            st = os.stat(os.path.join(self.directory, name))
+        except OSError:
+            return self._remove(name)
+        return self._upsert(name, st.st_mtime_ns, st.st_size)
+
+    def rescan(self):
+        """Sincroniza o índice com o diretório inteiro"""
+        found: Dict[str, Tuple[int, int]] = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for de in it:
+                    if self._accepts(de.name) and de.is_file():
+                        st = de.stat()
+                        found[de.name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+
+        changed = False
+        with self._lock:
+            for name in [n for n in self._entries if n not in found]:
+                changed |= self._remove(name, notify=False)
+            for name, (mtime_ns, size) in found.items():
+                changed |= self._upsert(name, mtime_ns, size, notify=False)
+        if changed:
+            self._notify()
+
+    def _accepts(self, name: str) -> bool:
+        return not name.startswith(".") and name.lower().endswith(self.extensions)
+
+    def _upsert(self, name: str, mtime_ns: int, size: int, notify: bool = True) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                if entry.mtime_ns == mtime_ns and entry.size == size:
+                    return False
+                del self._order[bisect.bisect_left(self._order, entry.sort_key)]
+                entry.mtime_ns, entry.size = mtime_ns, size
+            else:
+                entry = CaptureEntry(name, mtime_ns, size)
+                self._entries[name] = entry
+            bisect.insort(self._order, entry.sort_key)
+            self.version += 1
+        if notify:
+            self._notify()
+        return True
+
+    def _remove(self, name: str, notify: bool = True) -> bool:
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is None:
+                return False
+            del self._order[bisect.bisect_left(self._order, entry.sort_key)]
+            self.version += 1
+        if notify:
+            self._notify()
+        return True
+
+    def _notify(self):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback()
+            except Exception as e:
+                ui_logger.debug(f"Erro em listener do índice de capturas: {e}")
+
+    # ----- Watcher -----
+    def _run(self):
+        os.makedirs(self.directory, exist_ok=True)
+        watcher = None
+        try:
+            watcher = _Inotify(self.directory)
+            self.backend = "inotify"
+        except (OSError, AttributeError) as e:
+            self.backend = "polling"
+            ui_logger.debug(f"inotify indisponível ({e}); usando polling a cada {self.poll_interval}s")
+
+        # Leitura inicial depois de armar o watch: nada criado no meio se perde
+        self.rescan()
+        self._ready.set()
+        ui_logger.info(f"Índice de capturas: {len(self)} imagens ({self.backend})")
+
+        try:
+            if watcher is not None:
+                self._watch_inotify(watcher)
+            else:
+                self._watch_polling()
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+    def _watch_inotify(self, watcher: _Inotify):
+        while not self._stop.is_set():
+            try:
+                events = watcher.read(0.5)
+            except OSError as e:
+                ui_logger.warning(f"Falha lendo inotify ({e}); mudando para polling")
+                self.backend = "polling"
+                self._watch_polling()
+                return
+
+            names = set()
+            for mask, name in events:
+                if mask & (_IN_Q_OVERFLOW | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+                    # Eventos perdidos ou diretório recriado: ressincroniza
+                    self.rescan()
+                    if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+                        self.backend = "polling"
+                        self._watch_polling()
+                        return
+                elif name:
+                    names.add(name)
+            for name in names:
+                self.refresh(name)
+
+    def _watch_polling(self):
+        last_dir_mtime = None
+        polls = 0
+        while not self._stop.wait(self.poll_interval):
+            polls += 1
+            try:
+                dir_mtime = os.stat(self.directory).st_mtime_ns
+            except OSError:
+                dir_mtime = None
+            # Criação/remoção/renomeação alteram o mtime do diretório; arquivos
+            # reescritos no lugar só são vistos na varredura completa periódica
+            if dir_mtime is None or dir_mtime != last_dir_mtime or polls % FULL_RESCAN_POLLS == 0:
+                last_dir_mtime = dir_mtime
+                self.rescan()
@@ -0,0 +1,17 @@
+"""
+Nomes legíveis de code objects ("func (arquivo.py:linha)"), usados pelo
+watchdog do Tk e pelo profiler por amostragem
+"""
+import os
+from typing import Optional
+
+
+def qualname(code) -> str:
+    # co_qualname só existe a partir do Python 3.11 (o frontend roda em 3.10)
+    return getattr(code, "co_qualname", code.co_name)
+
+
+def code_label(code, lineno: Optional[int] = None) -> str:
+    """Sem `lineno`, usa a primeira linha da função"""
+    line = code.co_firstlineno if lineno is None else lineno
+    return f"{qualname(code)} ({os.path.basename(code.co_filename)}:{line})"
@@ -0,0 +1,204 @@
+"""
+Latência ponta a ponta dos frames de vídeo: timestamps por estágio e
+histogramas no estilo HDR (erro relativo limitado, memória fixa)
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+# Estágios na ordem em que acontecem
+STAGES = (
+    "first_fragment",  # 1º datagrama/cabeçalho do frame recebido
+    "complete",        # frame remontado
+    "decode_start",
+    "decode_end",
+    "handed_to_tk",    # agendado na thread da UI (after)
+    "resize",          # redimensionado na UI
+    "presented",       # após o redraw (after_idle)
+)
+_INDEX = {name: i for i, name in enumerate(STAGES)}
+
+# Intervalos agregados: nome -> (estágio inicial, estágio final)
+INTERVALS = {
+    "rede": ("first_fragment", "complete"),
+    "fila_decode": ("complete", "decode_start"),
+    "decode": ("decode_start", "decode_end"),
+    "ate_tk": ("decode_end", "handed_to_tk"),
+    "fila_tk": ("handed_to_tk", "resize"),
+    "apresentacao": ("resize", "presented"),
+    "total": ("first_fragment", "presented"),
+}
+
+
+class LatencyHistogram:
+    """
+    Histograma log-linear de durações (em µs), como o HdrHistogram: cada
+    potência de 2 é dividida em `2**sub_bits` faixas, então o erro relativo
+    de um percentil fica abaixo de 1/2**sub_bits (≈1.6% com sub_bits=6).
+    `record` é O(1) e não aloca.
+    """
+
+    def __init__(self, max_us: int = 60_000_000, sub_bits: int = 6):
+        self.sub_bits = sub_bits
+        self._sub_count = 1 << sub_bits
+        self._max_us = max_us
+        self._counts = [0] * self._bucket(max_us) + [0]
+        self.count = 0
+        self.total_us = 0
+        self.max_value_us = 0
+
+    def _bucket(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits - 1
+        return ((shift + 1) << self.sub_bits) + (value >> shift) - self._sub_count
+
+    def _bucket_value(self, index: int) -> int:
+        """Maior valor representado pela faixa (limite superior)"""
+        if index < self._sub_count:
+            return index
+        shift = (index >> self.sub_bits) - 1
+        mantissa = (index & (self._sub_count - 1)) + self._sub_count
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        value = int(seconds * 1_000_000)
+        if value < 0:
+            return
+        if value > self._max_us:
+            value = self._max_us
+        self._counts[self._bucket(value)] += 1
+        self.count += 1
+        self.total_us += value
+        if value > self.max_value_us:
+            self.max_value_us = value
+
+    def percentile(self, pct: float) -> float:
+        """Percentil em milissegundos (0.0 se vazio)"""
+        if not self.count:
+            return 0.0
+        target = max(1, int(self.count * pct / 100.0 + 0.5))
+        seen = 0
+        for index, n in enumerate(self._counts):
+            if n:
+                seen += n
+                if seen >= target:
+                    return min(self._bucket_value(index), self.max_value_us) / 1000.0
+        return self.max_value_us / 1000.0
+
+    def percentiles(self, pcts: Iterable[float] = (50, 90, 99)) -> Dict[str, float]:
+        return {f"p{pct:g}": self.percentile(pct) for pct in pcts}
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_us / self.count / 1000.0 if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        data = {"count": self.count, "mean": round(self.mean_ms, 3), "max": self.max_value_us / 1000.0}
+        data.update(self.percentiles())
+        return data
+
+    def reset(self):
+        self._counts = [0] * len(self._counts)
+        self.count = 0
+        self.total_us = 0
+        self.max_value_us = 0
+
+
+class FrameTrace:
+    """Timestamps (perf_counter) de um frame ao longo do pipeline"""
+
+    __slots__ = ("frame_id", "times", "sent_at", "received_wall")
+
+    def __init__(self, frame_id, first_fragment_at: Optional[float] = None, sent_at: Optional[float] = None):
+        self.frame_id = frame_id
+        self.times: List[Optional[float]] = [None] * len(STAGES)
+        self.times[0] = first_fragment_at if first_fragment_at is not None else time.perf_counter()
+        # Relógio de parede no 1º fragmento, para comparar com o timestamp do emissor
+        self.received_wall = time.time() - (time.perf_counter() - self.times[0])
+        self.sent_at = sent_at
+
+    def mark(self, stage: str, at: Optional[float] = None):
+        self.times[_INDEX[stage]] = at if at is not None else time.perf_counter()
+
+
+class FrameLatencyTracker:
+    """
+    Agrega os FrameTrace concluídos em um histograma por intervalo.
+    Com timestamp do emissor, registra também "glass_to_glass" (depende
+    dos relógios da Raspberry e do frontend estarem sincronizados).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {name: LatencyHistogram() for name in INTERVALS}
+        self.histograms["glass_to_glass"] = LatencyHistogram()
+        self.frames = 0
+        self.dropped = 0  # traces descartados antes de apresentar (Home oculta etc.)
+        self.started_at = time.time()
+
+    def start(self, frame_id, first_fragment_at: Optional[float] = None,
+              sent_at: Optional[float] = None) -> FrameTrace:
+        return FrameTrace(frame_id, first_fragment_at, sent_at)
+
+    def drop(self, trace: Optional[FrameTrace]):
+        if trace is not None:
+            self.dropped += 1
+
+    def finish(self, trace: Optional[FrameTrace]):
+        """Registra um frame apresentado (estágios ausentes são ignorados)"""
+        if trace is None:
+            return
+        times = trace.times
+        if times[-1] is None:
+            trace.mark("presented")
+        with self._lock:
+            self.frames += 1
+            for name, (start, end) in INTERVALS.items():
+                t0, t1 = times[_INDEX[start]], times[_INDEX[end]]
+                if t0 is not None and t1 is not None:
+                    self.histograms[name].record(t1 - t0)
+            if trace.sent_at:
+                presented_wall = trace.received_wall + (times[-1] - times[0])
+                self.histograms["glass_to_glass"].record(presented_wall - trace.sent_at)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: h.summary() for name, h in self.histograms.items() if h.count}
+
+    def overlay_text(self) -> str:
+        """Texto compacto (p50/p99 em ms) para o overlay da HomeScreen"""
+        lines = [f"latência ms  p50 / p99   ({self.frames} frames)"]
+        for name, data in self.summary().items():
+            lines.append(f"{name:<14}{data['p50']:>6.1f} / {data['p99']:>6.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        """Grava o resumo dos histogramas em JSON"""
+        data = {
+            "since": self.started_at,
+            "until": time.time(),
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "intervals": self.summary(),
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+        return data
+
+    def reset(self):
+        with self._lock:
+            for h in self.histograms.values():
+                h.reset()
+            self.frames = 0
+            self.dropped = 0
+            self.started_at = time.time()
+
+
+# Instância do processo (compartilhada por vídeo e UI)
+frame_latency = FrameLatencyTracker()
@@ -0,0 +1,213 @@
+"""
+Índice incremental de linhas de log para filtragem no cliente
+"""
+import re
+import bisect
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Iterable
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Formato padrão dos loggers: "2024-01-31 12:00:00.123 - strawberry.video - INFO - mensagem"
+_LINE_RE = re.compile(
+    r"^(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})(?:[.,](\d{1,6}))?"
+    r"\s+-\s+(\S+)\s+-\s+(DEBUG|INFO|WARNING|WARN|ERROR|CRITICAL)\s+-\s"
+)
+
+
+class LogIndex:
+    """
+    Mantém as linhas de log já parseadas e indexadas por nível e logger.
+
+    Cada chunk recebido é processado uma única vez em `add_chunk`; a filtragem
+    só percorre os índices, sem reparsear o texto a cada tecla.
+    Linhas de continuação (tracebacks, etc.) herdam os campos da linha anterior.
+    """
+
+    def __init__(self, max_lines: int = 200_000):
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Descarta todas as linhas indexadas"""
+        with self._lock:
+            self._lines: List[str] = []
+            self._lower: List[str] = []
+            self._times: List[float] = []
+            self._monotonic = True
+            self._by_level: Dict[str, List[int]] = {}
+            self._by_logger: Dict[str, List[int]] = {}
+            self._last = (0.0, "INFO", "")
+            self._last_base = ("", 0.0)
+
+    def __len__(self):
+        return len(self._lines)
+
+    @property
+    def loggers(self) -> List[str]:
+        """Nomes de logger já vistos, ordenados"""
+        return sorted(self._by_logger)
+
+    @property
+    def levels(self) -> List[str]:
+        """Níveis presentes no índice, na ordem de severidade"""
+        return [lvl for lvl in LEVELS if lvl in self._by_level]
+
+    def add_chunk(self, text: str) -> int:
+        """Indexa um bloco de texto (uma ou mais linhas). Retorna quantas linhas entraram."""
+        if not text:
+            return 0
+        lines = text.splitlines()
+        with self._lock:
+            for line in lines:
+                match = _LINE_RE.match(line)
+                if match:
+                    ts = self._parse_ts(match.group(1), match.group(2))
+                    level = match.group(4)
+                    if level == "WARN":
+                        level = "WARNING"
+                    self._last = (ts, level, match.group(3))
+                self._append(line, *self._last)
+            self._trim()
+        return len(lines)
+
+    def add_record(self, ts: float, level: str, logger: str, line: str):
+        """Indexa um registro já estruturado (sem parse de texto)"""
+        with self._lock:
+            self._last = (ts, level, logger)
+            self._append(line, ts, level, logger)
+            self._trim()
+
+    def _append(self, line: str, ts: float, level: str, logger: str):
+        idx = len(self._lines)
+        if self._times and ts < self._times[-1]:
+            self._monotonic = False
+        self._lines.append(line)
+        self._lower.append(line.lower())
+        self._times.append(ts)
+        self._by_level.setdefault(level, []).append(idx)
+        if logger:
+            self._by_logger.setdefault(logger, []).append(idx)
+
+    def _trim(self):
+        """Remove as linhas mais antigas quando o limite é excedido"""
+        excess = len(self._lines) - self.max_lines
+        if excess <= 0:
+            return
+        self._lines = self._lines[excess:]
+        self._lower = self._lower[excess:]
+        self._times = self._times[excess:]
+        for table in (self._by_level, self._by_logger):
+            for key in list(table):
+                ids = table[key]
+                cut = bisect.bisect_left(ids, excess)
+                rest = [i - excess for i in ids[cut:]]
+                if rest:
+                    table[key] = rest
+                else:
+                    del table[key]
+
+    def _parse_ts(self, base: str, frac: Optional[str]) -> float:
+        # Linhas vizinhas costumam cair no mesmo segundo: evita strptime repetido
+        if base == self._last_base[0]:
+            ts = self._last_base[1]
+        else:
+            try:
+                ts = datetime.strptime(base.replace("T", " "), "%Y-%m-%d %H:%M:%S").timestamp()
+            except ValueError:
+                return 0.0
+            self._last_base = (base, ts)
+        if frac:
+            ts += int(frac) / (10 ** len(frac))
+        return ts
+
+    def filter(
+        self,
+        levels: Optional[Iterable[str]] = None,
+        loggers: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        text: Optional[str] = None,
+        regex: bool = False,
+    ) -> List[str]:
+        """
+        Retorna as linhas que atendem a todos os filtros informados.
+
+        levels/loggers: conjuntos aceitos (None = todos). Um logger também
+        casa com seus filhos ("strawberry" inclui "strawberry.video").
+        since/until: timestamps (epoch) inclusivos.
+        text: substring (sem diferenciar maiúsculas) ou regex se `regex=True`.
+        Levanta re.error se a regex for inválida.
+        """
+        pattern = None
+        if text:
+            pattern = re.compile(text, re.IGNORECASE) if regex else None
+            needle = text.lower()
+
+        with self._lock:
+            candidates = self._candidates(levels, loggers)
+            if since is not None or until is not None:
+                candidates = self._time_range(candidates, since, until)
+
+            lines = self._lines
+            if not text:
+                if candidates is None:
+                    return list(lines)
+                return [lines[i] for i in candidates]
+
+            if candidates is None:
+                candidates = range(len(lines))
+            if pattern is not None:
+                return [lines[i] for i in candidates if pattern.search(lines[i])]
+            lower = self._lower
+            return [lines[i] for i in candidates if needle in lower[i]]
+
+    def _candidates(self, levels, loggers) -> Optional[List[int]]:
+        """Une/intersecta as listas de índices; None significa 'todas as linhas'"""
+        result = None
+        if levels is not None:
+            result = self._merge(self._by_level.get(lvl, ()) for lvl in set(levels))
+        if loggers is not None:
+            wanted = set(loggers)
+            keys = [
+                name for name in self._by_logger
+                if name in wanted or any(name.startswith(w + ".") for w in wanted)
+            ]
+            by_logger = self._merge(self._by_logger[k] for k in keys)
+            if result is None:
+                result = by_logger
+            else:
+                allowed = set(by_logger)
+                result = [i for i in result if i in allowed]
+        return result
+
+    @staticmethod
+    def _merge(lists) -> List[int]:
+        merged: List[int] = []
+        count = 0
+        for ids in lists:
+            merged.extend(ids)
+            count += 1
+        if count > 1:
+            merged.sort()
+        return merged
+
+    def _time_range(self, candidates, since, until) -> List[int]:
+        times = self._times
+        lo_ts = since if since is not None else float("-inf")
+        hi_ts = until if until is not None else float("inf")
+
+        if self._monotonic:
+            lo = bisect.bisect_left(times, lo_ts)
+            hi = bisect.bisect_right(times, hi_ts)
+            if candidates is None:
+                return list(range(lo, hi))
+            start = bisect.bisect_left(candidates, lo)
+            end = bisect.bisect_left(candidates, hi)
+            return candidates[start:end]
+
+        if candidates is None:
+            candidates = range(len(times))
+        return [i for i in candidates if lo_ts <= times[i] <= hi_ts]
@@ -0,0 +1,132 @@
+"""
+Sink estruturado de logs: ring buffer em memória por logger e,
+opcionalmente, arquivo JSON lines.
+"""
+import heapq
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Iterable
+
+
+class StructuredLogHandler(logging.Handler):
+    """
+    Guarda os últimos `ring_size` registros de cada logger como dicts
+    (ts, level, logger, thread, msg) e, se `jsonl_path` for informado,
+    grava cada registro como uma linha JSON compacta.
+
+    Roda na thread do QueueListener, então não custa nada às threads que logam.
+    """
+
+    FLUSH_INTERVAL = 1.0  # segundos entre flushes do arquivo JSONL
+
+    def __init__(self, ring_size: int = 500, jsonl_path: Optional[Path] = None):
+        super().__init__(logging.DEBUG)
+        self.ring_size = ring_size
+        self._rings: Dict[str, deque] = {}
+        self._rings_lock = threading.Lock()
+        self._file = None
+        self._last_flush = 0.0
+        if jsonl_path is not None:
+            jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(jsonl_path, "a", encoding="utf-8")
+
+    def emit(self, record):
+        try:
+            msg = record.getMessage()
+            # Vindo do BoundedQueueHandler, o traceback já está no fim de `msg`
+            exc = getattr(record, "exc_detail", None)
+            if exc and msg.endswith(exc):
+                msg = msg[:-len(exc)].rstrip("\n")
+            elif record.exc_info:
+                exc = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            entry = {
+                "ts": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "thread": record.threadName,
+                "msg": msg,
+            }
+            if exc:
+                entry["exc"] = exc
+
+            with self._rings_lock:
+                ring = self._rings.get(record.name)
+                if ring is None:
+                    ring = self._rings[record.name] = deque(maxlen=self.ring_size)
+                ring.append(entry)
+
+            if self._file is not None:
+                self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+                now = time.monotonic()
+                if now - self._last_flush >= self.FLUSH_INTERVAL:
+                    self._file.flush()
+                    self._last_flush = now
+        except Exception:
+            self.handleError(record)
+
+    @property
+    def loggers(self) -> List[str]:
+        with self._rings_lock:
+            return sorted(self._rings)
+
+    def records(
+        self,
+        loggers: Optional[Iterable[str]] = None,
+        levels: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Registros em memória, em ordem cronológica, filtrados por campo.
+        Um logger também inclui seus filhos ("strawberry" -> "strawberry.video").
+        """
+        with self._rings_lock:
+            if loggers is None:
+                selected = [list(ring) for ring in self._rings.values()]
+            else:
+                wanted = set(loggers)
+                selected = [
+                    list(ring) for name, ring in self._rings.items()
+                    if name in wanted or any(name.startswith(w + ".") for w in wanted)
+                ]
+
+        merged = heapq.merge(*selected, key=lambda entry: entry["ts"])
+        level_set = set(levels) if levels is not None else None
+        result = [
+            entry for entry in merged
+            if (level_set is None or entry["level"] in level_set)
+            and (since is None or entry["ts"] >= since)
+        ]
+        if limit is not None:
+            result = result[-limit:]
+        return result
+
+    @staticmethod
+    def format_entry(entry: dict) -> str:
+        """Representação em texto no mesmo formato do arquivo .log"""
+        ct = datetime.fromtimestamp(entry["ts"])
+        line = (
+            f"{ct.strftime('%Y-%m-%d %H:%M:%S')}.{ct.microsecond // 1000:03d} - "
+            f"{entry['logger']} - {entry['level']} - {entry['msg']}"
+        )
+        if "exc" in entry:
+            line += "\n" + entry["exc"]
+        return line
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        try:
+            if self._file is not None:
+                self._file.flush()
+                self._file.close()
+                self._file = None
+        finally:
+            super().close()
@@ -1,21 +1,50 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
 
-class FileFormatter(logging.Formatter):
+# Fila de logs: tamanho e política quando cheia ("drop" descarta, "block" espera)
+LOG_QUEUE_SIZE = int(os.getenv("STRAWBERRY_LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_POLICY = os.getenv("STRAWBERRY_LOG_QUEUE_POLICY", "drop").lower()
+LOG_QUEUE_BLOCK_TIMEOUT = 0.5  # segundos máximos de espera na política "block"
+
+# Sink estruturado: registros mantidos em memória por logger (0 desativa)
+# e arquivo JSON lines opcional
+LOG_RING_SIZE = int(os.getenv("STRAWBERRY_LOG_RING_SIZE", "500"))
+LOG_JSONL = os.getenv("STRAWBERRY_LOG_JSONL", "0").lower() in ("1", "true", "yes")
+_EXC_FORMATTER = logging.Formatter()  # traceback do registro, separado para o sink estruturado
+
+class _CachedTimeMixin:
+    """
+    formatTime com cache do prefixo por segundo: strftime roda uma vez por
+    segundo e só os milissegundos são anexados a cada registro.
+    """
+
+    default_datefmt = '%Y-%m-%d %H:%M:%S.%f'
+
     def formatTime(self, record, datefmt=None):
-        from datetime import datetime
-        ct = datetime.fromtimestamp(record.created)
-        if datefmt:
-            s = ct.strftime(datefmt.replace('%f', f"{ct.microsecond // 1000:03d}"))
-        else:
-            s = ct.strftime("%Y-%m-%d %H:%M:%S") + f".{ct.microsecond // 1000:03d}"
-        return s
-
-class CustomFormatter(logging.Formatter):
+        datefmt = datefmt or self.default_datefmt
+        second = int(record.created)
+        cache = self.__dict__.get("_time_cache")
+        if cache is None or cache[0] != second or cache[1] != datefmt:
+            ct = datetime.fromtimestamp(second)
+            head, sep, tail = datefmt.partition('%f')
+            cache = (second, datefmt, ct.strftime(head), ct.strftime(tail) if sep else None)
+            self._time_cache = cache
+        if cache[3] is None:
+            return cache[2]
+        return f"{cache[2]}{int(record.msecs):03d}{cache[3]}"
+
+
+class FileFormatter(_CachedTimeMixin, logging.Formatter):
+    pass
+
+class CustomFormatter(_CachedTimeMixin, logging.Formatter):
     """Formatação colorida para console"""
     
     # Cores ANSI
@@ -39,25 +68,203 @@ class CustomFormatter(logging.Formatter):
         logging.ERROR: red + format_str + reset,
         logging.CRITICAL: bold_red + format_str + reset
     }
-    
-    def formatTime(self, record, datefmt=None):
-        """Formata o tempo com precisão em milissegundos"""
-        from datetime import datetime
-        ct = datetime.fromtimestamp(record.created)
-        if datefmt:
-            s = ct.strftime(datefmt.replace('%f', f"{ct.microsecond // 1000:03d}"))
-        else:
-            s = ct.strftime("%Y-%m-%d %H:%M:%S") + f".{ct.microsecond // 1000:03d}"
-        return s
+
+    def __init__(self, use_color=True):
+        super().__init__(self.format_str, datefmt=self.default_datefmt)
+        self.use_color = use_color
+        # Um formatter por nível, criado uma única vez e com o mesmo cache de tempo
+        self._formatters = {}
+        if use_color:
+            for level, fmt in self.FORMATS.items():
+                formatter = logging.Formatter(fmt, datefmt=self.default_datefmt)
+                formatter.formatTime = self.formatTime
+                self._formatters[level] = formatter
 
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt, datefmt='%Y-%m-%d %H:%M:%S.%f')
-        formatter.formatTime = self.formatTime  # aplica customização
+        formatter = self._formatters.get(record.levelno)
+        if formatter is None:
+            # Sem TTY (ou nível customizado): formato simples, sem códigos ANSI
+            return super().format(record)
         return formatter.format(record)
 
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler com fila limitada: a thread que loga só enfileira o registro.
+    Quando a fila enche, descarta (política "drop") ou espera até
+    `block_timeout` (política "block") e então descarta.
+    """
+
+    def __init__(self, log_queue, policy="drop", block_timeout=LOG_QUEUE_BLOCK_TIMEOUT, to_file=True):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.to_file = to_file
+
+    def prepare(self, record):
+        # O prepare da base junta o traceback em `msg` e limpa exc_info/exc_text;
+        # o sink estruturado recebe o traceback à parte em `exc_detail`
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+        exc_text = record.exc_text
+        record = super().prepare(record)
+        record.to_file = self.to_file
+        record.exc_detail = exc_text
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            _pipeline.record_dropped()
+
+
+class _FileOnlyFilter(logging.Filter):
+    """Respeita o `log_to_file=False` de cada logger no handler de arquivo"""
+
+    def filter(self, record):
+        return getattr(record, "to_file", True)
+
+
+def _stream_is_tty(stream):
+    try:
+        return stream.isatty()
+    except Exception:
+        return False
+
+
+class LogPipeline:
+    """
+    Pipeline assíncrono compartilhado: formatação e I/O (console e arquivo)
+    acontecem numa única thread de background (QueueListener).
+    """
+
+    def __init__(self, maxsize=LOG_QUEUE_SIZE, policy=LOG_QUEUE_POLICY):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.policy = policy if policy in ("drop", "block") else "drop"
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._listener = None
+        self._handlers = []
+        self.structured = None
+
+    def record_dropped(self):
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def _build_handlers(self):
+        file_formatter = FileFormatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S.%f'
+        )
+
+        # Handler para console
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(CustomFormatter(use_color=_stream_is_tty(sys.stdout)))
+        handlers = [console_handler]
+
+        # Handler para arquivo
+        try:
+            # Criar diretório de logs se não existir
+            log_dir = Path("logs")
+            log_dir.mkdir(exist_ok=True)
+
+            # Arquivo com data
+            log_file = log_dir / f"strawberry_frontend_{datetime.now().strftime('%Y%m%d')}.log"
+
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=5*1024*1024,  # 5MB
+                backupCount=3,
+                encoding='utf-8'
+            )
+            file_handler.setLevel(logging.DEBUG)  # Arquivo guarda tudo
+            file_handler.setFormatter(file_formatter)
+            file_handler.addFilter(_FileOnlyFilter())
+            handlers.append(file_handler)
+        except OSError as e:
+            print(f"⚠️ Não foi possível abrir arquivo de log: {e}")
+
+        # Sink estruturado (ring em memória + JSONL opcional)
+        if LOG_RING_SIZE > 0 or LOG_JSONL:
+            from utils.log_sink import StructuredLogHandler
+
+            jsonl_path = None
+            if LOG_JSONL:
+                jsonl_path = Path("logs") / f"strawberry_frontend_{datetime.now().strftime('%Y%m%d')}.jsonl"
+            try:
+                self.structured = StructuredLogHandler(
+                    ring_size=max(LOG_RING_SIZE, 1),
+                    jsonl_path=jsonl_path
+                )
+                handlers.append(self.structured)
+            except OSError as e:
+                print(f"⚠️ Não foi possível abrir sink estruturado: {e}")
+
+        return handlers
+
+    def start(self):
+        """Inicia a thread de escrita (idempotente)"""
+        if self._listener is not None:
+            return
+        self._handlers = self._build_handlers()
+        self._listener = logging.handlers.QueueListener(
+            self.queue, *self._handlers, respect_handler_level=True
+        )
+        self._listener.start()
+        self._listener._thread.name = "Log-Writer"
+
+    def stop(self):
+        """Esvazia a fila e fecha os handlers"""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        for handler in self._handlers:
+            try:
+                handler.close()
+            except Exception:
+                pass
+        self._handlers = []
+
+    def handler(self, to_file=True):
+        """Cria o handler de enfileiramento para um logger"""
+        self.start()
+        return BoundedQueueHandler(self.queue, policy=self.policy, to_file=to_file)
+
+    def stats(self):
+        """Métricas da fila de logs"""
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "dropped": self.dropped,
+            "policy": self.policy,
+        }
+
+
+_pipeline = LogPipeline()
+atexit.register(_pipeline.stop)
+
+
+def get_log_stats():
+    """Retorna profundidade da fila e quantidade de registros descartados"""
+    return _pipeline.stats()
+
+
+def get_structured_sink():
+    """Sink estruturado ativo (ou None se desativado)"""
+    return _pipeline.structured
+
+
+def shutdown_logging():
+    """Drena a fila de logs e encerra a thread de escrita"""
+    _pipeline.stop()
+
+
 def setup_logger(name, log_level=logging.INFO, log_to_file=True):
-    """Configura um logger com console e arquivo"""
+    """Configura um logger com console e arquivo (via fila assíncrona)"""
     
     # Criar logger
     logger = logging.getLogger(name)
@@ -67,35 +274,7 @@ def setup_logger(name, log_level=logging.INFO, log_to_file=True):
     if logger.handlers:
         return logger
     
-    file_formatter = FileFormatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S.%f'
-    )       
-    
-    # Handler para console
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(log_level)
-    console_handler.setFormatter(CustomFormatter())
-    logger.addHandler(console_handler)
-    
-    # Handler para arquivo
-    if log_to_file:
-        # Criar diretório de logs se não existir
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        
-        # Arquivo com data
-        log_file = log_dir / f"strawberry_frontend_{datetime.now().strftime('%Y%m%d')}.log"
-        
-        file_handler = logging.handlers.RotatingFileHandler(
-            log_file,
-            maxBytes=5*1024*1024,  # 5MB
-            backupCount=3,
-            encoding='utf-8'
-        )
-        file_handler.setLevel(logging.DEBUG)  # Arquivo guarda tudo
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+    logger.addHandler(_pipeline.handler(to_file=log_to_file))
     
     return logger
 
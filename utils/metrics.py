@@ -0,0 +1,286 @@
+"""
+Registro de métricas do processo (contadores, gauges, histogramas) e
+exportador local no formato texto do Prometheus
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.latency import LatencyHistogram
+from utils.logger import setup_logger
+
+metrics_logger = setup_logger("strawberry.metrics")
+
+METRICS_DEFAULTS = {"enabled": True, "host": "127.0.0.1", "port": 9108, "unix_socket": None}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    """
+    Contador monotônico. `inc` é um += num atributo, sem lock: cada contador
+    costuma ter uma única thread escritora (recepção, UI...), então o custo
+    no caminho quente é o de uma soma.
+    """
+
+    __slots__ = ("value",)
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class Gauge:
+    """Valor instantâneo; pode ser lido de uma função na hora da coleta"""
+
+    __slots__ = ("value", "_fn")
+    kind = "gauge"
+
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self.value = 0.0
+        self._fn = fn
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set_function(self, fn: Callable[[], float]):
+        self._fn = fn
+
+    def read(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return float("nan")
+        return self.value
+
+
+class Histogram(LatencyHistogram):
+    """Histograma de durações; exportado como summary (quantis + soma + contagem)"""
+
+    kind = "summary"
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def observe(self, seconds: float):
+        self.record(seconds)
+
+
+class _Family:
+    def __init__(self, name: str, help_text: str, factory):
+        self.name = name
+        self.help = help_text
+        self.factory = factory
+        self.kind = factory.kind
+        self.children: Dict[LabelKey, object] = {}
+
+
+class MetricsRegistry:
+    """
+    Métricas nomeadas, com labels opcionais. `counter/gauge/histogram`
+    retornam sempre o mesmo objeto para o mesmo nome+labels, então os
+    módulos guardam a referência e incrementam direto no caminho quente.
+    """
+
+    def __init__(self, prefix: str = "strawberry_"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._families: Dict[str, _Family] = {}
+
+    def _get(self, factory, name: str, help_text: str, labels, *args):
+        full_name = self.prefix + name
+        key = _label_key(labels)
+        with self._lock:
+            family = self._families.get(full_name)
+            if family is None:
+                family = _Family(full_name, help_text, factory)
+                self._families[full_name] = family
+            elif family.factory is not factory:
+                raise ValueError(f"Métrica {full_name} já registrada como {family.kind}")
+            metric = family.children.get(key)
+            if metric is None:
+                metric = factory(*args)
+                family.children[key] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None) -> Counter:
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None,
+              fn: Optional[Callable[[], float]] = None) -> Gauge:
+        gauge = self._get(Gauge, name, help_text, labels)
+        if fn is not None:
+            gauge.set_function(fn)
+        return gauge
+
+    def histogram(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None) -> Histogram:
+        return self._get(Histogram, name, help_text, labels)
+
+    def register_histogram(self, name: str, histogram: LatencyHistogram, help_text: str = "",
+                           labels: Optional[Dict[str, str]] = None):
+        """Expõe um histograma que já existe em outro módulo (ex.: latência de frames)"""
+        full_name = self.prefix + name
+        with self._lock:
+            family = self._families.get(full_name)
+            if family is None:
+                family = _Family(full_name, help_text, Histogram)
+                self._families[full_name] = family
+            family.children[_label_key(labels)] = histogram
+
+    def snapshot(self) -> Dict[str, float]:
+        """Valores atuais como {"nome{labels}": valor} (histogramas: p50/p99/count)"""
+        data = {}
+        for line in self.render_prometheus().splitlines():
+            if line and not line.startswith("#"):
+                name, _, value = line.rpartition(" ")
+                data[name] = float(value)
+        return data
+
+    def render_prometheus(self) -> str:
+        """Exposição no formato texto 0.0.4 do Prometheus"""
+        with self._lock:
+            families = [(f, list(f.children.items())) for f in self._families.values()]
+
+        out: List[str] = []
+        for family, children in families:
+            if family.help:
+                out.append(f"# HELP {family.name} {family.help}")
+            out.append(f"# TYPE {family.name} {family.kind}")
+            for key, metric in children:
+                if family.kind == "counter":
+                    out.append(f"{family.name}{_format_labels(key)} {metric.value}")
+                elif family.kind == "gauge":
+                    out.append(f"{family.name}{_format_labels(key)} {metric.read()}")
+                else:
+                    for q in Histogram.QUANTILES:
+                        seconds = metric.percentile(q * 100) / 1000.0
+                        out.append(f"{family.name}{_format_labels(key, (('quantile', f'{q:g}'),))} {seconds}")
+                    out.append(f"{family.name}_sum{_format_labels(key)} {metric.total_us / 1e6}")
+                    out.append(f"{family.name}_count{_format_labels(key)} {metric.count}")
+        out.append("")
+        return "\n".join(out)
+
+
+# Registro do processo
+metrics = MetricsRegistry()
+
+
+def _make_server(registry: MetricsRegistry, host: str, port: int, unix_path: Optional[str]):
+    """Cria o servidor HTTP (http.server só é importado aqui, fora do boot)"""
+    import socketserver
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def address_string(self):
+            # Em socket Unix o client_address é uma string vazia
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+        def log_message(self, fmt, *args):
+            metrics_logger.debug(f"Scrape de {self.address_string()}: {fmt % args}")
+
+    if unix_path:
+        class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        if os.path.exists(unix_path):
+            os.remove(unix_path)
+        return UnixServer(unix_path, MetricsHandler)
+
+    class TCPServer(socketserver.ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+    return TCPServer((host, port), MetricsHandler)
+
+
+class MetricsServer:
+    """
+    Endpoint /metrics em TCP (padrão 127.0.0.1) ou em socket Unix, numa
+    thread daemon "Metrics-HTTP". Só gera o texto quando alguém faz scrape.
+    """
+
+    def __init__(self, registry: MetricsRegistry = metrics, host: str = "127.0.0.1", port: int = 9108,
+                 unix_path: Optional[str] = None):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._server = _make_server(self.registry, self.host, self.port, self.unix_path)
+        if self.unix_path:
+            where = self.unix_path
+        else:
+            self.port = self._server.server_address[1]
+            where = f"http://{self.host}:{self.port}/metrics"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="Metrics-HTTP", daemon=True)
+        self._thread.start()
+        metrics_logger.info(f"Exportador de métricas em {where}")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.unix_path and os.path.exists(self.unix_path):
+            try:
+                os.remove(self.unix_path)
+            except OSError:
+                pass
+
+
+def start_metrics_server(config: Dict[str, Any], registry: MetricsRegistry = metrics) -> Optional[MetricsServer]:
+    """
+    Sobe o /metrics conforme config["metrics"] (ou STRAWBERRY_METRICS_PORT/
+    SOCKET); None se desabilitado ou se a porta/socket não estiver livre
+    """
+    cfg = dict(METRICS_DEFAULTS, **(config.get("metrics") or {}))
+    if os.getenv("STRAWBERRY_METRICS_PORT"):
+        cfg.update(enabled=True, port=int(os.environ["STRAWBERRY_METRICS_PORT"]))
+    if os.getenv("STRAWBERRY_METRICS_SOCKET"):
+        cfg.update(enabled=True, unix_socket=os.environ["STRAWBERRY_METRICS_SOCKET"])
+    if not cfg.get("enabled"):
+        return None
+    try:
+        server = MetricsServer(registry, host=cfg["host"], port=int(cfg["port"]), unix_path=cfg.get("unix_socket"))
+        server.start()
+        return server
+    except Exception as e:
+        metrics_logger.warning(f"Exportador de métricas indisponível: {e}")
+        return None
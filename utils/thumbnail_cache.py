@@ -0,0 +1,101 @@
+"""
+Cache persistente de thumbnails com geração em background
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from utils.logger import ui_logger
+
+
+class ThumbnailCache:
+    """
+    Thumbnails em disco indexados por (caminho, mtime, tamanho do arquivo,
+    tamanho do thumbnail). Uma imagem alterada gera uma chave nova, então
+    não há invalidação explícita.
+
+    A geração roda num pool de workers; o chamador recebe a imagem PIL pronta
+    via callback (na thread do worker) e só cria o PhotoImage na thread da UI.
+    """
+
+    def __init__(self, cache_dir: str, size: Tuple[int, int] = (150, 150), max_workers: int = 1):
+        self.cache_dir = cache_dir
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Thumbnailer")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, path: str, st: os.stat_result) -> str:
+        raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def cached_path(self, path: str) -> Optional[str]:
+        """Caminho do thumbnail em cache (None se ainda não gerado)"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        thumb_path = os.path.join(self.cache_dir, self._key(path, st) + ".jpg")
+        return thumb_path if os.path.exists(thumb_path) else None
+
+    def load(self, path: str):
+        """Retorna o thumbnail (PIL.Image) lendo do cache ou gerando. Bloqueante."""
+        from PIL import Image
+
+        st = os.stat(path)
+        thumb_path = os.path.join(self.cache_dir, self._key(path, st) + ".jpg")
+
+        if os.path.exists(thumb_path):
+            try:
+                with Image.open(thumb_path) as cached:
+                    cached.load()
+                    with self._lock:
+                        self.hits += 1
+                    return cached.copy()
+            except OSError:
+                pass  # arquivo de cache corrompido: regenera
+
+        with Image.open(path) as image:
+            # draft: o decoder JPEG já reduz a escala no DCT (bem mais barato)
+            image.draft("RGB", self.size)
+            image.thumbnail(self.size)
+            thumb = image.convert("RGB")
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{thumb_path}.{threading.get_ident()}.tmp"
+            thumb.save(tmp_path, "JPEG", quality=85)
+            os.replace(tmp_path, thumb_path)
+        except OSError as e:
+            ui_logger.debug(f"Não foi possível gravar thumbnail em cache: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return thumb
+
+    def submit(self, path: str, on_ready: Callable, should_run: Optional[Callable[[], bool]] = None):
+        """
+        Agenda o thumbnail de `path`. `on_ready(path, image)` é chamado na
+        thread do worker (image=None em caso de erro). `should_run` permite
+        descartar pedidos que ficaram obsoletos antes de serem processados.
+        """
+        return self._executor.submit(self._run, path, on_ready, should_run)
+
+    def _run(self, path: str, on_ready: Callable, should_run: Optional[Callable[[], bool]]):
+        if should_run is not None and not should_run():
+            return
+        try:
+            image = self.load(path)
+        except Exception as e:
+            ui_logger.debug(f"Erro gerando thumbnail de {path}: {e}")
+            image = None
+        try:
+            on_ready(path, image)
+        except Exception as e:
+            ui_logger.error(f"Erro no callback de thumbnail: {e}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)